@@ -0,0 +1,66 @@
+# Copyright 2023 Silicon Compiler Authors. All Rights Reserved.
+import sys
+import siliconcompiler
+from siliconcompiler import package
+
+
+def main():
+    progname = "sc-prefetch"
+    chip = siliconcompiler.Chip(progname)
+    switchlist = ['-target',
+                  '-cfg',
+                  '-cache',
+                  '-loglevel']
+    description = """
+-----------------------------------------------------------
+Restricted SC app that fetches the data sources of a target
+or manifest into the package cache ahead of a run.
+
+The files referenced in each data source are checked, and
+verified data sources are recorded in the index of the cache,
+so that later runs use them without network or git operations.
+
+To fetch all data sources of a target, use:
+    sc-prefetch -target freepdk45_demo
+
+To fetch specific data sources of a manifest, use:
+    sc-prefetch -cfg <design>.pkg.json -package lambdapdk
+-----------------------------------------------------------
+"""
+
+    prefetch_arguments = {
+        '-package': {'action': 'append',
+                     'help': 'data source to fetch, if not provided all data sources '
+                             'are fetched',
+                     'metavar': '<package>',
+                     'sc_print': False},
+    }
+
+    try:
+        switches = chip.create_cmdline(progname,
+                                       switchlist=switchlist,
+                                       description=description,
+                                       additional_args=prefetch_arguments)
+    except Exception as e:
+        chip.logger.error(e)
+        return 1
+
+    packages = switches['package']
+    if packages:
+        for name in packages:
+            if name not in chip.getkeys('package', 'source'):
+                chip.logger.error(f'{name} is not a registered data source.')
+                return 1
+    elif not chip.getkeys('package', 'source'):
+        chip.logger.error('No data sources found, provide a -target or -cfg.')
+        return 1
+
+    if not package.prefetch(chip, packages=packages):
+        return 1
+
+    return 0
+
+
+#########################
+if __name__ == "__main__":
+    sys.exit(main())
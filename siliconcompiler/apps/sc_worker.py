@@ -0,0 +1,108 @@
+# Copyright 2024 Silicon Compiler Authors. All Rights Reserved.
+
+import os
+import sys
+
+import siliconcompiler
+from siliconcompiler.remote.worker import Worker, DEFAULT_PORT
+from siliconcompiler.scheduler.worker import TOKEN_ENV
+
+
+###############################################
+# Main method to run the sc-worker application.
+###############################################
+def main():
+    progname = "sc-worker"
+    description = """
+-----------------------------------------------------------
+Silicon Compiler Collection Worker (sc-worker)
+
+Runs the nodes which are dispatched by the 'worker' scheduler.
+The build directory must be on storage shared by the workers
+and the hosts running flows.
+
+Workers only accept requests with the token of the pool, which
+is set with the SC_WORKER_TOKEN environment variable of the
+workers and the flows, and only listen on localhost unless
+-host is given.
+
+To start the coordinator of a pool of workers, which is also
+a worker, use:
+    sc-worker -host 0.0.0.0 -port 8090
+
+To add a worker to the pool, use:
+    sc-worker -host 0.0.0.0 -coordinator <host>:8090
+
+Flows are run on the pool with:
+    sc -scheduler worker -queue <host>:8090 ...
+-----------------------------------------------------------
+"""
+
+    # Create a base chip class.
+    chip = siliconcompiler.Chip(progname)
+
+    worker_arguments = {
+        '-host': {'default': 'localhost',
+                  'help': 'interface to listen on, use 0.0.0.0 for all interfaces',
+                  'metavar': '<host>',
+                  'sc_print': False},
+        '-port': {'type': int,
+                  'default': DEFAULT_PORT,
+                  'help': 'port to serve on',
+                  'metavar': '<port>',
+                  'sc_print': False},
+        '-token': {'help': f'token shared by the pool, defaults to ${TOKEN_ENV}',
+                   'metavar': '<token>',
+                   'sc_print': False},
+        '-address': {'help': 'host name under which this worker is reachable, '
+                             'defaults to the host name of the machine',
+                     'metavar': '<host>',
+                     'sc_print': False},
+        '-coordinator': {'help': 'coordinator to register with, if not provided this '
+                                 'worker is the coordinator',
+                         'metavar': '<host>:<port>',
+                         'sc_print': False},
+        '-cores': {'type': int,
+                   'help': 'number of cores to advertise, defaults to all cores',
+                   'metavar': '<cores>',
+                   'sc_print': False},
+        '-memory': {'type': int,
+                    'help': 'memory to advertise in MB, defaults to all memory',
+                    'metavar': '<MB>',
+                    'sc_print': False}
+    }
+
+    try:
+        switches = chip.create_cmdline(progname,
+                                       switchlist=['-loglevel'],
+                                       description=description,
+                                       additional_args=worker_arguments)
+    except Exception as e:
+        chip.logger.error(e)
+        return 1
+
+    token = switches['token'] or os.environ.get(TOKEN_ENV)
+    if not token:
+        chip.logger.error(f'A token must be provided with -token or {TOKEN_ENV}.')
+        return 1
+
+    worker = Worker(token,
+                    host=switches['host'],
+                    address=switches['address'],
+                    port=switches['port'],
+                    coordinator=switches['coordinator'],
+                    cores=switches['cores'],
+                    memory=switches['memory'],
+                    loglevel=chip.schema.get('option', 'loglevel'))
+
+    try:
+        worker.run()
+    except Exception as e:
+        worker.logger.error(f'{e}')
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
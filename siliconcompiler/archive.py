@@ -0,0 +1,238 @@
+import concurrent.futures
+import gzip
+import io
+import os
+import tarfile
+
+try:
+    import zstandard
+    _has_zstd = True
+except ImportError:
+    _has_zstd = False
+
+
+# Size of the uncompressed blocks handed to each parallel gzip worker.
+GZIP_BLOCK_SIZE = 4 * 1024 * 1024
+
+# Registered archive formats, see register_format()
+ARCHIVE_FORMATS = {}
+
+
+class _ArchiveTarFile(tarfile.TarFile):
+    '''
+    TarFile which also closes the compression stream and underlying file it
+    was opened on, in the correct order.
+    '''
+    _closers = ()
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            closers, self._closers = self._closers, ()
+            for closer in closers:
+                closer()
+
+
+class _ParallelGzipWriter(io.RawIOBase):
+    '''
+    Write-only file object which compresses fixed size blocks into independent
+    gzip members using a thread pool (the same approach as pigz).
+
+    A concatenation of gzip members is a valid gzip file, so the output can be
+    read by any gzip decompressor, including tarfile's 'r:gz' mode.
+    '''
+
+    def __init__(self, fileobj, threads, level=9, blocksize=GZIP_BLOCK_SIZE):
+        super().__init__()
+        self._fileobj = fileobj
+        self._level = level
+        self._blocksize = blocksize
+        self._max_pending = 2 * threads
+        self._buffer = bytearray()
+        self._pending = []
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=threads)
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._buffer += data
+        while len(self._buffer) >= self._blocksize:
+            block = bytes(self._buffer[:self._blocksize])
+            del self._buffer[:self._blocksize]
+            self._submit(block)
+        return len(data)
+
+    def _submit(self, block):
+        # zlib releases the GIL while compressing, so blocks compress in parallel
+        self._pending.append(self._executor.submit(gzip.compress, block, self._level, mtime=0))
+        # Bound memory usage by writing out finished blocks in order
+        while len(self._pending) > self._max_pending:
+            self._fileobj.write(self._pending.pop(0).result())
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            if self._buffer:
+                self._submit(bytes(self._buffer))
+                self._buffer.clear()
+            for future in self._pending:
+                self._fileobj.write(future.result())
+            self._pending.clear()
+            self._fileobj.flush()
+        finally:
+            self._executor.shutdown()
+            super().close()
+
+
+def _gz_writer(fileobj, threads):
+    if threads > 1:
+        return _ParallelGzipWriter(fileobj, threads), ''
+    return fileobj, 'gz'
+
+
+def _gz_reader(fileobj, threads):
+    # GzipFile handles archives made of multiple gzip members,
+    # which tarfile's own stream decompression does not
+    return gzip.GzipFile(fileobj=fileobj, mode='rb'), ''
+
+
+def _tar_writer(fileobj, threads):
+    return fileobj, ''
+
+
+def _tar_reader(fileobj, threads):
+    return fileobj, ''
+
+
+def _zst_writer(fileobj, threads):
+    if not _has_zstd:
+        raise RuntimeError('zstandard must be installed to write .tar.zst archives')
+    # zstandard compresses on the calling thread with threads=0, and uses
+    # that many worker threads otherwise
+    compressor = zstandard.ZstdCompressor(threads=threads if threads > 1 else 0)
+    return compressor.stream_writer(fileobj, closefd=False), ''
+
+
+def _zst_reader(fileobj, threads):
+    if not _has_zstd:
+        raise RuntimeError('zstandard must be installed to read .tar.zst archives')
+    return zstandard.ZstdDecompressor().stream_reader(fileobj, closefd=False), ''
+
+
+def register_format(name, suffixes, magic, writer, reader):
+    '''
+    Register a compression format for archives.
+
+    Args:
+        name (str): name of the format
+        suffixes (list of str): file suffixes used to identify the format,
+            the first entry is used when generating file names
+        magic (bytes): leading bytes identifying a compressed stream, or None
+        writer (function): function called with (fileobj, threads) returning a
+            tuple of a writable file object and the tarfile compression to apply
+        reader (function): function called with (fileobj, threads) returning a
+            tuple of a readable file object and the tarfile compression to apply
+    '''
+    ARCHIVE_FORMATS[name] = {
+        'suffixes': tuple(suffixes),
+        'magic': magic,
+        'writer': writer,
+        'reader': reader
+    }
+
+
+register_format('gz', ('.tgz', '.tar.gz'), b'\x1f\x8b', _gz_writer, _gz_reader)
+register_format('zst', ('.tar.zst', '.tzst'), b'\x28\xb5\x2f\xfd', _zst_writer, _zst_reader)
+register_format('tar', ('.tar',), None, _tar_writer, _tar_reader)
+
+
+def get_suffix(archive_format):
+    '''
+    Returns the default file suffix for an archive format.
+    '''
+    return ARCHIVE_FORMATS[archive_format]['suffixes'][0]
+
+
+def get_format(filename):
+    '''
+    Determine the archive format from a file name, returns None if the name
+    does not match any registered format.
+    '''
+    for name, info in ARCHIVE_FORMATS.items():
+        if filename.endswith(info['suffixes']):
+            return name
+    return None
+
+
+def _detect_format(fileobj):
+    header = fileobj.peek(4)[:4]
+    for name, info in ARCHIVE_FORMATS.items():
+        if info['magic'] and header.startswith(info['magic']):
+            return name
+    return 'tar'
+
+
+def open_archive(file, mode='r', archive_format=None, threads=1):
+    '''
+    Open a tar archive as a stream.
+
+    Archives are always processed sequentially, so they can be written to
+    or read from non-seekable destinations, such as sockets or HTTP
+    responses, without staging the data in a temporary file.
+
+    Args:
+        file (str or file object): path to the archive or a binary file object
+        mode (str): 'r' to read or 'w' to write the archive
+        archive_format (str): format of the archive, if not provided it is
+            determined from the file name when writing, or from the content when
+            reading, and defaults to 'gz'
+        threads (int): number of compression threads to use when writing
+
+    Returns:
+        tarfile.TarFile object, which must be closed to finalize the archive.
+
+    Examples:
+        >>> with open_archive('results.tar.zst', 'w', threads=8) as tar:
+        ...     tar.add('outputs')
+    '''
+    if mode not in ('r', 'w'):
+        raise ValueError(f'{mode} is not a valid archive mode')
+
+    owned = isinstance(file, (str, os.PathLike))
+    if owned:
+        if not archive_format:
+            archive_format = get_format(os.fspath(file))
+        fileobj = open(file, f'{mode}b')
+    else:
+        fileobj = file
+
+    try:
+        if mode == 'r' and not archive_format:
+            if not hasattr(fileobj, 'peek'):
+                fileobj = io.BufferedReader(fileobj)
+            archive_format = _detect_format(fileobj)
+        if not archive_format:
+            archive_format = 'gz'
+        if archive_format not in ARCHIVE_FORMATS:
+            raise ValueError(f'{archive_format} is not a supported archive format')
+
+        handler = ARCHIVE_FORMATS[archive_format]['writer' if mode == 'w' else 'reader']
+        stream, comptype = handler(fileobj, max(1, threads or 1))
+
+        tar = _ArchiveTarFile.open(fileobj=stream, mode=f'{mode}|{comptype}')
+    except Exception:
+        if owned:
+            fileobj.close()
+        raise
+
+    closers = []
+    if stream is not fileobj:
+        closers.append(stream.close)
+    if owned:
+        closers.append(fileobj.close)
+    tar._closers = tuple(closers)
+
+    return tar
@@ -0,0 +1,210 @@
+import hashlib
+import json
+import os
+import shutil
+import stat
+import uuid
+
+from siliconcompiler import utils
+
+
+# Name of the artifact store directory inside a job directory
+STORE_DIR = 'sc_artifacts'
+
+
+def store_path(chip, jobname=None):
+    '''
+    Returns the location of the artifact store for a job.
+    '''
+    return os.path.join(chip._getworkdir(jobname=jobname), STORE_DIR)
+
+
+def _blob_path(store, digest):
+    return os.path.join(store, 'blobs', digest[0:2], digest)
+
+
+def _index_path(store, step, index):
+    return os.path.join(store, 'nodes', f'{step}{index}.json')
+
+
+def _hash_file(path):
+    hashobj = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            hashobj.update(block)
+    return hashobj.hexdigest()
+
+
+def _make_readonly(path):
+    '''
+    Removes the write permissions of a blob, so the nodes which share it
+    cannot modify it in place.
+    '''
+    mode = stat.S_IMODE(os.stat(path).st_mode)
+    readonly = mode & ~(stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH)
+    if mode != readonly:
+        os.chmod(path, readonly)
+
+
+def _link_file(src, dst):
+    '''
+    Atomically replace dst with a hard link to src.
+    '''
+    tmp_dst = f'{dst}.{uuid.uuid4().hex}'
+    os.link(src, tmp_dst)
+    os.replace(tmp_dst, dst)
+
+
+def read_index(chip, step, index, jobname=None):
+    '''
+    Returns the ingested outputs of a node as a dictionary of
+    {relative path: (digest, inode)}, or None if the node outputs have not been
+    ingested into the store.
+    '''
+    index_file = _index_path(store_path(chip, jobname=jobname), step, index)
+    if not os.path.isfile(index_file):
+        return None
+    with open(index_file, 'r') as f:
+        return {path: tuple(entry) for path, entry in json.load(f).items()}
+
+
+def ingest_outputs(chip, step, index):
+    '''
+    Ingest the outputs of a node into the artifact store.
+
+    Each output file is stored once as an immutable blob keyed by its sha256
+    digest, and the file in outputs/ is replaced with a hard link to the blob.
+    Blobs are made read-only, as a write to any of their links would change
+    the files of every node which shares them.
+    Files which are already linked to a blob of an input node, such as the
+    outputs of builtin tasks, are recognized by inode and not rehashed.
+
+    Returns:
+        False if the outputs could not be linked into the store.
+    '''
+    design = chip.get('design')
+    flow = chip.get('option', 'flow')
+    store = store_path(chip)
+    outputs = os.path.join(chip._getworkdir(step=step, index=index), 'outputs')
+
+    # Map inodes of input node blobs to their digests to avoid rehashing
+    known_inodes = {}
+    in_job = chip._get_in_job(step, index)
+    in_store = store_path(chip, jobname=in_job)
+    for in_step, in_index in chip._get_flowgraph_node_inputs(flow, (step, index)):
+        in_entries = read_index(chip, in_step, in_index, jobname=in_job)
+        if in_entries:
+            for digest, inode in in_entries.values():
+                known_inodes[inode] = (digest, _blob_path(in_store, digest))
+
+    entries = {}
+    for root, _, files in os.walk(outputs):
+        for filename in files:
+            path = os.path.join(root, filename)
+            relpath = os.path.relpath(path, outputs)
+            if relpath == f'{design}.pkg.json' or os.path.islink(path):
+                # Manifests are rewritten after ingestion and symlinks are
+                # staged as-is
+                continue
+
+            digest = None
+            inode = os.stat(path).st_ino
+            if inode in known_inodes:
+                known_digest, known_blob = known_inodes[inode]
+                # Guard against inodes reused after a blob was removed
+                if os.path.exists(known_blob) and os.path.samefile(known_blob, path):
+                    digest = known_digest
+            if not digest:
+                digest = _hash_file(path)
+            blob = _blob_path(store, digest)
+
+            try:
+                os.makedirs(os.path.dirname(blob), exist_ok=True)
+                if os.path.exists(blob):
+                    if not os.path.samefile(blob, path):
+                        _link_file(blob, path)
+                else:
+                    try:
+                        os.link(path, blob)
+                    except FileExistsError:
+                        # Blob was ingested by a concurrent node
+                        _link_file(blob, path)
+                _make_readonly(blob)
+            except OSError as e:
+                chip.logger.warning(f'Unable to link {relpath} into the artifact store: {e}')
+                return False
+
+            entries[relpath] = (digest, os.stat(blob).st_ino)
+
+    index_file = _index_path(store, step, index)
+    os.makedirs(os.path.dirname(index_file), exist_ok=True)
+    with open(index_file, 'w') as f:
+        json.dump(entries, f, indent=2, sort_keys=True)
+
+    return True
+
+
+def stage_inputs(chip, in_job, in_step, in_index, dst):
+    '''
+    Populate dst with links to the ingested outputs of an input node.
+
+    Returns:
+        False if the input node outputs have not been ingested, in which case
+        the caller needs to copy them instead.
+    '''
+    entries = read_index(chip, in_step, in_index, jobname=in_job)
+    if entries is None:
+        return False
+
+    store = store_path(chip, jobname=in_job)
+    if not all(os.path.isfile(_blob_path(store, digest)) for digest, _ in entries.values()):
+        # Index is stale
+        return False
+
+    for relpath, (digest, _) in entries.items():
+        dst_path = os.path.join(dst, relpath)
+        os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+        if os.path.lexists(dst_path):
+            os.remove(dst_path)
+        utils.link_symlink_copy(_blob_path(store, digest), dst_path)
+
+    # Carry over symlinks which are not part of the store
+    src = chip._getworkdir(jobname=in_job, step=in_step, index=in_index)
+    src = os.path.join(src, 'outputs')
+    for root, _, files in os.walk(src):
+        for filename in files:
+            path = os.path.join(root, filename)
+            if os.path.islink(path):
+                dst_path = os.path.join(dst, os.path.relpath(path, src))
+                os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+                if os.path.lexists(dst_path):
+                    os.remove(dst_path)
+                shutil.copy2(path, dst_path, follow_symlinks=False)
+
+    return True
+
+
+def collect_garbage(chip, jobname=None):
+    '''
+    Remove blobs which are no longer referenced by any node directory.
+
+    Blobs are reference counted through their hard link count, a blob
+    which is only linked from the store is no longer used.
+
+    Returns:
+        Number of bytes reclaimed.
+    '''
+    blobs = os.path.join(store_path(chip, jobname=jobname), 'blobs')
+    if not os.path.isdir(blobs):
+        return 0
+
+    reclaimed = 0
+    for root, _, files in os.walk(blobs):
+        for filename in files:
+            path = os.path.join(root, filename)
+            stat = os.stat(path)
+            if stat.st_nlink <= 1:
+                reclaimed += stat.st_size
+                os.remove(path)
+
+    return reclaimed
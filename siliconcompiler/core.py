@@ -24,6 +24,7 @@ import shlex
 import platform
 import getpass
 import distro
+import requests
 import netifaces
 import codecs
 import tempfile
@@ -34,15 +35,20 @@ from jinja2 import Environment, FileSystemLoader
 from siliconcompiler.remote import client
 from siliconcompiler.schema import Schema, SCHEMA_VERSION
 from siliconcompiler import scheduler
+from siliconcompiler import speculate as sc_speculate
 from siliconcompiler import utils
 from siliconcompiler import units
 from siliconcompiler import _metadata
 from siliconcompiler import NodeStatus, SiliconCompilerError
+from siliconcompiler.handle import RunHandle
 from siliconcompiler.report import _show_summary_table
 from siliconcompiler.report import _generate_summary_image, _open_summary_image
 from siliconcompiler.report import _generate_html_report, _open_html_report
 from siliconcompiler.report import Dashboard
+from siliconcompiler.report.logfile import LogFile
 from siliconcompiler import package as sc_package
+from siliconcompiler import archive as sc_archive
+from siliconcompiler import artifacts as sc_artifacts
 import psutil
 import subprocess
 import glob
@@ -105,8 +111,25 @@ If you are sure that your working directory is valid, try running `cd $(pwd)`.""
         # Cache of python modules
         self.modules = {}
 
-        # Cache of python packages loaded
-        self._packages = set()
+        # Cache of data source paths resolved by package.path()
+        self._packages = {}
+        # Keep the cache between runs, when it is shared with other chips
+        self._share_packages = False
+
+        # Functions called when a node finishes running, see _add_node_callback()
+        self._node_callbacks = []
+
+        # Cores shared with the runs of other chips, see siliconcompiler.farm
+        self._node_pool = None
+        # The environment is set up by the runner of the chips sharing the
+        # process, so the run leaves os.environ untouched
+        self._share_environ = False
+
+        # Output of tool version checks, {(exe, *vswitch): output}
+        self._tool_versions = {}
+
+        # Event which cancels the current run, see run_async()
+        self._cancel_run = None
 
         # Controls whether find_files returns an abspath or relative to this
         # this is primarily used when generating standalone testcases
@@ -1206,6 +1229,9 @@ If you are sure that your working directory is valid, try running `cd $(pwd)`.""
             if dependency:
                 depdendency_path = os.path.abspath(
                     os.path.join(sc_package.path(self, dependency), path))
+                if not os.path.exists(depdendency_path):
+                    # The path may not be part of the sparse checkout of the data source yet
+                    sc_package.add_sparse_paths(self, dependency, [path])
                 if os.path.exists(depdendency_path):
                     result.append(depdendency_path)
                 else:
@@ -2268,7 +2294,8 @@ If you are sure that your working directory is valid, try running `cd $(pwd)`.""
             self._archive_node(tar, step, idx, include=include)
 
     ###########################################################################
-    def archive(self, jobs=None, step=None, index=None, include=None, archive_name=None):
+    def archive(self, jobs=None, step=None, index=None, include=None, archive_name=None,
+                archive_format=None, threads=1):
         '''Archive a job directory.
 
         Creates a single compressed archive (.tgz) based on the design,
@@ -2285,7 +2312,18 @@ If you are sure that your working directory is valid, try running `cd $(pwd)`.""
             include (list of str): Override of default inclusion rules. Accepts list of glob
                 patterns that are matched from the root of individual step/index directories. To
                 capture all files, supply "*".
-            archive_name (str): Path to the archive
+            archive_name (str or file object): Path to the archive, or a binary file object
+                to stream the archive into.
+            archive_format (str): Compression format of the archive, 'gz', 'zst' or 'tar'.
+                By default, this is determined from the archive name, or is 'gz'.
+            threads (int): Number of threads to use for compression.
+
+        Returns:
+            Path to the archive, or the file object it was written to.
+
+        Examples:
+            >>> chip.archive(archive_format='zst', threads=8)
+            Creates <design>_<jobname>.tar.zst using 8 compression threads.
         '''
         design = self.get('design')
         if not jobs:
@@ -2303,16 +2341,22 @@ If you are sure that your working directory is valid, try running `cd $(pwd)`.""
             flowgraph_nodes = self.nodes_to_execute()
 
         if not archive_name:
+            suffix = sc_archive.get_suffix(archive_format or 'gz')
             if step and index:
-                archive_name = f"{design}_{jobname}_{step}{index}.tgz"
+                archive_name = f"{design}_{jobname}_{step}{index}{suffix}"
             elif step:
-                archive_name = f"{design}_{jobname}_{step}.tgz"
+                archive_name = f"{design}_{jobname}_{step}{suffix}"
             else:
-                archive_name = f"{design}_{jobname}.tgz"
+                archive_name = f"{design}_{jobname}{suffix}"
 
-        self.logger.info(f'Creating archive {archive_name}...')
+        if isinstance(archive_name, str):
+            self.logger.info(f'Creating archive {archive_name}...')
+        else:
+            self.logger.info('Creating archive...')
 
-        with tarfile.open(archive_name, "w:gz") as tar:
+        with sc_archive.open_archive(archive_name, 'w',
+                                     archive_format=archive_format,
+                                     threads=threads) as tar:
             for job in jobs:
                 if len(jobs) > 0:
                     self.logger.info(f'Archiving job {job}...')
@@ -3092,13 +3136,20 @@ If you are sure that your working directory is valid, try running `cd $(pwd)`.""
                 self.logger.error(f'Halting step due to previous error in {in_step}{in_index}')
                 self._haltstep(flow, step, index)
 
+            if replay:
+                continue
+
+            # Link stored outputs if the input node was ingested into the artifact store
+            if self.get('option', 'artifactstore') and \
+                    sc_artifacts.stage_inputs(self, in_job, in_step, in_index, 'inputs'):
+                continue
+
             # Skip copying pkg.json files here, since we write the current chip
             # configuration into inputs/{design}.pkg.json earlier in _runstep.
-            if not replay:
-                shutil.copytree(f"../../../{in_job}/{in_step}/{in_index}/outputs", 'inputs/',
-                                dirs_exist_ok=True,
-                                ignore=shutil.ignore_patterns(f'{design}.pkg.json'),
-                                copy_function=utils.link_symlink_copy)
+            shutil.copytree(f"../../../{in_job}/{in_step}/{in_index}/outputs", 'inputs/',
+                            dirs_exist_ok=True,
+                            ignore=shutil.ignore_patterns(f'{design}.pkg.json'),
+                            copy_function=utils.link_symlink_copy)
 
     def _pre_process(self, step, index):
         flow = self.get('option', 'flow')
@@ -3146,12 +3197,18 @@ If you are sure that your working directory is valid, try running `cd $(pwd)`.""
             if veropt:
                 cmdlist = [exe]
                 cmdlist.extend(veropt)
-                proc = subprocess.run(cmdlist,
-                                      stdout=subprocess.PIPE,
-                                      stderr=subprocess.STDOUT,
-                                      universal_newlines=True)
-                if proc.returncode != 0:
-                    self.logger.warn(f'Version check on {tool} failed with code {proc.returncode}')
+                stdout = self._tool_versions.get(tuple(cmdlist))
+                if stdout is None:
+                    proc = subprocess.run(cmdlist,
+                                          stdout=subprocess.PIPE,
+                                          stderr=subprocess.STDOUT,
+                                          universal_newlines=True)
+                    stdout = proc.stdout
+                    if proc.returncode != 0:
+                        self.logger.warn(f'Version check on {tool} failed with code '
+                                         f'{proc.returncode}')
+                    else:
+                        self._tool_versions[tuple(cmdlist)] = stdout
 
                 parse_version = getattr(self._get_tool_module(step, index, flow=flow),
                                         'parse_version',
@@ -3160,9 +3217,9 @@ If you are sure that your working directory is valid, try running `cd $(pwd)`.""
                     self.logger.error(f'{tool}/{task} does not implement parse_version().')
                     self._haltstep(flow, step, index)
                 try:
-                    version = parse_version(proc.stdout)
+                    version = parse_version(stdout)
                 except Exception as e:
-                    self.logger.error(f'{tool} failed to parse version string: {proc.stdout}')
+                    self.logger.error(f'{tool} failed to parse version string: {stdout}')
                     raise e
 
                 self.logger.info(f"Tool '{exe_base}' found with version '{version}' "
@@ -3294,6 +3351,8 @@ If you are sure that your working directory is valid, try running `cd $(pwd)`.""
                         stderr_reader.close()
                         stderr_writer = subprocess.STDOUT
 
+                    speculate = self.get('option', 'speculate', step=step, index=index)
+                    live_metrics_time = 0
                     cmd_start_time = time.time()
                     proc = subprocess.Popen(cmdlist,
                                             stdout=stdout_writer,
@@ -3329,6 +3388,22 @@ If you are sure that your working directory is valid, try running `cd $(pwd)`.""
                                 self.logger.error(f'Step timed out after {timeout} seconds')
                                 utils.terminate_process(proc.pid)
                                 self._haltstep(flow, step, index)
+
+                            # Publish the progress of the tool, to terminate it
+                            # early if it can no longer be selected.
+                            if speculate and \
+                                    time.time() - live_metrics_time > \
+                                    sc_speculate.LIVE_METRICS_INTERVAL:
+                                live_metrics_time = time.time()
+                                try:
+                                    sc_speculate.write_live_metrics(
+                                        workdir,
+                                        sc_speculate.get_live_metrics(
+                                            self, step, index,
+                                            live_metrics_time - cmd_start_time,
+                                            max_mem_bytes))
+                                except OSError as e:
+                                    self.logger.debug(f'Unable to write live metrics: {e}')
                             time.sleep(POLL_INTERVAL)
                     except KeyboardInterrupt:
                         interrupt_time = time.time()
@@ -3353,9 +3428,8 @@ If you are sure that your working directory is valid, try running `cd $(pwd)`.""
             if logfile:
                 if quiet:
                     # Print last 10 lines of log when in quiet mode
-                    with open(logfile, 'r') as logfd:
-                        loglines = logfd.read().splitlines()
-                        for logline in loglines[-10:]:
+                    with LogFile(logfile, cache=False) as log:
+                        for logline in log.tail(10):
                             self.logger.error(logline)
                     # No log file for pure-Python tools.
                 msg += f' See log file {os.path.abspath(logfile)}'
@@ -3469,9 +3543,7 @@ If you are sure that your working directory is valid, try running `cd $(pwd)`.""
         # If the job is configured to run on a cluster, collect the schema
         # and send it to a compute node for deferred execution.
         # (Run the initial starting nodes stage[s] locally)
-        flow = self.get('option', 'flow')
-        if self.get('option', 'scheduler', 'name', step=step, index=index) and \
-           self._get_flowgraph_node_inputs(flow, (step, index)):
+        if scheduler._is_deferred(self, step, index):
             scheduler._defernode(self, step, index)
         else:
             self._executenode(step, index)
@@ -3519,6 +3591,9 @@ If you are sure that your working directory is valid, try running `cd $(pwd)`.""
         self._check_logfile(step, index, quiet, run_func)
         self._hash_files(step, index)
 
+        if self.get('option', 'artifactstore'):
+            sc_artifacts.ingest_outputs(self, step, index)
+
         # Capture wall runtime and cpu cores
         wall_end = time.time()
         self.__record_time(step, index, wall_end, 'end')
@@ -3611,7 +3686,8 @@ If you are sure that your working directory is valid, try running `cd $(pwd)`.""
         '''
         Helper function to finalize a job run after it completes:
         * Merge the last-completed manifests in a job's flowgraphs.
-        * Restore any environment variable changes made during the run.
+        * Restore any environment variable changes made during the run, unless
+          the environment is shared with the runs of other chips.
         * Clear any -arg_step/-arg_index values in case only one node was run.
         * Store this run in the Schema's 'history' field.
         * Write out a final JSON manifest containing the full results and history.
@@ -3652,13 +3728,21 @@ If you are sure that your working directory is valid, try running `cd $(pwd)`.""
                 self.set('flowgraph', flow, step, index, 'status', NodeStatus.ERROR)
 
         # Restore environment
-        os.environ.clear()
-        os.environ.update(environment)
+        if environment is not None:
+            os.environ.clear()
+            os.environ.update(environment)
 
         # Clear scratchpad args since these are checked on run() entry
         self.set('arg', 'step', None, clobber=True)
         self.set('arg', 'index', None, clobber=True)
 
+        # Remove stored artifacts which are no longer used by any node
+        if self.get('option', 'artifactstore') and self.get('option', 'clean'):
+            reclaimed = sc_artifacts.collect_garbage(self)
+            if reclaimed:
+                self.logger.info(f'Reclaimed {units.format_binary(reclaimed, "B")}B '
+                                 'from the artifact store')
+
         # Store run in history
         self.schema.record_history()
 
@@ -3794,55 +3878,186 @@ If you are sure that your working directory is valid, try running `cd $(pwd)`.""
                 and self._is_builtin(tool, task) and not deps_was_successful.get(node):
             status[node] = NodeStatus.ERROR
 
+    def _add_node_callback(self, callback):
+        '''
+        Register a function to call each time a node of the flow finishes
+        running, with the step, index and status of the node.
+
+        Callbacks are called from the process running the flow while other
+        nodes may still be running, so they should return quickly.
+        '''
+        self._node_callbacks.append(callback)
+
     def _launch_nodes(self, nodes_to_run, processes, status):
         running_nodes = []
+        prepared_nodes = []
+        deferred_nodes = []
         deps_was_successful = {}
-        while len(nodes_to_run) > 0 or len(running_nodes) > 0:
-            # Check for new nodes that can be launched.
-            for node, deps in list(nodes_to_run.items()):
-                # TODO: breakpoint logic:
-                # if node is breakpoint, then don't launch while len(running_nodes) > 0
 
-                self._check_node_dependencies(node, deps, status, deps_was_successful)
+        # Nodes which run on a job scheduler are submitted once their process
+        # has set them up, and tracked by a single backend per scheduler.
+        backends = {}
+        for step, index in nodes_to_run:
+            if scheduler._is_deferred(self, step, index):
+                name = self.get('option', 'scheduler', 'name', step=step, index=index)
+                if name not in backends:
+                    try:
+                        backends[name] = scheduler.get_backend(self, name)
+                    except ValueError as e:
+                        self.error(str(e), fatal=True)
 
-                if status[node] == NodeStatus.ERROR:
-                    del nodes_to_run[node]
-                    continue
+        def get_backend(node):
+            step, index = node
+            return backends[self.get('option', 'scheduler', 'name', step=step, index=index)]
+
+        # Parallel indices which can no longer be selected are terminated early.
+        speculator = sc_speculate.Speculator(self, nodes_to_run)
+        terminated = set()
+
+        # Cores reserved in the pool shared with other chips, {node: cores}
+        pooled = {}
+
+        def get_cores(node):
+            step, index = node
+            return self.get('option', 'scheduler', 'cores', step=step, index=index) or 1
+
+        def stop_process(node):
+            # Stop the tools first, then the node, through its Process so
+            # that it is reaped by multiprocessing.
+            try:
+                for child in psutil.Process(processes[node].pid).children():
+                    utils.terminate_process(child.pid)
+            except psutil.NoSuchProcess:
+                pass
+            processes[node].terminate()
 
-                # If there are no dependencies left, launch this node and
-                # remove from nodes_to_run.
-                if len(deps) == 0:
-                    processes[node].start()
-                    running_nodes.append(node)
-                    del nodes_to_run[node]
-
-            # Check for situation where we have stuff left to run but don't
-            # have any nodes running. This shouldn't happen, but we will get
-            # stuck in an infinite loop if it does, so we want to break out
-            # with an explicit error.
-            if len(nodes_to_run) > 0 and len(running_nodes) == 0:
-                self.error('Nodes left to run, but no '
-                           'running nodes. From/to may be invalid.', fatal=True)
-
-            # Check for completed nodes.
-            # TODO: consider staying in this section of loop until a node
-            # actually completes.
-            for node in running_nodes.copy():
-                if not processes[node].is_alive():
-                    running_nodes.remove(node)
-                    if processes[node].exitcode > 0:
+        try:
+            for backend in backends.values():
+                backend.start()
+
+            while len(nodes_to_run) > 0 or len(running_nodes) > 0 or len(deferred_nodes) > 0:
+                if self._is_run_cancelled():
+                    self.logger.error('Run cancelled, stopping the running nodes')
+                    for node in running_nodes:
+                        stop_process(node)
+                    for backend in backends.values():
+                        backend.cancel()
+                    for node in running_nodes:
+                        processes[node].join()
+                    for node in running_nodes + deferred_nodes:
                         status[node] = NodeStatus.ERROR
-                    else:
-                        status[node] = NodeStatus.SUCCESS
+                    running_nodes.clear()
+                    break
 
-            # TODO: exponential back-off with max?
-            time.sleep(0.1)
+                waiting_for_pool = False
+                # Check for new nodes that can be launched.
+                for node, deps in list(nodes_to_run.items()):
+                    # TODO: breakpoint logic:
+                    # if node is breakpoint, then don't launch while len(running_nodes) > 0
+
+                    self._check_node_dependencies(node, deps, status, deps_was_successful)
+
+                    if status[node] == NodeStatus.ERROR:
+                        del nodes_to_run[node]
+                        continue
+
+                    # If there are no dependencies left, launch this node and
+                    # remove from nodes_to_run.
+                    if len(deps) == 0:
+                        if self._node_pool:
+                            if not self._node_pool.acquire(get_cores(node)):
+                                waiting_for_pool = True
+                                continue
+                            pooled[node] = get_cores(node)
+                        processes[node].start()
+                        running_nodes.append(node)
+                        del nodes_to_run[node]
+
+                # Check for situation where we have stuff left to run but don't
+                # have any nodes running. This shouldn't happen, but we will get
+                # stuck in an infinite loop if it does, so we want to break out
+                # with an explicit error.
+                if len(nodes_to_run) > 0 and len(running_nodes) == 0 and \
+                        len(deferred_nodes) == 0 and not waiting_for_pool:
+                    self.error('Nodes left to run, but no '
+                               'running nodes. From/to may be invalid.', fatal=True)
+
+                finished_nodes = []
+                if speculator:
+                    running = [node for node in running_nodes + deferred_nodes
+                               if node not in terminated]
+                    for node, reason in speculator.check(running, status).items():
+                        self.logger.error(f'Terminating {node[0]}{node[1]} early: {reason}')
+                        terminated.add(node)
+                        if node in prepared_nodes:
+                            # Set up, but not submitted yet
+                            prepared_nodes.remove(node)
+                            deferred_nodes.remove(node)
+                            status[node] = NodeStatus.ERROR
+                            finished_nodes.append(node)
+                        elif node in deferred_nodes:
+                            get_backend(node).cancel([node])
+                        else:
+                            stop_process(node)
+
+                # Check for completed nodes.
+                # TODO: consider staying in this section of loop until a node
+                # actually completes.
+                for node in running_nodes.copy():
+                    if not processes[node].is_alive():
+                        running_nodes.remove(node)
+                        if node in pooled:
+                            self._node_pool.release(pooled.pop(node))
+                        if processes[node].exitcode != 0 or node in terminated:
+                            status[node] = NodeStatus.ERROR
+                        elif scheduler._is_deferred(self, *node):
+                            prepared_nodes.append(node)
+                            deferred_nodes.append(node)
+                            continue
+                        else:
+                            status[node] = NodeStatus.SUCCESS
+                        finished_nodes.append(node)
+
+                # Submit the nodes of a step once all of them are set up, so
+                # that index fan-outs are submitted together.
+                setup_steps = set(step for step, _ in running_nodes)
+                submit_nodes = [node for node in prepared_nodes if node[0] not in setup_steps]
+                for node in submit_nodes:
+                    get_backend(node).submit([node])
+                prepared_nodes = [node for node in prepared_nodes if node not in submit_nodes]
+
+                for backend in backends.values():
+                    for node, success in backend.collect():
+                        deferred_nodes.remove(node)
+                        status[node] = NodeStatus.SUCCESS if success else NodeStatus.ERROR
+                        finished_nodes.append(node)
+
+                for node in finished_nodes:
+                    for callback in self._node_callbacks:
+                        callback(*node, status[node])
+
+                # TODO: exponential back-off with max?
+                time.sleep(0.1)
+        finally:
+            # Do not leave node processes behind when the run is interrupted,
+            # once they had time to stop their tools.
+            deadline = time.time() + 10
+            for node in running_nodes:
+                processes[node].join(max(0, deadline - time.time()))
+                if processes[node].is_alive():
+                    stop_process(node)
+                    processes[node].join()
+
+            for backend in backends.values():
+                backend.stop()
+            for cores in pooled.values():
+                self._node_pool.release(cores)
 
     def _check_nodes_status(self, flow, status):
         def success(node):
             return status[node] == NodeStatus.SUCCESS
         unreachable_steps = self._unreachable_steps_to_execute(flow, cond=success)
-        if unreachable_steps:
+        if unreachable_steps and not self._is_run_cancelled():
             self.error(f'These final steps could not be reached: {list(unreachable_steps)}',
                        fatal=True)
 
@@ -3870,6 +4085,23 @@ If you are sure that your working directory is valid, try running `cd $(pwd)`.""
             # Setting up tool is optional
             self._setup_node(step, index)
 
+        # Fetch the data sources of the files required by the nodes in parallel,
+        # rather than one at a time when the files are first looked up.
+        required = set()
+        for (step, index) in self.nodes_to_execute(flow):
+            tool, task = self._get_tool_task(step, index, flow=flow)
+            if self._is_builtin(tool, task) or \
+                    not self.valid('tool', tool, 'task', task, 'require'):
+                continue
+            for item in self.get('tool', tool, 'task', task, 'require', step=step, index=index):
+                required.add(tuple(item.split(',')))
+        try:
+            sc_package.resolve_packages(
+                self, sc_package.get_referenced_paths(self, keypaths=sorted(required)).keys())
+        except (git.GitCommandError, requests.RequestException) as e:
+            # Nodes fetch the data sources again when they need them, and fail then
+            self.logger.warning(f'Failed to fetch data sources: {e}')
+
         # Check validity of setup
         self.logger.info("Checking manifest before running.")
         check_ok = True
@@ -3927,6 +4159,10 @@ If you are sure that your working directory is valid, try running `cd $(pwd)`.""
                 self.error(f"{key} must be set before calling run()",
                            fatal=True)
 
+        # Data sources are resolved once per run
+        if not self._share_packages:
+            self._packages = {}
+
         self._increment_job_name()
 
         # Re-init logger to include run info after setting up flowgraph.
@@ -3942,11 +4178,13 @@ If you are sure that your working directory is valid, try running `cd $(pwd)`.""
         self._reset_flow_nodes(flow, self.nodes_to_execute(flow))
 
         # Save current environment
-        environment = copy.deepcopy(os.environ)
-        # Set env variables
-        for envvar in self.getkeys('option', 'env'):
-            val = self.get('option', 'env', envvar)
-            os.environ[envvar] = val
+        environment = None
+        if not self._share_environ:
+            environment = copy.deepcopy(os.environ)
+            # Set env variables
+            for envvar in self.getkeys('option', 'env'):
+                val = self.get('option', 'env', envvar)
+                os.environ[envvar] = val
 
         status = {}
         if self.get('option', 'remote'):
@@ -3957,6 +4195,36 @@ If you are sure that your working directory is valid, try running `cd $(pwd)`.""
         # Merge cfgs from last executed tasks, and write out a final manifest.
         self._finalize_run(set(self._get_execution_exit_nodes(flow)), environment, status)
 
+        if self._is_run_cancelled():
+            self.error('Run was cancelled.', fatal=True)
+
+    def run_async(self, timeout=None):
+        '''
+        Executes tasks in a flowgraph without waiting for them.
+
+        The flow runs as with :meth:`run`, in a background thread. The
+        returned handle reports the progress of the run, and can cancel it.
+        Cancelling a run stops the processes of its running nodes and the
+        jobs submitted to job schedulers, and writes out the final manifest
+        with the results of the nodes which finished.
+
+        Args:
+            timeout (float): wall-clock time in seconds after which the run
+                is cancelled
+
+        Returns:
+            A :class:`~siliconcompiler.handle.RunHandle`.
+
+        Examples:
+            >>> handle = chip.run_async(timeout=3600)
+            >>> handle.wait()
+            'success'
+        '''
+        return RunHandle(self, timeout=timeout)
+
+    def _is_run_cancelled(self):
+        return bool(self._cancel_run and self._cancel_run.is_set())
+
     def _check_execution_nodes_inputs(self, flow):
         for node in self.nodes_to_execute(flow):
             if node in self._get_execution_entry_nodes(flow):
@@ -4610,12 +4878,15 @@ If you are sure that your working directory is valid, try running `cd $(pwd)`.""
         if not filepath:
             return None
 
-        env_save = os.environ.copy()
-        for env in self.getkeys('option', 'env'):
-            os.environ[env] = self.get('option', 'env', env)
-        resolved_path = os.path.expandvars(filepath)
-        os.environ.clear()
-        os.environ.update(env_save)
+        if self._share_environ:
+            resolved_path = os.path.expandvars(filepath)
+        else:
+            env_save = os.environ.copy()
+            for env in self.getkeys('option', 'env'):
+                os.environ[env] = self.get('option', 'env', env)
+            resolved_path = os.path.expandvars(filepath)
+            os.environ.clear()
+            os.environ.update(env_save)
 
         # variables that don't exist in environment get ignored by `expandvars`,
         # but we can do our own error checking to ensure this doesn't result in
@@ -4786,20 +5057,66 @@ If you are sure that your working directory is valid, try running `cd $(pwd)`.""
             Records the metric cell area under 'floorplan0' and notes the source as
             'reports/metrics.json'
         '''
-        metric_unit = None
-        if self.schema._has_field('metric', metric, 'unit'):
-            metric_unit = self.get('metric', metric, field='unit')
+        self._record_metrics(step, index, {metric: (value, source_unit, source)})
 
-        if metric_unit:
-            value = units.convert(value, from_unit=source_unit, to_unit=metric_unit)
+    #######################################
+    def _record_metrics(self, step, index, metrics):
+        '''
+        Records several metrics from a given step and index.
 
-        self.set('metric', metric, value, step=step, index=index)
+        This is equivalent to calling :meth:`_record_metric` for each metric, but
+        all values are converted and checked before any of them are recorded,
+        so either all or none of the metrics are written into the schema.
 
-        if source:
-            flow = self.get('option', 'flow')
-            tool, task = self._get_tool_task(step, index, flow=flow)
+        Args:
+            step (str): step to record the metrics into
+            index (str): index to record the metrics into
+            metrics (dict): mapping of metric to a tuple of (value, source_unit, sources),
+                where source_unit may be None if the value has no units and
+                sources is a file or list of files the value came from, or None.
 
-            self.add('tool', tool, 'task', task, 'report', metric, source, step=step, index=index)
+        Examples:
+            >>> chip._record_metrics('syn', '0', {
+            ...     'cellarea': (500.0, 'um^2', 'reports/stat.json'),
+            ...     'cells': (25, None, 'reports/stat.json')})
+            Records the metrics cell area and cells under 'syn0' and notes the source as
+            'reports/stat.json'
+        '''
+        # Convert and check all values before modifying the schema
+        records = []
+        try:
+            for metric, (value, source_unit, sources) in metrics.items():
+                keypath = ('metric', metric)
+                cfg = self.schema._search(*keypath)
+                err = Schema._validate_step_index(cfg['pernode'], 'value', step, index)
+                if err:
+                    raise ValueError(f'Invalid args to set() of keypath {keypath}: {err}')
+                if cfg.get('unit'):
+                    value = units.convert(value, from_unit=source_unit, to_unit=cfg['unit'])
+                value = Schema._check_and_normalize(value, cfg['type'], 'value', keypath,
+                                                    cfg.get('enum'))
+
+                if not sources:
+                    sources = []
+                elif isinstance(sources, str):
+                    sources = [sources]
+
+                records.append((keypath, cfg, value, sources))
+        except (ValueError, TypeError) as e:
+            self.error(e)
+            return
+
+        tool, task = None, None
+        for keypath, cfg, value, sources in records:
+            Schema._set(*keypath, value, logger=self.logger, cfg=cfg, step=step, index=index,
+                        normalize=False)
+
+            if sources:
+                if not tool:
+                    flow = self.get('option', 'flow')
+                    tool, task = self._get_tool_task(step, index, flow=flow)
+                self.add('tool', tool, 'task', task, 'report', keypath[-1], sources,
+                         step=step, index=index)
 
     #######################################
     def _clear_metric(self, step, index, metric, preserve=None):
@@ -4842,6 +5159,11 @@ If you are sure that your working directory is valid, try running `cd $(pwd)`.""
         # Modules are not serializable, so save without cache
         attributes['modules'] = {}
 
+        # Callbacks only apply to the process which runs the flow
+        attributes['_node_callbacks'] = []
+        attributes['_node_pool'] = None
+        attributes['_cancel_run'] = None
+
         # We have to remove the chip's logger before serializing the object
         # since the logger object is not serializable.
         del attributes['logger']
@@ -0,0 +1,320 @@
+import itertools
+import math
+import random
+
+from siliconcompiler.tools.builtin._common import _minmax
+
+
+class DesignSpace:
+    '''
+    Explores the values of schema parameters with parallel flowgraph branches.
+
+    Each candidate is a combination of parameter values. The nodes of the flow
+    from step onwards are replicated once per candidate as indices of a new
+    flow, named '<flow>_dse', and the values of a candidate are set on the
+    nodes of its branch. The nodes before step are shared by all candidates.
+
+    The branches are run by the scheduler of the flow. Between rounds, the
+    candidates are ranked with the scoring of the minimum and maximum
+    builtins, using the weights and goals of the nodes of the flow, and the
+    poorest candidates are pruned. Each round resumes the job of the previous
+    ones, so the nodes which already ran are not run again.
+
+    Strategies:
+
+    * grid: runs every combination of values, in a single round
+    * random: runs a random sample of budget combinations, in a single round
+    * halving: successive halving of a random sample of budget combinations.
+      The flow is split into rounds which end at intermediate steps, and
+      after each round only the best 1/eta of the candidates continue.
+
+    Args:
+        chip (Chip): chip to explore, with ['option', 'flow'] set
+        step (str): step at which the branches of the candidates start
+        strategy (str): search strategy, 'grid', 'random' or 'halving'
+        budget (int): maximum number of candidates to run
+        op (str): selection of the best candidate, 'minimum' or 'maximum'
+        eta (int): for successive halving, reduction of the number of
+            candidates after each round
+        seed (int): seed for sampling the candidates
+
+    Examples:
+        >>> dse = DesignSpace(chip, 'place', strategy='halving', budget=8)
+        >>> dse.add_parameter(['tool', 'openroad', 'task', 'place', 'var', 'place_density'],
+        ...                   ['0.4', '0.5', '0.6', '0.7'])
+        >>> best = dse.run()
+    '''
+
+    STRATEGIES = ('grid', 'random', 'halving')
+
+    def __init__(self, chip, step, strategy='grid', budget=None, op='minimum', eta=2, seed=None):
+        if strategy not in DesignSpace.STRATEGIES:
+            raise ValueError(f'{strategy} is not a supported strategy, use one of '
+                             f'{", ".join(DesignSpace.STRATEGIES)}')
+        if op not in ('minimum', 'maximum'):
+            raise ValueError(f'{op} is not a supported selection, use minimum or maximum')
+        if budget is not None and budget < 1:
+            raise ValueError('budget must be at least 1')
+        if eta < 2:
+            raise ValueError('eta must be at least 2')
+
+        flow = chip.get('option', 'flow')
+        if not flow or step not in chip.getkeys('flowgraph', flow):
+            raise ValueError(f'{step} is not a step of the {flow} flowgraph')
+
+        self.__chip = chip
+        self.__flow = flow
+        self.__step = step
+        self.__strategy = strategy
+        self.__budget = budget
+        self.__op = op
+        self.__eta = eta
+        self.__seed = seed
+
+        # [(keypath, values)]
+        self.__parameters = []
+
+    @property
+    def flow(self):
+        '''
+        Name of the flow with the branches of the candidates.
+        '''
+        return f'{self.__flow}_dse'
+
+    def add_parameter(self, keypath, values):
+        '''
+        Adds a parameter to explore.
+
+        Args:
+            keypath (list): keypath of a schema parameter which can be set
+                per node
+            values (list): values to explore
+        '''
+        chip = self.__chip
+        keypath = list(keypath)
+        if not chip.valid(*keypath, default_valid=True):
+            raise ValueError(f'{keypath} is not a valid keypath')
+        if chip.get(*keypath, field='pernode') == 'never':
+            raise ValueError(f'{keypath} cannot be set per node')
+        if not values:
+            raise ValueError(f'No values provided for {keypath}')
+
+        self.__parameters.append((keypath, list(values)))
+
+    def candidates(self):
+        '''
+        Returns the candidates to run, as a list of {keypath: value}, with the
+        keypaths as tuples.
+        '''
+        if not self.__parameters:
+            raise ValueError('No parameters to explore')
+
+        keypaths = [tuple(keypath) for keypath, _ in self.__parameters]
+        grid = list(itertools.product(*[values for _, values in self.__parameters]))
+
+        if self.__strategy == 'grid':
+            if self.__budget is not None and len(grid) > self.__budget:
+                raise ValueError(f'The grid has {len(grid)} candidates, which exceeds the '
+                                 f'budget of {self.__budget}')
+        else:
+            count = len(grid)
+            if self.__budget is not None:
+                count = min(count, self.__budget)
+            grid = random.Random(self.__seed).sample(grid, count)
+
+        return [dict(zip(keypaths, values)) for values in grid]
+
+    def run(self):
+        '''
+        Runs the exploration.
+
+        ['option', 'flow'] is set to the flow with the branches of the
+        candidates, whose results are left in the job directory.
+
+        Returns:
+            The best candidate, as {keypath: value}, or None if all failed.
+        '''
+        chip = self.__chip
+        candidates = self.candidates()
+        branches = self.__build_flow(len(candidates))
+
+        for candidate, nodes in zip(candidates, branches):
+            for keypath, value in candidate.items():
+                for step, index in nodes:
+                    chip.set(*keypath, value, step=step, index=index)
+
+        rounds = self.__get_rounds(len(candidates), branches[0])
+
+        saved = {key: chip.get('option', key) for key in ('flow', 'to', 'from', 'prune',
+                                                          'resume', 'jobincr')}
+        chip.set('option', 'flow', self.flow)
+        chip.set('option', 'from', [])
+
+        alive = list(range(len(candidates)))
+        try:
+            for n, (to_step, score_step) in enumerate(rounds):
+                last = n == len(rounds) - 1
+                chip.logger.info(f'Design space exploration round {n + 1} of {len(rounds)}: '
+                                 f'running {len(alive)} candidates to '
+                                 f'{to_step if not last else "the end of the flow"}')
+
+                chip.set('option', 'to', [] if last else [to_step])
+                chip.set('option', 'prune', [node for i in range(len(candidates))
+                                             if i not in alive
+                                             for node in branches[i]
+                                             if node[0] == self.__step])
+                chip.run()
+
+                # Later rounds resume the job
+                chip.set('option', 'resume', True)
+                chip.set('option', 'jobincr', False)
+
+                ranked = self.__rank(alive, branches, score_step)
+                for rank, i in enumerate(ranked):
+                    values = ', '.join(f'{keypath[-1]}={value}'
+                                       for keypath, value in candidates[i].items())
+                    chip.logger.info(f'  #{rank + 1}: candidate {i} ({values})')
+                failed = len(alive) - len(ranked)
+                if failed:
+                    chip.logger.warning(f'  {failed} candidates failed')
+
+                if not last:
+                    ranked = ranked[:max(1, math.ceil(len(alive) / self.__eta))]
+                alive = ranked
+                if not alive:
+                    break
+        finally:
+            for key, value in saved.items():
+                if key != 'flow':
+                    chip.set('option', key, value)
+
+        if not alive:
+            chip.logger.error('All candidates of the design space exploration failed')
+            return None
+
+        best = candidates[alive[0]]
+        chip.logger.info(f'Best candidate is {alive[0]}: {best}')
+        return best
+
+    def __build_flow(self, count):
+        '''
+        Creates the flow with one branch per candidate, and returns the nodes
+        of each branch.
+        '''
+        chip = self.__chip
+        flow = self.__flow
+        dse_flow = self.flow
+
+        # Nodes reachable from step make up a branch
+        branch = set()
+        pending = chip._get_flowgraph_nodes(flow, steps=[self.__step])
+        while pending:
+            node = pending.pop()
+            if node not in branch:
+                branch.add(node)
+                pending.extend(chip._get_flowgraph_node_outputs(flow, node))
+
+        # Indices of the node of a branch in each candidate
+        indices = {}
+        for step in set(step for step, _ in branch):
+            step_indices = chip.getkeys('flowgraph', flow, step)
+            for n, index in enumerate(step_indices):
+                indices[(step, index)] = [str(c * len(step_indices) + n) for c in range(count)]
+
+        def copy_node(node, new_node):
+            for keys in chip.allkeys('flowgraph', flow, *node):
+                chip.set('flowgraph', dse_flow, *new_node, *keys,
+                         chip.get('flowgraph', flow, *node, *keys))
+
+        # Drop the branches of a previous exploration
+        chip.schema.cfg['flowgraph'].pop(dse_flow, None)
+        branches = [[] for _ in range(count)]
+        for node in chip._get_flowgraph_nodes(flow):
+            if node not in branch:
+                copy_node(node, node)
+                continue
+
+            step, index = node
+            for c in range(count):
+                new_node = (step, indices[node][c])
+                copy_node(node, new_node)
+                chip.set('flowgraph', dse_flow, *new_node, 'input',
+                         [(in_step, indices[(in_step, in_index)][c])
+                          if (in_step, in_index) in branch else (in_step, in_index)
+                          for in_step, in_index in chip._get_flowgraph_node_inputs(flow, node)])
+                branches[c].append(new_node)
+
+        return branches
+
+    def __get_rounds(self, count, branch):
+        '''
+        Returns the rounds, as a list of (last step, step to score).
+        '''
+        chip = self.__chip
+
+        # Order the steps of a branch by their depth
+        depth = {}
+        nodes = set(branch)
+        pending = list(branch)
+        while pending:
+            node = pending.pop(0)
+            inputs = [n for n in chip._get_flowgraph_node_inputs(self.flow, node) if n in nodes]
+            if any(n not in depth for n in inputs):
+                pending.append(node)
+                continue
+            depth[node] = max([depth[n] + 1 for n in inputs], default=0)
+        step_depth = {}
+        for (step, _), d in depth.items():
+            step_depth[step] = max(step_depth.get(step, 0), d)
+        steps = sorted(step_depth, key=lambda step: step_depth[step])
+
+        def is_builtin(step):
+            return all(chip._is_builtin(*chip._get_tool_task(s, i, flow=self.flow))
+                       for s, i in branch if s == step)
+
+        def is_scored(step):
+            for s, i in branch:
+                if s != step:
+                    continue
+                for key in ('weight', 'goal'):
+                    for metric in chip.getkeys('flowgraph', self.flow, s, i, key):
+                        if chip.get('flowgraph', self.flow, s, i, key, metric):
+                            return True
+            return False
+
+        def score_step(last):
+            # The last step up to last whose nodes are scored
+            candidates = steps[:steps.index(last) + 1]
+            for step in reversed(candidates):
+                if is_scored(step):
+                    return step
+            return last
+
+        stop_steps = [step for step in steps if not is_builtin(step)] or steps
+        count_rounds = 1
+        if self.__strategy == 'halving' and count > 1:
+            count_rounds = min(len(stop_steps),
+                               math.ceil(math.log(count) / math.log(self.__eta)))
+
+        rounds = []
+        for n in range(count_rounds - 1):
+            last = stop_steps[math.ceil((n + 1) * len(stop_steps) / count_rounds) - 1]
+            rounds.append((last, score_step(last)))
+        rounds.append((steps[-1], score_step(steps[-1])))
+        return rounds
+
+    def __rank(self, alive, branches, step):
+        '''
+        Returns the candidates which succeeded, from best to worst.
+        '''
+        nodes = {node: i for i in alive for node in branches[i] if node[0] == step}
+
+        ranked = []
+        while nodes:
+            _, winner = _minmax(self.__chip, *nodes.keys(), op=self.__op)
+            if not winner:
+                break
+            best = nodes[winner]
+            ranked.append(best)
+            nodes = {node: i for node, i in nodes.items() if i != best}
+        return ranked
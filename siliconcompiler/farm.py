@@ -0,0 +1,181 @@
+import multiprocessing
+import os
+import threading
+import time
+
+from siliconcompiler import Chip, NodeStatus
+from siliconcompiler.schema import Schema
+from siliconcompiler.scheduler.pool import NodePool
+
+
+class Farm:
+    '''
+    Runs the flows of many chips at once, on a single pool of cores.
+
+    Each chip runs its flow as with :meth:`Chip.run`, in a thread of this
+    process, and writes its results to its own build directory. The local
+    nodes of all the chips share one pool of cores, so the machine is kept
+    busy without being oversubscribed. A node uses the cores it requests
+    with ['option', 'scheduler', 'cores'], or one core.
+
+    The chips share the data sources they resolve, and the version checks
+    of the tools they run, so these are done once rather than once per chip
+    or per node.
+
+    ['option', 'env'] applies to the whole process, so the chips must not
+    set an environment variable to different values. The farm sets these
+    variables for all chips, and the runs of the chips leave the environment
+    of the process untouched.
+
+    Args:
+        cores (int): number of cores to share, defaults to the number of
+            cores of the machine
+
+    Examples:
+        >>> farm = Farm()
+        >>> for design in designs:
+        ...     farm.add(make_chip(design))
+        >>> report = farm.run()
+    '''
+
+    def __init__(self, cores=None):
+        self.__pool = NodePool(cores)
+        self.__chips = []
+
+    @property
+    def chips(self):
+        '''
+        Chips added to the farm.
+        '''
+        return list(self.__chips)
+
+    def add(self, chip):
+        '''
+        Adds a chip to run.
+
+        Args:
+            chip (Chip or str): chip, or path to the manifest of a chip
+
+        Returns:
+            The chip.
+        '''
+        if not isinstance(chip, Chip):
+            manifest = chip
+            chip = Chip(Schema(manifest=manifest).get('design'))
+            chip.read_manifest(manifest)
+
+        jobdir = chip._getworkdir()
+        for other in self.__chips:
+            if other._getworkdir() == jobdir:
+                raise ValueError(f'{chip.design} and {other.design} use the same job '
+                                 f'directory {jobdir}')
+
+        self.__chips.append(chip)
+        return chip
+
+    def run(self):
+        '''
+        Runs the flows of all chips.
+
+        Returns:
+            A summary of the run, as a dict with:
+
+            * chips: number of chips
+            * failed: chips whose flow failed
+            * nodes: number of nodes which ran, in the chips which completed
+            * walltime: time to run all flows, in seconds
+            * nodetime: sum of the run times of these nodes, in seconds, which
+              is the time to run them one after another
+            * speedup: nodetime / walltime
+            * throughput: chips per hour
+        '''
+        if not self.__chips:
+            raise ValueError('No chips to run')
+
+        environment = self.__get_environment()
+
+        manager = multiprocessing.get_context('spawn').Manager()
+        tool_versions = manager.dict()
+        packages = {}
+        saved = []
+        for chip in self.__chips:
+            saved.append((chip._node_pool, chip._tool_versions, chip._packages,
+                          chip._share_packages, chip._share_environ))
+            chip._node_pool = self.__pool
+            chip._tool_versions = tool_versions
+            chip._packages = packages
+            chip._share_packages = True
+            chip._share_environ = True
+
+        # Chips whose run raised an error
+        failed = [False] * len(self.__chips)
+
+        def run(n, chip):
+            try:
+                chip.run()
+            except Exception as e:
+                chip.logger.error(f'Run failed: {e}')
+                failed[n] = True
+
+        saved_environ = dict(os.environ)
+        os.environ.update(environment)
+        start = time.time()
+        try:
+            threads = [threading.Thread(target=run, args=(n, chip))
+                       for n, chip in enumerate(self.__chips)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            walltime = time.time() - start
+            os.environ.clear()
+            os.environ.update(saved_environ)
+            for chip, state in zip(self.__chips, saved):
+                chip._node_pool, chip._tool_versions, chip._packages, \
+                    chip._share_packages, chip._share_environ = state
+            manager.shutdown()
+
+        nodes = 0
+        nodetime = 0.0
+        for chip, fail in zip(self.__chips, failed):
+            if fail:
+                continue
+            flow = chip.get('option', 'flow')
+            for step, index in chip.nodes_to_execute(flow):
+                if chip.get('flowgraph', flow, step, index, 'status') != NodeStatus.SUCCESS:
+                    continue
+                nodes += 1
+                nodetime += chip.get('metric', 'tasktime', step=step, index=index) or 0
+
+        report = {
+            'chips': len(self.__chips),
+            'failed': [chip.design for chip, fail in zip(self.__chips, failed) if fail],
+            'nodes': nodes,
+            'walltime': walltime,
+            'nodetime': nodetime,
+            'speedup': nodetime / walltime if walltime else 0,
+            'throughput': 3600 * len(self.__chips) / walltime if walltime else 0
+        }
+
+        logger = self.__chips[0].logger
+        logger.info(f"Ran {report['chips']} chips ({report['nodes']} nodes) in "
+                    f"{walltime:.1f}s on {self.__pool.cores} cores: "
+                    f"{report['throughput']:.1f} chips per hour, "
+                    f"{report['speedup']:.2f}x faster than running the nodes one "
+                    "after another")
+        if report['failed']:
+            logger.error(f"{len(report['failed'])} chips failed: {', '.join(report['failed'])}")
+
+        return report
+
+    def __get_environment(self):
+        environment = {}
+        for chip in self.__chips:
+            for envvar in chip.getkeys('option', 'env'):
+                value = chip.get('option', 'env', envvar)
+                if environment.get(envvar, value) != value:
+                    raise ValueError(f'Chips set the environment variable {envvar} to '
+                                     'different values')
+                environment[envvar] = value
+        return environment
@@ -0,0 +1,131 @@
+import threading
+import time
+
+
+class RunHandle:
+    '''
+    Handle of a flow running in the background, returned by
+    :meth:`Chip.run_async`.
+
+    The status of the run is one of:
+
+    * running: the flow is running
+    * success: the flow completed
+    * failed: the flow failed, see :attr:`error`
+    * cancelled: the run was cancelled with :meth:`cancel`
+    * timeout: the run was cancelled because it reached its deadline
+
+    Args:
+        chip (Chip): chip to run
+        timeout (float): wall-clock time in seconds after which the run is
+            cancelled
+    '''
+
+    def __init__(self, chip, timeout=None):
+        if chip._cancel_run:
+            raise RuntimeError(f'{chip.design} is already running')
+
+        self.chip = chip
+        self.error = None
+        self.deadline = time.time() + timeout if timeout is not None else None
+
+        self.__status = 'running'
+        self.__cancel_status = None
+        self.__lock = threading.Lock()
+        self.__done = threading.Event()
+        self.__cancel = threading.Event()
+        # {node: status}, of the nodes which finished
+        self.__nodes = {}
+
+        chip._cancel_run = self.__cancel
+        chip._add_node_callback(self.__node_finished)
+
+        self.__timer = None
+        if timeout is not None:
+            self.__timer = threading.Timer(timeout, self.__cancel_run, args=('timeout',))
+            self.__timer.daemon = True
+            self.__timer.start()
+
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+        self.__thread.start()
+
+    @property
+    def status(self):
+        '''
+        Status of the run.
+        '''
+        return self.__status
+
+    @property
+    def nodes(self):
+        '''
+        Status of the nodes which finished, as {(step, index): status}.
+        '''
+        with self.__lock:
+            return dict(self.__nodes)
+
+    def done(self):
+        '''
+        Returns True if the run ended.
+        '''
+        return self.__done.is_set()
+
+    def wait(self, timeout=None):
+        '''
+        Waits for the run to end.
+
+        Args:
+            timeout (float): maximum time to wait, in seconds
+
+        Returns:
+            The status of the run.
+        '''
+        self.__done.wait(timeout)
+        return self.__status
+
+    def cancel(self, wait=True):
+        '''
+        Cancels the run.
+
+        Args:
+            wait (bool): wait for the run to stop and its manifest to be
+                written
+
+        Returns:
+            The status of the run.
+        '''
+        self.__cancel_run('cancelled')
+        if wait:
+            return self.wait()
+        return self.__status
+
+    def __cancel_run(self, status):
+        with self.__lock:
+            if self.__done.is_set() or self.__cancel.is_set():
+                return
+            self.__cancel_status = status
+            self.__cancel.set()
+
+    def __node_finished(self, step, index, status):
+        with self.__lock:
+            self.__nodes[(step, index)] = status
+
+    def __run(self):
+        status = 'success'
+        try:
+            self.chip.run()
+        except Exception as e:
+            self.error = e
+            status = 'failed'
+        finally:
+            if self.__timer:
+                self.__timer.cancel()
+            self.chip._node_callbacks.remove(self.__node_finished)
+            with self.__lock:
+                if self.__cancel.is_set():
+                    status = self.__cancel_status
+                self.chip._cancel_run = None
+                self.__status = status
+                self.__done.set()
+            if status == 'failed':
+                self.chip.logger.error(f'Run failed: {self.error}')
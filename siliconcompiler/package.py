@@ -1,13 +1,17 @@
+import concurrent.futures
+import contextlib
 import os
 import requests
 import tarfile
 from pathlib import Path
-from git import Repo, GitCommandError
+from git import Repo, GitCommandError, InvalidGitRepositoryError
 from urllib.parse import urlparse
 import importlib
 import shutil
 import re
 from time import sleep
+import threading
+import uuid
 from siliconcompiler import SiliconCompilerError
 from siliconcompiler.utils import default_cache_dir
 import json
@@ -17,24 +21,52 @@ import functools
 from github import Github
 import github.Auth
 
+try:
+    import fcntl
+    _has_fcntl = True
+except ImportError:
+    _has_fcntl = False
+
+
+# Set to False to skip checking cached git data sources for local modifications.
+CHECK_DIRTY_CACHE = True
+
+# Set to True to only check out the paths referenced by the chip when
+# cloning git data sources.
+SPARSE_CHECKOUT = False
+
+# Name of the index of the data sources verified by prefetch(), inside the cache
+CACHE_INDEX = 'sc_cache_index.json'
+
+# Maximum number of data sources fetched at once by resolve_packages() and prefetch()
+FETCH_THREADS = 4
+
+# Cached data sources which have been verified by this process
+__verified_cache = set()
+
+# Paths added to sparse checkouts by this process, as (data path, path)
+__sparse_paths = set()
+
+# Background checks of cached git data sources for local modifications,
+# {(chip id, data path): thread}
+__dirty_checks = {}
+__dirty_checks_lock = threading.Lock()
+
 
 def path(chip, package):
     """
     Compute data source data path
     Additionally cache data source data if possible
+
+    The resolved path is stored in the chip, so that the data source is only
+    looked up once per run.
+
     Parameters:
         package (str): Name of the data source
-        quiet (boolean): Suppress package data found messages
     Returns:
         path: Location of data source on the local system
     """
 
-    if package not in chip._packages:
-        quiet = False
-        chip._packages.add(package)
-    else:
-        quiet = True
-
     # Initially try retrieving data source from schema
     data = {}
     data['path'] = chip.get('package', 'source', package, 'path')
@@ -45,18 +77,23 @@ def path(chip, package):
 
     data['path'] = chip._resolve_env_vars(data['path'])
 
+    key = (package, data['path'], data['ref'], chip.get('option', 'cache'))
+    if key not in chip._packages:
+        chip._packages[key] = __resolve_path(chip, package, data)
+    return chip._packages[key]
+
+
+def __resolve_path(chip, package, data):
     url = urlparse(data['path'])
 
     # check network drive for package data source
     if data['path'].startswith('file://') or os.path.exists(data['path']):
         path = os.path.abspath(data['path'].replace('file://', ''))
-        if not quiet:
-            chip.logger.info(f'Found {package} data at {path}')
+        chip.logger.info(f'Found {package} data at {path}')
         return path
     elif data['path'].startswith('python://'):
         path = path_from_python(chip, url.netloc)
-        if not quiet:
-            chip.logger.info(f'Found {package} data at {path}')
+        chip.logger.info(f'Found {package} data at {path}')
         return path
 
     # location of the python package
@@ -74,53 +111,152 @@ def path(chip, package):
         chip.error(f'Could not find data path in package {package}: {data["path"]}')
     data_path = os.path.join(cache_path, project_id)
 
-    # Wait a maximum of 10 minutes for other git processes to finish
-    lock_file = Path(data_path+'.lock')
-    wait_on_lock(chip, data_path, lock_file, max_seconds=600)
+    # Data sources verified by another chip of this process, or by prefetch(),
+    # can be used directly
+    if (data_path in __verified_cache or __is_indexed(cache_path, project_id, data)) and \
+            os.path.exists(data_path):
+        chip.logger.info(f'Found cached {package} data at {data_path}')
+        if CHECK_DIRTY_CACHE and url.scheme in ['git', 'git+https', 'ssh', 'git+ssh']:
+            __start_dirty_check(chip, data_path)
+        return data_path
 
-    # check cached package data source
-    if os.path.exists(data_path):
-        if not quiet:
+    lock_file = f'{data_path}.lock'
+
+    # check cached package data source, readers share the lock
+    with lock_cache(chip, lock_file, exclusive=False):
+        if __is_cached(url, data_path):
             chip.logger.info(f'Found cached {package} data at {data_path}')
-        if url.scheme in ['git', 'git+https', 'ssh', 'git+ssh']:
-            try:
-                lock_file.touch()
-                repo = Repo(data_path)
-                if not quiet and (repo.untracked_files or repo.index.diff("HEAD")):
-                    chip.logger.warning('The repo of the cached data is dirty.')
-                return data_path
-            except GitCommandError:
-                chip.logger.warning('Deleting corrupted cache data.')
-                shutil.rmtree(path)
-            finally:
-                lock_file.unlink(missing_ok=True)
-        else:
+            __verified_cache.add(data_path)
+            if CHECK_DIRTY_CACHE and url.scheme in ['git', 'git+https', 'ssh', 'git+ssh']:
+                __start_dirty_check(chip, data_path)
             return data_path
 
-    # download package data source
-    if url.scheme in ['git', 'git+https', 'ssh', 'git+ssh']:
-        clone_synchronized(chip, package, data, data_path, lock_file)
-    elif url.scheme == 'https':
-        extract_from_url(chip, package, data, data_path)
+    # download package data source, another process may have done it
+    # while this one was waiting for the lock
+    with lock_cache(chip, lock_file, exclusive=True):
+        if __is_cached(url, data_path):
+            chip.logger.info(f'Found cached {package} data at {data_path}')
+            __verified_cache.add(data_path)
+            return data_path
+
+        if os.path.exists(data_path):
+            chip.logger.warning('Deleting corrupted cache data.')
+            shutil.rmtree(data_path)
+
+        # Download next to the cache entry, so that it only appears once complete
+        download_path = f'{data_path}.{uuid.uuid4().hex}'
+        try:
+            if url.scheme in ['git', 'git+https', 'ssh', 'git+ssh']:
+                clone_synchronized(chip, package, data, download_path)
+            elif url.scheme == 'https':
+                extract_from_url(chip, package, data, download_path)
+            if os.path.exists(download_path):
+                os.rename(download_path, data_path)
+        finally:
+            if os.path.exists(download_path):
+                shutil.rmtree(download_path)
+
     if os.path.exists(data_path):
         chip.logger.info(f'Saved {package} data to {data_path}')
+        __verified_cache.add(data_path)
         return data_path
     raise SiliconCompilerError(f'Extracting {package} data to {data_path} failed')
 
 
-def wait_on_lock(chip, data_path, lock_file, max_seconds):
-    while (lock_file.exists()):
+def __is_cached(url, data_path):
+    if not os.path.exists(data_path):
+        return False
+    if url.scheme in ['git', 'git+https', 'ssh', 'git+ssh']:
+        try:
+            Repo(data_path)
+        except (GitCommandError, InvalidGitRepositoryError):
+            return False
+    return True
+
+
+def __start_dirty_check(chip, data_path):
+    '''
+    Check a cached git data source for local modifications in the background,
+    at most once per chip, since it walks the whole checkout.
+    '''
+    def check():
+        try:
+            repo = Repo(data_path)
+            if repo.untracked_files or repo.index.diff("HEAD"):
+                chip.logger.warning('The repo of the cached data is dirty.')
+        except GitCommandError as e:
+            chip.logger.warning(f'Failed to check {data_path} for modifications: {e}')
+
+    key = (id(chip), data_path)
+    with __dirty_checks_lock:
+        if key in __dirty_checks:
+            return
+        thread = threading.Thread(target=check, daemon=True)
+        __dirty_checks[key] = thread
+    thread.start()
+
+
+def _wait_for_dirty_checks():
+    '''
+    Wait for the checks of cached data sources for local modifications to finish.
+    '''
+    with __dirty_checks_lock:
+        threads = list(__dirty_checks.values())
+    for thread in threads:
+        thread.join()
+
+
+@contextlib.contextmanager
+def lock_cache(chip, lock_file, exclusive):
+    '''
+    Hold an advisory lock on an entry of the package cache.
+
+    Shared locks are held while reading an entry, exclusive locks while it is
+    downloaded. Waiters resume as soon as the lock is released, and locks of
+    killed processes are released by the operating system.
+
+    Args:
+        lock_file (str): path to the lock file of the entry
+        exclusive (bool): if True, the lock is not shared
+    '''
+    if not _has_fcntl:
+        # Fall back to a lock file, which is held by its existence.
+        wait_on_lock(chip, lock_file, max_seconds=600)
+        if not exclusive:
+            yield
+            return
+        lock_path = Path(lock_file)
+        try:
+            lock_path.touch()
+            yield
+        finally:
+            lock_path.unlink(missing_ok=True)
+        return
+
+    with open(lock_file, 'a') as f:
+        mode = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+        try:
+            fcntl.flock(f, mode | fcntl.LOCK_NB)
+        except BlockingIOError:
+            chip.logger.info(f'Waiting for another process to release {lock_file}')
+            fcntl.flock(f, mode)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def wait_on_lock(chip, lock_file, max_seconds):
+    while (os.path.exists(lock_file)):
         if max_seconds == 0:
-            raise SiliconCompilerError(f'Failed to access {data_path}.'
-                                       f'Lock {lock_file} still exists.')
+            raise SiliconCompilerError(f'Failed to access {lock_file}, it still exists.')
         sleep(1)
         max_seconds -= 1
 
 
-def clone_synchronized(chip, package, data, data_path, lock_file):
+def clone_synchronized(chip, package, data, data_path):
     url = urlparse(data['path'])
     try:
-        lock_file.touch()
         clone_from_git(chip, package, data, data_path)
     except GitCommandError as e:
         if 'Permission denied' in repr(e):
@@ -128,32 +264,234 @@ def clone_synchronized(chip, package, data, data_path, lock_file):
                 chip.logger.error('Failed to authenticate. Please setup your git ssh.')
             elif url.scheme in ['git', 'git+https']:
                 chip.logger.error('Failed to authenticate. Please use a token or ssh.')
-        else:
-            raise e
-    finally:
-        lock_file.unlink(missing_ok=True)
+        # The clone is incomplete, so it must not be moved into the cache
+        raise e
 
 
 def clone_from_git(chip, package, data, repo_path):
+    '''
+    Clone the ref of a git data source.
+
+    Only the requested ref is fetched, without its history. If SPARSE_CHECKOUT
+    is set, only the paths referenced by the chip are checked out, other
+    paths are added by add_sparse_paths() when they are needed.
+    '''
     url = urlparse(data['path'])
     if url.scheme in ['git', 'git+https'] and url.username:
         chip.logger.warning('Your token is in the data source path and will be stored in the '
                             'schema. If you do not want this set the env variable GIT_TOKEN '
                             'or use ssh for authentification.')
     if url.scheme in ['git+ssh', 'ssh']:
-        chip.logger.info(f'Cloning {package} data from {url.netloc}:{url.path[1:]}')
         # Git requires the format git@github.com:org/repo instead of git@github.com/org/repo
-        repo = Repo.clone_from(f'{url.netloc}:{url.path[1:]}', repo_path, recurse_submodules=True)
+        remote = f'{url.netloc}:{url.path[1:]}'
+        chip.logger.info(f'Cloning {package} data from {remote}')
     else:
         if os.environ.get('GIT_TOKEN') and not url.username:
             url = url._replace(netloc=f'{os.environ.get("GIT_TOKEN")}@{url.hostname}')
         url = url._replace(scheme='https')
-        chip.logger.info(f'Cloning {package} data from {url.geturl()}')
-        repo = Repo.clone_from(url.geturl(), repo_path, recurse_submodules=True)
+        remote = url.geturl()
+        chip.logger.info(f'Cloning {package} data from {remote}')
+
+    repo = Repo.init(repo_path)
+    repo.create_remote('origin', remote)
+
+    if SPARSE_CHECKOUT:
+        paths = get_referenced_paths(chip).get(package)
+        if paths:
+            repo.git.sparse_checkout('set', '--no-cone', *__sparse_patterns(paths))
+
     chip.logger.info(f'Checking out {data["ref"]}')
-    repo.git.checkout(data["ref"])
-    for submodule in repo.submodules:
-        submodule.update(init=True)
+    try:
+        repo.git.fetch('origin', data["ref"], depth=1)
+        repo.git.checkout('FETCH_HEAD')
+    except GitCommandError:
+        # Some servers do not allow fetching commits by their hash,
+        # so fetch the whole repository instead.
+        repo.git.fetch('origin', tags=True)
+        repo.git.checkout(data["ref"])
+    repo.git.submodule('update', '--init', '--recursive', '--depth', '1')
+
+
+def add_sparse_paths(chip, package, paths):
+    '''
+    Check out more paths of a cached git data source with a sparse checkout.
+
+    Args:
+        package (str): Name of the data source
+        paths (list): paths relative to the data source
+
+    Returns:
+        True if the paths were added, False if the data source is not a
+        sparse checkout.
+    '''
+    data_path = path(chip, package)
+    if not os.path.isfile(os.path.join(data_path, '.git', 'info', 'sparse-checkout')):
+        return False
+
+    # Paths which do not exist in the data source are only tried once
+    paths = [p for p in paths if (data_path, p) not in __sparse_paths]
+    if not paths:
+        return False
+    __sparse_paths.update((data_path, p) for p in paths)
+
+    with lock_cache(chip, f'{data_path}.lock', exclusive=True):
+        chip.logger.info(f'Checking out {", ".join(paths)} from {package} data')
+        Repo(data_path).git.sparse_checkout('add', *__sparse_patterns(paths))
+    return True
+
+
+def __sparse_patterns(paths):
+    # Patterns are anchored to the root of the repository, and
+    # match the content of directories.
+    return [f'/{p.strip("/")}' for p in sorted(paths)]
+
+
+def get_referenced_paths(chip, keypaths=None):
+    '''
+    Returns the paths of the files and directories which the chip references
+    in each data source, as {data source: set of paths}.
+
+    Args:
+        keypaths (list): keypaths to search, defaults to all keypaths
+    '''
+    if keypaths is None:
+        keypaths = chip.allkeys()
+
+    referenced = {}
+    for keypath in keypaths:
+        if not chip.valid(*keypath):
+            continue
+        paramtype = chip.get(*keypath, field='type')
+        if 'file' not in paramtype and 'dir' not in paramtype:
+            continue
+
+        for paths, step, index in chip.schema._getvals(*keypath):
+            if not paths:
+                continue
+            packages = chip.get(*keypath, field='package', step=step, index=index)
+            if not paramtype.startswith('['):
+                paths = [paths]
+            for package, path in zip(packages, paths):
+                if package:
+                    referenced.setdefault(package, set()).add(path)
+    return referenced
+
+
+def resolve_packages(chip, packages=None):
+    '''
+    Resolve data sources in parallel, fetching those which are not cached.
+
+    Args:
+        packages (list): names of the data sources, defaults to the data
+            sources which are referenced by files of the chip
+
+    Returns:
+        Dictionary of {data source: path}
+    '''
+    if packages is None:
+        packages = get_referenced_paths(chip).keys()
+    packages = sorted(set(packages))
+    if not packages:
+        return {}
+
+    workers = min(len(packages), FETCH_THREADS)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        paths = executor.map(lambda package: path(chip, package), packages)
+        return dict(zip(packages, paths))
+
+
+def prefetch(chip, packages=None):
+    '''
+    Fetch and verify data sources ahead of a run.
+
+    The data sources are fetched in parallel, and the files which the chip
+    references in them are checked. Cached data sources which pass are
+    recorded in the index of the cache, so that later runs use them without
+    network or git operations.
+
+    Args:
+        packages (list): names of the data sources, defaults to all
+            registered data sources
+
+    Returns:
+        True if all data sources and the files referenced in them were found.
+    '''
+    if packages is None:
+        packages = chip.getkeys('package', 'source')
+    packages = sorted(set(packages))
+    if not packages:
+        return True
+
+    referenced = get_referenced_paths(chip)
+
+    def fetch(package):
+        data_path = path(chip, package)
+        missing = []
+        for relpath in sorted(referenced.get(package, [])):
+            if not os.path.exists(os.path.join(data_path, relpath)):
+                missing.append(relpath)
+        if missing and add_sparse_paths(chip, package, missing):
+            missing = [relpath for relpath in missing
+                       if not os.path.exists(os.path.join(data_path, relpath))]
+        for relpath in missing:
+            chip.logger.error(f'Could not find {relpath} in {package}.')
+        return data_path, not missing
+
+    ok = True
+    verified = {}
+    workers = min(len(packages), FETCH_THREADS)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        fetches = {executor.submit(fetch, package): package for package in packages}
+        for future in concurrent.futures.as_completed(fetches):
+            package = fetches[future]
+            try:
+                data_path, found = future.result()
+            except Exception as e:
+                chip.logger.error(f'Failed to fetch {package} data: {e}')
+                ok = False
+                continue
+            if not found:
+                ok = False
+            elif data_path in __verified_cache:
+                verified[package] = data_path
+
+    # Only data sources in the cache need to be indexed
+    for package, data_path in verified.items():
+        data = {
+            'path': chip._resolve_env_vars(chip.get('package', 'source', package, 'path')),
+            'ref': chip.get('package', 'source', package, 'ref')
+        }
+        __add_to_index(chip, os.path.dirname(data_path), os.path.basename(data_path), data)
+
+    return ok
+
+
+def __read_index(cache_path):
+    try:
+        with open(os.path.join(cache_path, CACHE_INDEX), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def __is_indexed(cache_path, project_id, data):
+    entry = __read_index(cache_path).get(project_id)
+    return entry is not None and \
+        entry.get('path') == data['path'] and entry.get('ref') == data['ref']
+
+
+def __add_to_index(chip, cache_path, project_id, data):
+    index_path = os.path.join(cache_path, CACHE_INDEX)
+    with lock_cache(chip, f'{index_path}.lock', exclusive=True):
+        index = __read_index(cache_path)
+        index[project_id] = {
+            'path': data['path'],
+            'ref': data['ref']
+        }
+        tmp_path = f'{index_path}.{uuid.uuid4().hex}'
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, index_path)
 
 
 def extract_from_url(chip, package, data, data_path):
@@ -171,13 +509,27 @@ def extract_from_url(chip, package, data, data_path):
     response = requests.get(data_url, stream=True, headers=headers)
     if not response.ok:
         chip.error('Failed to download package data source.', fatal=True)
-    file = tarfile.open(fileobj=response.raw, mode='r|gz')
-    file.extractall(path=data_path)
 
-    # Git inserts one folder at the highest level of the tar file
-    # This moves all files one level up
-    shutil.copytree(os.path.join(data_path, os.listdir(data_path)[0]),
-                    data_path, dirs_exist_ok=True, symlinks=True)
+    # Git inserts one folder at the highest level of the tar file,
+    # which is removed while extracting
+    with tarfile.open(fileobj=response.raw, mode='r|gz') as tar:
+        for member in tar:
+            member.name = __strip_component(member.name)
+            if not member.name:
+                continue
+            if member.islnk():
+                member.linkname = __strip_component(member.linkname)
+            if os.path.isabs(member.name) or '..' in member.name.split('/'):
+                raise SiliconCompilerError(f'{package} data contains an invalid path: '
+                                           f'{member.name}')
+            tar.extract(member, path=data_path)
+
+
+def __strip_component(name):
+    parts = name.split('/', 1)
+    if len(parts) < 2:
+        return ''
+    return parts[1]
 
 
 def path_from_python(chip, python_package, append_path=None):
@@ -0,0 +1,146 @@
+import hashlib
+import os
+import re
+import shutil
+
+
+# Name of the content-addressed store of uploaded files inside the server's nfs mount
+STORE_DIR = 'sc_blobs'
+
+# Block size used when hashing files
+BLOCK_SIZE = 1024 * 1024
+
+_DIGEST_RE = re.compile(r'^[0-9a-f]{64}$')
+
+
+def is_digest(digest):
+    '''
+    Returns True if digest is a valid blob digest.
+    '''
+    return isinstance(digest, str) and _DIGEST_RE.match(digest) is not None
+
+
+def new_hash():
+    '''
+    Returns the hash object used to compute blob digests.
+    '''
+    return hashlib.sha256()
+
+
+def hash_file(path):
+    hashobj = new_hash()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(BLOCK_SIZE), b''):
+            hashobj.update(block)
+    return hashobj.hexdigest()
+
+
+def blob_path(store, digest):
+    return os.path.join(store, digest[0:2], digest)
+
+
+def build_manifest(root):
+    '''
+    Describe the contents of a directory by the digests of its files.
+
+    Returns:
+        Dictionary with the 'files' as {relative path: [digest, mode]},
+        the 'links' as {relative path: target} and the empty 'dirs'.
+    '''
+    manifest = {
+        'files': {},
+        'links': {},
+        'dirs': []
+    }
+    for dirpath, dirnames, filenames in os.walk(root):
+        relroot = os.path.relpath(dirpath, root)
+        if relroot != '.' and not dirnames and not filenames:
+            manifest['dirs'].append(relroot)
+        # Symlinks to directories are reported as directories by os.walk
+        for name in dirnames + filenames:
+            path = os.path.join(dirpath, name)
+            relpath = os.path.normpath(os.path.join(relroot, name))
+            if os.path.islink(path):
+                manifest['links'][relpath] = os.readlink(path)
+            elif name in filenames:
+                manifest['files'][relpath] = [hash_file(path), os.stat(path).st_mode & 0o777]
+    return manifest
+
+
+def missing_blobs(store, digests):
+    '''
+    Returns the digests which are not in the store.
+    '''
+    return sorted(set(digest for digest in digests
+                      if not os.path.isfile(blob_path(store, digest))))
+
+
+def add_blob(store, digest, path):
+    '''
+    Move a file into the store, after verifying its content against the digest.
+
+    Args:
+        store (str): path to the store
+        digest (str): expected digest of the content
+        path (str): path to the file, which is removed
+
+    Raises:
+        ValueError: if the content does not match the digest.
+    '''
+    try:
+        if not is_digest(digest):
+            raise ValueError(f'{digest} is not a valid digest')
+        if hash_file(path) != digest:
+            raise ValueError(f'content of {digest} does not match its digest')
+
+        dst = blob_path(store, digest)
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        os.replace(path, dst)
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _safe_path(root, relpath):
+    path = os.path.normpath(os.path.join(root, relpath))
+    if os.path.isabs(relpath) or os.path.commonpath([root, path]) != root:
+        raise ValueError(f'{relpath} is outside of the job directory')
+    return path
+
+
+def materialize(store, manifest, root):
+    '''
+    Recreate a directory described by build_manifest() from the store.
+
+    Files are copied out of the store, so that jobs can not modify the
+    content of a blob shared with other jobs.
+
+    Raises:
+        ValueError: if the manifest is malformed, refers to paths outside of
+            root or to blobs which are not in the store.
+    '''
+    root = os.path.abspath(root)
+    files = manifest.get('files', {})
+
+    for digest, _ in files.values():
+        if not is_digest(digest):
+            raise ValueError(f'{digest} is not a valid digest')
+    missing = missing_blobs(store, [digest for digest, _ in files.values()])
+    if missing:
+        raise ValueError(f'{len(missing)} files have not been uploaded')
+
+    for relpath in manifest.get('dirs', []):
+        os.makedirs(_safe_path(root, relpath), exist_ok=True)
+
+    for relpath, (digest, mode) in files.items():
+        path = _safe_path(root, relpath)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        shutil.copyfile(blob_path(store, digest), path)
+        os.chmod(path, mode & 0o777)
+
+    for relpath, target in manifest.get('links', {}).items():
+        path = _safe_path(root, relpath)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.lexists(path):
+            os.remove(path)
+        os.symlink(target, path)
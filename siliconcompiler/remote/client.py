@@ -1,18 +1,26 @@
 # Copyright 2020 Silicon Compiler Authors. All Rights Reserved.
 
+import concurrent.futures
+import functools
 import glob
+import io
 import json
 import os
+import queue
 import requests
 import shutil
 import time
 import urllib.parse
+import urllib3
 import tarfile
-import tempfile
+import threading
 import multiprocessing
+import uuid
 
 from siliconcompiler import utils, SiliconCompilerError
+from siliconcompiler import archive as sc_archive
 from siliconcompiler._metadata import default_server
+from siliconcompiler.remote import blobs
 from siliconcompiler.schema import Schema
 from siliconcompiler.utils import default_credentials_file
 
@@ -20,9 +28,41 @@ from siliconcompiler.utils import default_credentials_file
 # Client / server timeout
 __timeout = 10
 
+# Number of attempts to complete an interrupted download
+__download_retries = 5
+
+# Size of chunks written while downloading
+__download_chunk_size = 256 * 1024
+
+# Maximum amount of file data sent in a single upload request
+__upload_batch_size = 64 * 1024 * 1024
+
+# Size of chunks read while uploading
+__upload_chunk_size = 256 * 1024
+
+# Number of results which are fetched concurrently
+__fetch_threads = 4
+
+# Retry policy for failed connections and unavailable servers, requests are
+# retried after 0.5, 1, 2, ... seconds
+__request_retries = 5
+__request_backoff = 0.5
+
+# Range of the interval between job progress checks, in seconds
+__poll_interval_min = 2
+__poll_interval_max = 30
+
+# Read timeout of the job event stream, the server sends keep-alive
+# messages more often than this
+__event_timeout = 60
+
 # Multiprocessing interface.
 multiprocessor = multiprocessing.get_context('spawn')
 
+# HTTP sessions shared by all server requests, see _get_session()
+__sessions = {}
+__sessions_pid = None
+
 __tos_str = '''Please review the SiliconCompiler cloud beta's terms of service:
 
 https://www.siliconcompiler.com/terms-of-service
@@ -53,9 +93,58 @@ def get_base_url(chip):
 
 
 ###################################
-def __post(chip, url, post_action, success_action, error_action=None):
+def _get_session(retry=True):
+    '''
+    Returns the HTTP session used to communicate with the server.
+
+    The session keeps connections to the server alive between requests and
+    retries requests which could not reach the server. Sessions are not
+    shared with child processes.
+
+    Args:
+        retry (bool): if False, returns a session which does not retry
+            requests, for requests whose body is a generator, which cannot be
+            sent twice.
+    '''
+    global __sessions, __sessions_pid
+
+    if __sessions_pid != os.getpid():
+        __sessions = {}
+        __sessions_pid = os.getpid()
+
+    if retry not in __sessions:
+        if retry:
+            # Requests which did not reach the server are always retried.
+            # Requests turned away by a gateway are only retried for
+            # idempotent methods, ie. never for POST, to avoid submitting the
+            # same job twice.
+            retries = urllib3.util.Retry(total=__request_retries,
+                                         connect=__request_retries,
+                                         read=0,
+                                         status=__request_retries,
+                                         status_forcelist=(502, 503, 504),
+                                         backoff_factor=__request_backoff,
+                                         raise_on_status=False)
+        else:
+            retries = urllib3.util.Retry(total=0, read=False, raise_on_status=False)
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=__fetch_threads + 2,
+                                                max_retries=retries)
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+
+        __sessions[retry] = session
+
+    return __sessions[retry]
+
+
+###################################
+def __post(chip, url, post_action, success_action, error_action=None, reraise=()):
     '''
     Helper function to handle the post request
+
+    Exceptions in reraise, which the caller handles, are raised rather than
+    reported as fatal errors.
     '''
     redirect_url = urllib.parse.urljoin(get_base_url(chip), url)
 
@@ -69,6 +158,8 @@ def __post(chip, url, post_action, success_action, error_action=None):
                 chip.error('Server communications timed out', fatal=True)
             time.sleep(10)
             continue
+        except reraise:
+            raise
         except Exception as e:
             chip.error(f'Server communications error: {e}', fatal=True)
 
@@ -224,23 +315,31 @@ def _process_progress_info(chip, progress_info, nodes_to_print=3):
     based on information returned from a 'check_progress/' call.
     '''
 
+    completed = []
     try:
-        # Decode response JSON, if possible.
-        job_info = json.loads(progress_info['message'])
+        if progress_info.get('nodes') is not None:
+            # Per-node progress reported by the server
+            job_info = progress_info['nodes']
+        else:
+            # Decode response JSON, if possible.
+            job_info = json.loads(progress_info['message'])
         # Retrieve total elapsed time, if included in the response.
         total_elapsed = ''
-        if 'elapsed_time' in job_info:
-            total_elapsed = f' (runtime: {job_info["elapsed_time"]})'
+        if progress_info.get('elapsed_time'):
+            total_elapsed = f' (runtime: {progress_info["elapsed_time"]})'
+        elif 'elapsed_time' in job_info:
+            total_elapsed = f' (runtime: {job_info.pop("elapsed_time")})'
 
         # Sort and store info about the job's progress.
-        completed = []
         chip.logger.info(f"Job is still running{total_elapsed}. Status:")
         nodes_to_log = {'completed': [], 'failed': [], 'timeout': [],
                         'running': [], 'queued': [], 'pending': []}
         for node, node_info in job_info.items():
             status = node_info['status']
             nodes_to_log[status].append((node, node_info))
-            if (status == 'completed'):
+            # Servers which do not report if results are available, only
+            # have them once the node has completed.
+            if node_info.get('results', status == 'completed'):
                 completed.append(node)
 
         # Log information about the job's progress.
@@ -388,47 +487,178 @@ def remote_run_loop(chip):
 
 ###################################
 def __remote_run_loop(chip):
-    # Check the job's progress periodically until it finishes.
-    is_busy = True
+    # Follow the job's progress until it finishes, fetching the results of
+    # nodes as they become available.
     all_nodes = []
     for (step, index) in chip.nodes_to_execute():
         all_nodes.append(f'{step}{index}')
     completed = []
-    result_procs = []
-    while is_busy:
-        time.sleep(30)
-        new_completed, is_busy = check_progress(chip)
-        nodes_to_fetch = []
-        for node in new_completed:
+    result_fetches = {}
+
+    # Results are fetched in the background while the job is followed
+    with concurrent.futures.ThreadPoolExecutor(max_workers=__fetch_threads) as executor:
+        def fetch_completed(nodes):
+            return __fetch_completed_results(chip, executor, nodes, completed, result_fetches)
+
+        if not __remote_event_loop(chip, fetch_completed):
+            # Server does not stream job events
+            __remote_poll_loop(chip, fetch_completed)
+
+        # Done: try to fetch any node results which still haven't been retrieved.
+        chip.logger.info('Remote job completed! Retrieving final results...')
+        __check_result_fetches(completed, result_fetches)
+        for node in all_nodes:
             if node not in completed:
-                nodes_to_fetch.append(node)
-                completed.append(node)
-        if nodes_to_fetch:
-            chip.logger.info('  Fetching completed results:')
-            for node in nodes_to_fetch:
-                node_proc = multiprocessor.Process(target=fetch_results,
-                                                   args=(chip, node))
-                node_proc.start()
-                result_procs.append(node_proc)
-                chip.logger.info(f'    {node}')
-
-    # Done: try to fetch any node results which still haven't been retrieved.
-    chip.logger.info('Remote job completed! Retrieving final results...')
-    for node in all_nodes:
-        if node not in completed:
-            node_proc = multiprocessor.Process(target=fetch_results,
-                                               args=(chip, node))
-            node_proc.start()
-            result_procs.append(node_proc)
-    # Make sure all results are fetched before letting the client issue
-    # a deletion request.
-    for proc in result_procs:
-        proc.join()
+                result_fetches[node] = executor.submit(fetch_results, chip, node)
+        # Make sure all results are fetched before letting the client issue
+        # a deletion request.
+        concurrent.futures.wait(result_fetches.values())
 
     # Un-set the 'remote' option to avoid from/to-based summary/show errors
     chip.unset('option', 'remote')
 
 
+###################################
+def __remote_poll_loop(chip, fetch_completed):
+    # Check the job's progress periodically until it finishes, polling more
+    # often while the status of the job is changing.
+    is_busy = True
+    interval = __poll_interval_min
+    while is_busy:
+        time.sleep(interval)
+        new_completed, is_busy = check_progress(chip)
+
+        if fetch_completed(new_completed):
+            interval = __poll_interval_min
+        else:
+            interval = min(2 * interval, __poll_interval_max)
+
+
+###################################
+def __remote_event_loop(chip, fetch_completed):
+    '''
+    Follow the job's progress through the server's event stream.
+
+    Returns:
+        False if the server does not provide an event stream or the stream
+        was interrupted, in which case the progress needs to be polled.
+    '''
+
+    def post_action(url):
+        params = __build_post_params(chip,
+                                     job_hash=chip.get('record', 'remoteid'),
+                                     job_name=chip.get('option', 'jobname'))
+        return _get_session().post(url,
+                                   data=json.dumps(params),
+                                   stream=True,
+                                   timeout=(__timeout, __event_timeout))
+
+    def success_action(resp):
+        try:
+            for event, data in _read_events(resp):
+                if event == 'job':
+                    if data['status'] == 'queued':
+                        chip.logger.info('Job is queued on the server.')
+                    elif data['status'] == 'canceled':
+                        chip.logger.info('Job was canceled.')
+                        return True
+                    else:
+                        if data['status'] != 'completed':
+                            chip.logger.warning(f"Job {data['status']} on the server.")
+                        return True
+                elif event == 'node':
+                    node = data['node']
+                    node_log = f"  {node}: {data['status']}"
+                    if data.get('elapsed_time'):
+                        node_log += f" ({data['elapsed_time']})"
+                    chip.logger.info(node_log)
+                    if data['results']:
+                        fetch_completed([node])
+                elif event == 'log':
+                    log_lines = '\n'.join(data['lines'])
+                    chip.logger.info(f"Tail of {data['node']} logfile:\n{log_lines}\n")
+        finally:
+            # Return the connection to the session's pool
+            resp.close()
+
+        # Stream ended before the job completed
+        return False
+
+    def error_action(code, msg):
+        return False
+
+    try:
+        return __post(chip, '/job_events/', post_action, success_action,
+                      error_action=error_action,
+                      reraise=(requests.ConnectionError,
+                               requests.exceptions.ChunkedEncodingError))
+    except (requests.ConnectionError, requests.exceptions.ChunkedEncodingError,
+            requests.Timeout):
+        chip.logger.info('Lost connection to the job event stream, checking progress instead.')
+        return False
+
+
+###################################
+def _read_events(resp):
+    '''
+    Parse a server-sent event stream.
+
+    Returns:
+        Iterator of (event, data) tuples, where data is decoded from JSON.
+    '''
+    resp.encoding = 'utf-8'
+
+    event = None
+    data = []
+    for line in resp.iter_lines(decode_unicode=True):
+        if not line:
+            # Blank line terminates an event
+            if data:
+                yield event or 'message', json.loads('\n'.join(data))
+            event = None
+            data = []
+        elif line.startswith(':'):
+            # Comment, used as keep-alive
+            continue
+        elif line.startswith('event:'):
+            event = line[6:].strip()
+        elif line.startswith('data:'):
+            data.append(line[5:].lstrip())
+
+
+###################################
+def __check_result_fetches(completed, result_fetches):
+    # Retry nodes whose results could not be fetched
+    for node, fetch in list(result_fetches.items()):
+        if fetch.done() and (fetch.exception() or fetch.result()):
+            del result_fetches[node]
+            completed.remove(node)
+
+
+###################################
+def __fetch_completed_results(chip, executor, nodes, completed, result_fetches):
+    '''
+    Start fetching the results of nodes which have not been fetched yet.
+
+    Returns:
+        True if any fetches were started.
+    '''
+    __check_result_fetches(completed, result_fetches)
+
+    nodes_to_fetch = []
+    for node in nodes:
+        if node not in completed:
+            nodes_to_fetch.append(node)
+            completed.append(node)
+    if nodes_to_fetch:
+        chip.logger.info('  Fetching completed results:')
+        for node in nodes_to_fetch:
+            result_fetches[node] = executor.submit(fetch_results, chip, node)
+            chip.logger.info(f'    {node}')
+
+    return bool(nodes_to_fetch)
+
+
 ###################################
 def check_progress(chip):
     try:
@@ -439,6 +669,8 @@ def check_progress(chip):
             completed = _process_progress_info(chip,
                                                is_busy_info)
         return completed, is_busy
+    except SiliconCompilerError:
+        raise
     except Exception:
         # Sometimes an exception is raised if the request library cannot
         # reach the server due to a transient network issue.
@@ -470,6 +702,188 @@ def _update_entry_manifests(chip):
             tmp_schema.write_json(new_manifest)
 
 
+###################################
+def _upload_job_files(chip):
+    '''
+    Helper method to upload the files of the job directory which are not
+    already stored on the server.
+
+    Returns:
+        Manifest describing the job directory, or None if the server does not
+        support content-addressed uploads.
+    '''
+
+    manifest = blobs.build_manifest(chip._getworkdir())
+    paths = {}
+    for relpath, (digest, _) in manifest['files'].items():
+        paths.setdefault(digest, os.path.join(chip._getworkdir(), relpath))
+
+    def post_action(url):
+        post_params = __build_post_params(chip)
+        post_params['blobs'] = sorted(paths.keys())
+        return _get_session().post(url,
+                                   data=json.dumps(post_params),
+                                   timeout=__timeout)
+
+    def success_action(resp):
+        return resp.json()['missing']
+
+    def error_action(code, msg):
+        if code == 404:
+            return None
+        chip.error(f'Server responded with {code}: {msg}', fatal=True)
+
+    missing = __post(chip, '/check_blobs/', post_action, success_action,
+                     error_action=error_action)
+    if missing is None:
+        return None
+
+    upload_size = sum([os.path.getsize(paths[digest]) for digest in missing])
+    chip.logger.info(f'Uploading {len(missing)} of {len(paths)} files '
+                     f'({upload_size / 1024 / 1024:.1f} MB)')
+
+    # Split the upload into batches to limit the size of each request.
+    batches = []
+    batch_size = 0
+    for digest in missing:
+        size = os.path.getsize(paths[digest])
+        if not batches or batch_size + size > __upload_batch_size:
+            batches.append([])
+            batch_size = 0
+        batches[-1].append(digest)
+        batch_size += size
+
+    for batch in batches:
+        parts = [('params', None, json.dumps(__build_post_params(chip)).encode())]
+        for digest in batch:
+            parts.append(('blob', digest, functools.partial(_read_file, paths[digest])))
+
+        def post_action(url):
+            headers, body = _multipart_request(parts)
+            return _get_session(retry=False).post(url,
+                                                  data=body,
+                                                  headers=headers,
+                                                  timeout=__timeout)
+
+        __post(chip, '/upload_blobs/', post_action, lambda resp: None)
+
+    return manifest
+
+
+###################################
+def _multipart_request(parts):
+    '''
+    Helper method to stream the body of a multipart/form-data request, so that
+    large files are sent without loading them into memory or staging them on disk.
+
+    Args:
+        parts (list of tuples): (name, filename, content) of each part, where
+            filename may be None and content is either bytes or a function
+            returning an iterator of bytes
+
+    Returns:
+        Tuple of the request headers and a generator of the request body.
+    '''
+    boundary = uuid.uuid4().hex
+
+    def body():
+        for name, filename, content in parts:
+            header = f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"'
+            if filename:
+                header += f'; filename="{filename}"'
+            header += '\r\nContent-Type: application/octet-stream\r\n\r\n'
+            yield header.encode()
+            if isinstance(content, bytes):
+                yield content
+            else:
+                yield from content()
+            yield b'\r\n'
+        yield f'--{boundary}--\r\n'.encode()
+
+    headers = {'Content-Type': f'multipart/form-data; boundary={boundary}'}
+    return headers, body()
+
+
+###################################
+def _read_file(path):
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(__upload_chunk_size), b''):
+            yield chunk
+
+
+###################################
+def _archive_directory(path):
+    '''
+    Helper method to create a .tar.gz archive of a directory while it is
+    being sent.
+
+    The archive is compressed on a separate thread, only a few chunks are
+    kept in memory at a time.
+
+    Returns:
+        Iterator of the chunks of the archive.
+    '''
+    chunks = queue.Queue(maxsize=4)
+    chunk_size = __upload_chunk_size
+    stopped = threading.Event()
+    error = []
+
+    class ChunkWriter(io.RawIOBase):
+        def __init__(self):
+            super().__init__()
+            self.buffer = bytearray()
+
+        def writable(self):
+            return True
+
+        def write(self, data):
+            self.buffer += data
+            if len(self.buffer) >= chunk_size:
+                self.flush_chunk()
+            return len(data)
+
+        def flush_chunk(self):
+            while not stopped.is_set():
+                try:
+                    chunks.put(bytes(self.buffer), timeout=0.1)
+                    self.buffer.clear()
+                    return
+                except queue.Full:
+                    pass
+            raise RuntimeError('archive is no longer read')
+
+    def create_archive():
+        writer = ChunkWriter()
+        try:
+            with sc_archive.open_archive(writer, mode='w', archive_format='gz') as tar:
+                tar.add(path, arcname='')
+            if writer.buffer:
+                writer.flush_chunk()
+        except Exception as e:
+            error.append(e)
+        finally:
+            while not stopped.is_set():
+                try:
+                    chunks.put(None, timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
+
+    thread = threading.Thread(target=create_archive, daemon=True)
+    thread.start()
+    try:
+        while True:
+            chunk = chunks.get()
+            if chunk is None:
+                break
+            yield chunk
+        if error:
+            raise error[0]
+    finally:
+        stopped.set()
+        thread.join()
+
+
 ###################################
 def _request_remote_run(chip):
     '''
@@ -477,13 +891,11 @@ def _request_remote_run(chip):
     '''
 
     remote_resume = (chip.get('option', 'resume') and chip.get('record', 'remoteid'))
+    upload_manifest = None
     # Only package and upload the entry steps if starting a new job.
     if not remote_resume:
-        upload_file = tempfile.TemporaryFile(prefix='sc', suffix='remote.tar.gz')
-        with tarfile.open(fileobj=upload_file, mode='w:gz') as tar:
-            tar.add(chip._getworkdir(), arcname='')
-        # Flush file to ensure everything is written
-        upload_file.flush()
+        # Files already on the server are not uploaded again.
+        upload_manifest = _upload_job_files(chip)
 
     # Print a reminder for public beta runs.
     default_server_name = urllib.parse.urlparse(default_server).hostname
@@ -512,22 +924,27 @@ def _request_remote_run(chip):
                                       job_hash=chip.get('record', 'remoteid'))
     }
 
-    post_files = {'params': json.dumps(post_params)}
-    if not remote_resume:
-        post_files['import'] = upload_file
-        upload_file.seek(0)
+    if upload_manifest is not None:
+        post_params['files'] = upload_manifest
+
+    parts = [('params', None, json.dumps(post_params).encode())]
+    if not remote_resume and upload_manifest is None:
+        # The server does not support content-addressed uploads, so send an
+        # archive of the job directory, which is created as it is sent.
+        parts.append(('import', 'import.tar.gz',
+                      functools.partial(_archive_directory, chip._getworkdir())))
 
     def post_action(url):
-        return requests.post(url,
-                             files=post_files,
-                             timeout=__timeout)
+        headers, body = _multipart_request(parts)
+        return _get_session(retry=False).post(url,
+                                              data=body,
+                                              headers=headers,
+                                              timeout=__timeout)
 
     def success_action(resp):
         return resp.json()
 
     resp = __post(chip, '/remote_run/', post_action, success_action)
-    if not remote_resume:
-        upload_file.close()
 
     if 'message' in resp and resp['message']:
         chip.logger.info(resp['message'])
@@ -549,11 +966,14 @@ def is_job_busy(chip):
         params = __build_post_params(chip,
                                      job_hash=chip.get('record', 'remoteid'),
                                      job_name=chip.get('option', 'jobname'))
-        return requests.post(url,
-                             data=json.dumps(params),
-                             timeout=__timeout)
+        return _get_session().post(url,
+                                   data=json.dumps(params),
+                                   timeout=__timeout)
 
     def error_action(code, msg):
+        if code == 404:
+            chip.error(f"Job {chip.get('record', 'remoteid')} was not found on the server.",
+                       fatal=True)
         return {
             'busy': True,
             'message': ''
@@ -563,6 +983,7 @@ def is_job_busy(chip):
         # Determine job completion based on response message, or preferably JSON parameter.
         # TODO: Only accept JSON response's "status" field once server changes are rolled out.
         is_busy = ("Job has no running steps." not in resp.text)
+        json_response = None
         try:
             json_response = json.loads(resp.text)
             if ('status' in json_response) and (json_response['status'] == 'completed'):
@@ -570,13 +991,19 @@ def is_job_busy(chip):
             elif ('status' in json_response) and (json_response['status'] == 'canceled'):
                 chip.logger.info('Job was canceled.')
                 is_busy = False
-        except requests.JSONDecodeError:
+            elif ('status' in json_response) and (json_response['status'] == 'failed'):
+                chip.logger.error('Job failed on the server.')
+                is_busy = False
+        except json.JSONDecodeError:
             # Message may have been text-formatted.
             pass
         info = {
             'busy': is_busy,
             'message': resp.text
         }
+        if isinstance(json_response, dict):
+            info['nodes'] = json_response.get('nodes', None)
+            info['elapsed_time'] = json_response.get('elapsed_time', None)
         return info
 
     info = __post(chip,
@@ -600,11 +1027,11 @@ def cancel_job(chip):
     '''
 
     def post_action(url):
-        return requests.post(url,
-                             data=json.dumps(__build_post_params(
-                                 chip,
-                                 job_hash=chip.get('record', 'remoteid'))),
-                             timeout=__timeout)
+        return _get_session().post(url,
+                                   data=json.dumps(__build_post_params(
+                                       chip,
+                                       job_hash=chip.get('record', 'remoteid'))),
+                                   timeout=__timeout)
 
     def success_action(resp):
         return json.loads(resp.text)
@@ -619,11 +1046,11 @@ def delete_job(chip):
     '''
 
     def post_action(url):
-        return requests.post(url,
-                             data=json.dumps(__build_post_params(
-                                 chip,
-                                 job_hash=chip.get('record', 'remoteid'))),
-                             timeout=__timeout)
+        return _get_session().post(url,
+                                   data=json.dumps(__build_post_params(
+                                       chip,
+                                       job_hash=chip.get('record', 'remoteid'))),
+                                   timeout=__timeout)
 
     def success_action(resp):
         return resp.text
@@ -638,6 +1065,9 @@ def fetch_results_request(chip, node, results_path):
     Optional 'node' argument fetches results for only the specified
     flowgraph node (e.g. "floorplan0")
 
+    If the download is interrupted, it is resumed from the last received
+    byte rather than restarted.
+
        Returns:
        * 0 if no error was encountered.
        * [response code] if the results could not be retrieved.
@@ -646,32 +1076,68 @@ def fetch_results_request(chip, node, results_path):
     # Set the request URL.
     job_hash = chip.get('record', 'remoteid')
 
-    # Fetch results archive.
-    with open(results_path, 'wb') as zipf:
-        def post_action(url):
-            post_params = __build_post_params(chip)
-            if node:
-                post_params['node'] = node
-            return requests.post(url,
-                                 data=json.dumps(post_params),
-                                 stream=True,
-                                 timeout=__timeout)
-
-        def success_action(resp):
-            shutil.copyfileobj(resp.raw, zipf)
-            return 0
-
-        def error_action(code, msg):
-            # Results are fetched in parallel, and a failure in one node
-            # does not necessarily mean that the whole job failed.
-            chip.logger.warning(f'Could not fetch results for node: {node}')
-            return 404
-
-        return __post(chip,
-                      f'/get_results/{job_hash}.tar.gz',
-                      post_action,
-                      success_action,
-                      error_action=error_action)
+    # Version of the archive being downloaded, used to ensure a resumed
+    # download continues the same file.
+    etag = None
+
+    def post_action(url):
+        post_params = __build_post_params(chip)
+        if node:
+            post_params['node'] = node
+
+        headers = {}
+        received = os.path.getsize(results_path)
+        if received and etag:
+            headers['Range'] = f'bytes={received}-'
+            headers['If-Range'] = etag
+
+        return _get_session().post(url,
+                                   data=json.dumps(post_params),
+                                   headers=headers,
+                                   stream=True,
+                                   timeout=__timeout)
+
+    def success_action(resp):
+        nonlocal etag
+        etag = resp.headers.get('ETag', None)
+
+        # A full response is sent if the server does not support ranges
+        # or the archive has changed.
+        mode = 'ab' if resp.status_code == 206 else 'wb'
+        with open(results_path, mode) as zipf:
+            for chunk in resp.raw.stream(__download_chunk_size, decode_content=False):
+                zipf.write(chunk)
+        resp.close()
+        return 0
+
+    def error_action(code, msg):
+        # Results are fetched in parallel, and a failure in one node
+        # does not necessarily mean that the whole job failed.
+        chip.logger.warning(f'Could not fetch results for node: {node}')
+        return 404
+
+    # Start with an empty archive
+    open(results_path, 'wb').close()
+
+    interrupted = (requests.ConnectionError, requests.exceptions.ChunkedEncodingError,
+                   urllib3.exceptions.HTTPError)
+    for _ in range(__download_retries):
+        try:
+            return __post(chip,
+                          f'/get_results/{job_hash}.tar.gz',
+                          post_action,
+                          success_action,
+                          error_action=error_action,
+                          reraise=interrupted)
+        except interrupted as e:
+            if not etag:
+                # Server does not allow resuming
+                open(results_path, 'wb').close()
+            chip.logger.warning(f'Download of results for node {node} was interrupted, '
+                                f'resuming: {e}')
+
+    chip.logger.warning(f'Could not fetch results for node: {node}')
+    return 404
 
 
 ###################################
@@ -699,7 +1165,7 @@ def fetch_results(chip, node, results_path=None):
                    f"(Response code: {results_code})", fatal=True)
     if node and results_code:
         # nothing was received no need to unzip
-        return
+        return results_code
 
     # Unzip the results.
     # Unauthenticated jobs get a gzip archive, authenticated jobs get nested archives.
@@ -707,11 +1173,11 @@ def fetch_results(chip, node, results_path=None):
     # Archive contents: server-side build directory. Format:
     # [job_hash]/[design]/[job_name]/[step]/[index]/...
     try:
-        with tarfile.open(results_path, 'r:gz') as tar:
+        with sc_archive.open_archive(results_path, 'r') as tar:
             tar.extractall(path=(node if node else ''))
     except tarfile.TarError as e:
         chip.logger.error(f'Failed to extract data from {results_path}: {e}')
-        return
+        return 1
     finally:
         # Remove the results archive after it is extracted.
         os.remove(results_path)
@@ -731,6 +1197,8 @@ def fetch_results(chip, node, results_path=None):
     if not node:
         chip.logger.info(f"Your job results are located in: {os.path.abspath(chip._getworkdir())}")
 
+    return 0
+
 
 ###################################
 def remote_ping(chip):
@@ -740,9 +1208,9 @@ def remote_ping(chip):
 
     # Make the request and print its response.
     def post_action(url):
-        return requests.post(url,
-                             data=json.dumps(__build_post_params(chip)),
-                             timeout=__timeout)
+        return _get_session().post(url,
+                                   data=json.dumps(__build_post_params(chip)),
+                                   timeout=__timeout)
 
     def success_action(resp):
         return resp.json()
@@ -774,6 +1242,10 @@ def remote_ping(chip):
     chip.logger.info(f'Server status: {server_status}')
     if server_status != 'ready':
         chip.logger.warning('  Status is not "ready", server cannot accept new jobs.')
+    if 'queue' in response_info:
+        queue_info = response_info['queue']
+        chip.logger.info(f"Server load: {queue_info['running']} of {queue_info['max_jobs']} "
+                         f"job slots in use, {queue_info['queued']} jobs queued")
 
     # Print server-side version info.
     version_info = response_info['versions']
@@ -0,0 +1,185 @@
+import sqlite3
+import time
+
+
+# Name of the job queue database inside the server's nfs mount
+DATABASE = 'sc_jobs.sqlite'
+
+# Window over which the average wait time of started jobs is reported, in seconds
+WAIT_TIME_WINDOW = 60 * 60
+
+
+class JobQueue:
+    '''
+    Persistent queue of the jobs submitted to a server.
+
+    Jobs are stored in an SQLite database so that the server can recover
+    queued and interrupted jobs after a restart. Jobs move through the
+    states 'queued', 'running' and finally 'completed' or 'failed'. Running
+    jobs which the server stopped are 'interrupted' until it restarts.
+
+    Args:
+        path (str): path to the database, created if it does not exist
+    '''
+
+    def __init__(self, path):
+        self.path = path
+        self.__db = sqlite3.connect(path)
+        self.__db.row_factory = sqlite3.Row
+        with self.__db:
+            self.__db.execute('''
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_hash TEXT PRIMARY KEY,
+                    username TEXT,
+                    status TEXT NOT NULL,
+                    priority INTEGER NOT NULL DEFAULT 0,
+                    manifest TEXT NOT NULL,
+                    submit_time REAL NOT NULL,
+                    start_time REAL,
+                    end_time REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0
+                )''')
+            self.__db.execute('''
+                CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status)''')
+
+    def close(self):
+        self.__db.close()
+
+    def add(self, job_hash, username, manifest, priority=0):
+        '''
+        Add a job to the queue.
+
+        Args:
+            job_hash (str): ID of the job
+            username (str): user who submitted the job, None if unauthenticated
+            manifest (str): path to the manifest of the job
+            priority (int): jobs with a higher priority are started first
+        '''
+        with self.__db:
+            self.__db.execute(
+                'INSERT INTO jobs (job_hash, username, status, priority, manifest, submit_time) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (job_hash, username, 'queued', priority, manifest, time.time()))
+
+    def get(self, job_hash):
+        '''
+        Returns the record of a job as a dictionary, or None if it is not queued.
+        '''
+        row = self.__db.execute('SELECT * FROM jobs WHERE job_hash = ?', (job_hash,)).fetchone()
+        if row is None:
+            return None
+        return dict(row)
+
+    def remove(self, job_hash):
+        with self.__db:
+            self.__db.execute('DELETE FROM jobs WHERE job_hash = ?', (job_hash,))
+
+    def jobs(self, status):
+        '''
+        Returns the records of jobs with a given status, in submission order.
+        '''
+        rows = self.__db.execute('SELECT * FROM jobs WHERE status = ? ORDER BY submit_time',
+                                 (status,))
+        return [dict(row) for row in rows]
+
+    def next_job(self, user_limit=None):
+        '''
+        Returns the record of the next job to start, or None if no job can be
+        started.
+
+        Jobs are ordered by priority and then by submission time. Jobs of users
+        who already run as many jobs as they are allowed are skipped.
+
+        Args:
+            user_limit (function): called with a username, returns the maximum
+                number of jobs the user may run at once, or None if unlimited
+        '''
+        running = {}
+        for row in self.__db.execute(
+                'SELECT username, COUNT(*) FROM jobs WHERE status = ? GROUP BY username',
+                ('running',)):
+            running[row[0]] = row[1]
+
+        for row in self.__db.execute(
+                'SELECT * FROM jobs WHERE status = ? ORDER BY priority DESC, submit_time',
+                ('queued',)):
+            username = row['username']
+            limit = user_limit(username) if user_limit else None
+            if limit is not None and running.get(username, 0) >= limit:
+                continue
+            return dict(row)
+        return None
+
+    def start(self, job_hash):
+        '''
+        Mark a job as running.
+        '''
+        with self.__db:
+            self.__db.execute(
+                'UPDATE jobs SET status = ?, start_time = ?, attempts = attempts + 1 '
+                'WHERE job_hash = ?',
+                ('running', time.time(), job_hash))
+
+    def finish(self, job_hash, status):
+        '''
+        Mark a job as done.
+
+        Args:
+            job_hash (str): ID of the job
+            status (str): 'completed' or 'failed'
+        '''
+        with self.__db:
+            self.__db.execute(
+                'UPDATE jobs SET status = ?, end_time = ? WHERE job_hash = ?',
+                (status, time.time(), job_hash))
+
+    def interrupt(self, job_hash):
+        '''
+        Mark a running job as interrupted by the server stopping.
+        '''
+        with self.__db:
+            self.__db.execute(
+                'UPDATE jobs SET status = ? WHERE job_hash = ?',
+                ('interrupted', job_hash))
+
+    def requeue_interrupted(self):
+        '''
+        Return jobs which were running when the server stopped to the queue.
+
+        Returns:
+            List of the records of the requeued jobs.
+        '''
+        interrupted = self.jobs('running') + self.jobs('interrupted')
+        with self.__db:
+            self.__db.execute('UPDATE jobs SET status = ? WHERE status IN (?, ?)',
+                              ('queued', 'running', 'interrupted'))
+        return interrupted
+
+    def stats(self):
+        '''
+        Returns queue depth and wait time metrics.
+
+        Wait times are in seconds: 'max_wait_time' is the longest wait of a
+        queued job and 'average_wait_time' is the average time jobs started
+        in the last hour spent in the queue.
+        '''
+        now = time.time()
+
+        counts = {'queued': 0, 'running': 0}
+        for row in self.__db.execute(
+                'SELECT status, COUNT(*) FROM jobs WHERE status IN (?, ?) GROUP BY status',
+                ('queued', 'running')):
+            counts[row[0]] = row[1]
+
+        oldest = self.__db.execute(
+            'SELECT MIN(submit_time) FROM jobs WHERE status = ?', ('queued',)).fetchone()[0]
+        average = self.__db.execute(
+            'SELECT AVG(start_time - submit_time) FROM jobs WHERE start_time >= ?',
+            (now - WAIT_TIME_WINDOW,)).fetchone()[0]
+
+        return {
+            'queued': counts['queued'],
+            'running': counts['running'],
+            'max_wait_time': round(now - oldest, 1) if oldest is not None else 0,
+            'average_wait_time': round(average, 1) if average is not None else 0
+        }
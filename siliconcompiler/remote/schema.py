@@ -43,6 +43,22 @@ def schema_cfg():
                      "api: server.set('option', 'clister', 'slurm')"],
             schelp="""Type of compute cluster to use.""")
 
+    scparam(cfg, ['option', 'maxjobs'],
+            sctype='int',
+            scope='global',
+            defvalue=2,
+            require='all',
+            shorthelp="Maximum number of jobs to run concurrently.",
+            switch="-maxjobs <int>",
+            example=["cli: -maxjobs 4",
+                     "api: server.set('option', 'maxjobs', 4)"],
+            schelp="""
+            Maximum number of jobs to run concurrently. Jobs submitted while
+            this many jobs are running are queued. Queued jobs are started by
+            priority and then in the order they were received, the priority
+            and the number of jobs each user may run at once are set by the
+            'priority' and 'max_jobs' fields of users.json.""")
+
     scparam(cfg, ['option', 'nfsmount'],
             sctype='dir',
             scope='global',
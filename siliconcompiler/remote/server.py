@@ -2,20 +2,53 @@
 
 from aiohttp import web
 import asyncio
+import concurrent.futures
+import copy
+import io
 import json
 import logging as log
+import multiprocessing
 import os
+import psutil
 import re
 import shutil
 import uuid
 import tarfile
 import sys
+import time
 
-from siliconcompiler import Chip, Schema
+from siliconcompiler import Chip, Schema, NodeStatus
+from siliconcompiler import archive as sc_archive
+from siliconcompiler import utils
 from siliconcompiler._metadata import version as sc_version
 from siliconcompiler.schema import SCHEMA_VERSION as sc_schema_version
 from siliconcompiler.remote.schema import ServerSchema
+from siliconcompiler.report.logfile import LogFile
 from siliconcompiler.remote import banner
+from siliconcompiler.remote import blobs
+from siliconcompiler.remote import jobqueue
+
+
+# Size of the chunks used to send result archives
+RESULTS_CHUNK_SIZE = 256 * 1024
+
+# Number of nodes of a job which are archived concurrently
+ARCHIVE_WORKERS = 2
+
+# Interval between checks for new job events, in seconds
+EVENT_INTERVAL = 1
+
+# Minimum interval between log events of a node, in seconds
+LOG_EVENT_INTERVAL = 10
+
+# Interval between keep-alive messages on idle event streams, in seconds
+EVENT_KEEPALIVE_INTERVAL = 15
+
+# Number of log lines sent in log events
+LOG_EVENT_LINES = 10
+
+# Time given to the running jobs to finish when the server stops, in seconds
+JOB_STOP_TIMEOUT = 30
 
 
 class Server:
@@ -45,9 +78,18 @@ class Server:
 
         self.schema = ServerSchema(logger=self.logger)
 
-        # Set up a dictionary to track running jobs.
+        # Set up a dictionary to track queued and running jobs.
         self.sc_jobs = {}
 
+        # User accounts, see run()
+        self.user_keys = {}
+
+        # Executor and persistent queue used to run jobs, see __start_job_runner()
+        self.__job_executor = None
+        self.job_queue = None
+        # {job hash: task}, tasks waiting for the running jobs
+        self.__job_tasks = {}
+
     def run(self):
         if not os.path.exists(self.nfs_mount):
             raise FileNotFoundError(f'{self.nfs_mount} could not be found.')
@@ -72,22 +114,35 @@ class Server:
                     self.user_keys[username] = {
                         'password': mapping['password'],
                         'compute_time': 0,
-                        'bandwidth': 0
+                        'bandwidth': 0,
+                        'priority': 0,
+                        'max_jobs': None
                     }
-                    if 'compute_time' in mapping:
-                        self.user_keys[username]['compute_time'] = mapping['compute_time']
-                    if 'bandwidth' in mapping:
-                        self.user_keys[username]['bandwidth'] = mapping['bandwidth']
+                    for key in ('compute_time', 'bandwidth', 'priority', 'max_jobs'):
+                        if key in mapping:
+                            self.user_keys[username][key] = mapping[key]
             except Exception:
                 self.logger.warning("Could not find well-formatted 'users.json' "
                                     "file in the server's working directory. "
                                     "(User : Key) mappings were not imported.")
 
+        # Start the async server.
+        web.run_app(self._create_app(), port=self.get('option', 'port'))
+
+    def _create_app(self):
+        '''
+        Create the web application serving the server API.
+        '''
         # Create a minimal web server to process the 'remote_run' API call.
         self.app = web.Application()
+        self.app.on_startup.append(self.__start_job_runner)
+        self.app.on_cleanup.append(self.__stop_job_runner)
         self.app.add_routes([
+            web.post('/check_blobs/', self.handle_check_blobs),
+            web.post('/upload_blobs/', self.handle_upload_blobs),
             web.post('/remote_run/', self.handle_remote_run),
             web.post('/check_progress/', self.handle_check_progress),
+            web.post('/job_events/', self.handle_job_events),
             web.post('/check_server/', self.handle_check_server),
             web.post('/delete_job/', self.handle_delete_job),
             web.post('/get_results/{job_hash}.tar.gz', self.handle_get_results),
@@ -98,8 +153,72 @@ class Server:
         # But this is an example server which only implements a minimal API.
         self.app.router.add_static('/get_results/', self.nfs_mount)
 
-        # Start the async server.
-        web.run_app(self.app, port=self.get('option', 'port'))
+        return self.app
+
+    async def __start_job_runner(self, app):
+        # Jobs are run in separate processes so the event loop stays responsive,
+        # additional jobs wait in the job queue for a free slot.
+        self.__job_executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.__max_jobs(),
+            mp_context=multiprocessing.get_context('spawn'))
+
+        self.job_queue = jobqueue.JobQueue(os.path.join(self.nfs_mount, jobqueue.DATABASE))
+
+        # Recover the jobs which were queued or running when the server stopped.
+        # Interrupted jobs are resubmitted and resume from their last completed nodes.
+        interrupted = [job['job_hash'] for job in self.job_queue.requeue_interrupted()]
+        for job in self.job_queue.jobs('queued'):
+            try:
+                chip = Chip('server')
+                chip.read_manifest(job['manifest'])
+            except Exception as e:
+                self.logger.error(f"Unable to recover job {job['job_hash']}: {e}")
+                self.job_queue.finish(job['job_hash'], 'failed')
+                continue
+
+            if job['job_hash'] in interrupted:
+                self.logger.info(f"Resuming interrupted job {job['job_hash']}")
+                chip.set('option', 'resume', True)
+            self.__add_job(chip, job['username'])
+
+        self.__schedule_jobs()
+
+    async def __stop_job_runner(self, app):
+        executor = self.__job_executor
+        # Stop scheduling jobs, the queued jobs run when the server restarts
+        self.__job_executor = None
+        workers = []
+        if executor:
+            workers = list((executor._processes or {}).values())
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        # Give the running jobs some time to finish
+        if self.__job_tasks:
+            await asyncio.wait(list(self.__job_tasks.values()), timeout=JOB_STOP_TIMEOUT)
+
+        # Interrupt the jobs which are still running, they resume from their last
+        # completed nodes when the server restarts
+        tasks = list(self.__job_tasks.values())
+        for job_hash in self.__job_tasks:
+            self.logger.warning(f'Interrupting job {job_hash}')
+            if self.job_queue:
+                self.job_queue.interrupt(job_hash)
+        if self.job_queue:
+            self.job_queue.close()
+            self.job_queue = None
+
+        loop = asyncio.get_running_loop()
+        for worker in workers:
+            try:
+                await loop.run_in_executor(None, utils.terminate_process, worker.pid)
+            except psutil.NoSuchProcess:
+                pass
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def __max_jobs(self):
+        return max(1, self.get('option', 'maxjobs'))
 
     def create_cmdline(self, progname, description=None, switchlist=None, additional_args=None):
         def print_banner():
@@ -117,6 +236,83 @@ class Server:
             print_banner=print_banner,
             logger=self.logger)
 
+    ####################
+    async def handle_check_blobs(self, request):
+        '''
+        API handler for 'check_blobs' requests. Returns the files of a job
+        upload which are not in the server's content-addressed store yet.
+        '''
+
+        # Process input parameters
+        params = await request.json()
+        job_params, response = self.__check_request(params, require_job_hash=False)
+        if response is not None:
+            return response
+
+        digests = params.get('blobs', [])
+        if not isinstance(digests, list) or not all(map(blobs.is_digest, digests)):
+            return self.__response("Error: invalid blob digests.", status=400)
+
+        missing = await asyncio.get_running_loop().run_in_executor(
+            None, blobs.missing_blobs, self.blob_store, digests)
+
+        return web.json_response({'missing': missing})
+
+    ####################
+    async def handle_upload_blobs(self, request):
+        '''
+        API handler for 'upload_blobs' requests. Adds the uploaded files to
+        the server's content-addressed store, each file is sent as a 'blob'
+        part named by the sha256 digest of its content.
+        '''
+
+        loop = asyncio.get_running_loop()
+        job_params = None
+
+        reader = await request.multipart()
+        while True:
+            part = await reader.next()
+            if part is None:
+                break
+
+            if part.name == 'params':
+                job_params, response = self.__check_request(await part.json(),
+                                                            require_job_hash=False)
+                if response is not None:
+                    return response
+
+            elif part.name == 'blob':
+                if job_params is None:
+                    return self.__response("Error: request parameters must be sent first.",
+                                           status=400)
+
+                digest = part.filename
+                if not blobs.is_digest(digest):
+                    return self.__response("Error: invalid blob digest.", status=400)
+
+                # Stage the blob in the store, so it can be moved into place once verified.
+                os.makedirs(self.blob_store, exist_ok=True)
+                tmp_file = os.path.join(self.blob_store, f'{digest}.{uuid.uuid4().hex}')
+                try:
+                    with open(tmp_file, 'wb') as f:
+                        while True:
+                            chunk = await part.read_chunk()
+                            if not chunk:
+                                break
+                            f.write(chunk)
+
+                    await loop.run_in_executor(None, blobs.add_blob,
+                                               self.blob_store, digest, tmp_file)
+                except ValueError as e:
+                    return self.__response(f"Error: {e}.", status=400)
+                finally:
+                    # Delete the staged blob if it was not moved into the store,
+                    # ie. when the client disconnected.
+                    if os.path.exists(tmp_file):
+                        os.remove(tmp_file)
+
+        return self.__response("Files uploaded.")
+
     ####################
     async def handle_remote_run(self, request):
         '''
@@ -124,26 +320,80 @@ class Server:
         a 'Chip.run(...)' method to a compute node using slurm.
         '''
 
+        loop = asyncio.get_running_loop()
+
         # Temporary file path to store streamed data.
         tmp_file = os.path.join(self.nfs_mount, uuid.uuid4().hex)
 
+        chip = None
+        job_root = None
+        job_dir = None
+        job_files = None
+        job_extracted = False
+
+        def discard_upload():
+            # Remove the files of a rejected or interrupted upload.
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+            if job_root:
+                shutil.rmtree(job_root, ignore_errors=True)
+
         # Set up a multipart reader to read in the large file, and param data.
         reader = await request.multipart()
         while True:
             # Get the next part; if it doesn't exist, we're done.
-            part = await reader.next()
+            try:
+                part = await reader.next()
+            except BaseException:
+                # The client disconnected
+                discard_upload()
+                raise
             if part is None:
                 break
 
-            # Save the initial 'import' step archive. Note: production server
+            # Extract the initial 'import' step archive. Note: production server
             # implementations may want to encrypt data before storing it on disk.
             if part.name == 'import':
-                with open(tmp_file, 'wb') as f:
-                    while True:
-                        chunk = await part.read_chunk()
-                        if not chunk:
-                            break
-                        f.write(chunk)
+                if chip:
+                    # Extract the archive while it is received.
+                    stream = _UploadStream(loop)
+                    extraction = loop.run_in_executor(None, _extract_stream, stream, job_dir)
+                    try:
+                        while True:
+                            chunk = await part.read_chunk()
+                            if not chunk:
+                                break
+                            await stream.feed(chunk)
+                    except BaseException:
+                        # The client disconnected, stop the extraction before
+                        # removing the job.
+                        stream.abort()
+                        try:
+                            await extraction
+                        except Exception:
+                            pass
+                        discard_upload()
+                        raise
+                    await stream.feed(b'')
+                    try:
+                        await extraction
+                    except (tarfile.TarError, EOFError, OSError) as e:
+                        discard_upload()
+                        return self.__response(f"Error: invalid archive: {e}.", status=400)
+                    job_extracted = True
+                else:
+                    # Parameters are needed to know where to extract the archive,
+                    # so save it until they are received.
+                    try:
+                        with open(tmp_file, 'wb') as f:
+                            while True:
+                                chunk = await part.read_chunk()
+                                if not chunk:
+                                    break
+                                f.write(chunk)
+                    except BaseException:
+                        discard_upload()
+                        raise
 
             # Retrieve JSON request parameters.
             elif part.name == 'params':
@@ -151,42 +401,58 @@ class Server:
                 params = await part.json()
 
                 if 'chip_cfg' not in params:
+                    discard_upload()
                     return self.__response('Manifest not provided.', status=400)
-                chip_cfg = params['chip_cfg']
-
-        # Process input parameters
-        job_params, response = self.__check_request(params['params'],
-                                                    require_job_hash=False)
-        if response is not None:
-            return response
-
-        # Create a dummy Chip object to make schema traversal easier.
-        # TODO: if this is a dummy Chip we should be able to use Schema class,
-        # but looks like it relies on chip.status.
-        # start with a dummy name, as this will be overwritten
-        chip = Chip('server')
-        # Add provided schema
-        chip.schema = Schema(cfg=chip_cfg)
-
-        # Fetch some common values.
-        design = chip.design
-        job_name = chip.get('option', 'jobname')
-        job_hash = uuid.uuid4().hex
-        chip.set('record', 'remoteid', job_hash)
-
-        # Ensure that the job's root directory exists.
-        job_root = os.path.join(self.nfs_mount, job_hash)
-        job_dir = os.path.join(job_root, design, job_name)
-        os.makedirs(job_dir, exist_ok=True)
-
-        # Move the uploaded archive and un-zip it.
-        # (Contents will be encrypted for authenticated jobs)
-        with tarfile.open(tmp_file, "r:gz") as tar:
-            tar.extractall(path=job_dir)
 
-        # Delete the temporary file if it still exists.
-        if os.path.exists(tmp_file):
-            os.remove(tmp_file)
+                # Process input parameters
+                job_params, response = self.__check_request(params['params'],
+                                                            require_job_hash=False)
+                if response is not None:
+                    discard_upload()
+                    return response
+
+                # Files which were uploaded to the blob store, see handle_check_blobs()
+                job_files = params.get('files')
+
+                # Create a dummy Chip object to make schema traversal easier.
+                # TODO: if this is a dummy Chip we should be able to use Schema class,
+                # but looks like it relies on chip.status.
+                # start with a dummy name, as this will be overwritten
+                chip = Chip('server')
+                # Add provided schema
+                chip.schema = Schema(cfg=params['chip_cfg'])
+
+                # Fetch some common values.
+                design = chip.design
+                job_name = chip.get('option', 'jobname')
+                job_hash = uuid.uuid4().hex
+                chip.set('record', 'remoteid', job_hash)
+
+                # Ensure that the job's root directory exists.
+                job_root = os.path.join(self.nfs_mount, job_hash)
+                job_dir = os.path.join(job_root, design, job_name)
+                os.makedirs(job_dir, exist_ok=True)
+
+        if not chip:
+            discard_upload()
+            return self.__response('Manifest not provided.', status=400)
+
+        if job_files is not None:
+            # Copy the job's files out of the blob store.
+            try:
+                await loop.run_in_executor(
+                    None, blobs.materialize, self.blob_store, job_files, job_dir)
+            except (ValueError, TypeError, AttributeError) as e:
+                discard_upload()
+                return self.__response(f"Error: {e}.", status=400)
+        elif not job_extracted:
+            # Move the uploaded archive and un-zip it.
+            # (Contents will be encrypted for authenticated jobs)
+            try:
+                await loop.run_in_executor(None, _extract_upload, tmp_file, job_dir)
+            except (tarfile.TarError, EOFError, OSError) as e:
+                discard_upload()
+                return self.__response(f"Error: invalid archive: {e}.", status=400)
 
         # Create the working directory for the given 'job hash' if necessary.
         chip.set('option', 'builddir', job_root)
@@ -196,9 +462,15 @@ class Server:
 
         # Write JSON config to shared compute storage.
         os.makedirs(os.path.join(job_root, 'configs'), exist_ok=True)
+        manifest = os.path.join(job_root, 'configs', f'chip{job_name}.json')
+        await loop.run_in_executor(None, chip.write_manifest, manifest)
 
-        # Run the job with the configured clustering option. (Non-blocking)
-        asyncio.ensure_future(self.remote_sc(chip, job_params['username']))
+        # Queue the job, it is run with the configured clustering option once
+        # a job slot is available. (Non-blocking)
+        username = job_params['username']
+        self.job_queue.add(job_hash, username, manifest, priority=self.__user_priority(username))
+        self.__add_job(chip, username)
+        self.__schedule_jobs()
 
         # Return a response to the client.
         return web.json_response({'message': f"Starting job: {job_hash}",
@@ -221,23 +493,19 @@ class Server:
         job_hash = job_params['job_hash']
         node = job_params['node'] if 'node' in job_params else ''
 
-        resp = web.StreamResponse(
-            status=200,
-            reason='OK',
+        zipfn = os.path.join(self.nfs_mount, job_hash, f'{job_hash}_{node}.tar.gz')
+        if not os.path.isfile(zipfn):
+            return self.__response('Results not found.', status=404)
+
+        # Stream the archive from disk, this also handles Range requests
+        # so interrupted downloads can be resumed.
+        return web.FileResponse(
+            zipfn,
+            chunk_size=RESULTS_CHUNK_SIZE,
             headers={
                 'Content-Type': 'application/x-tar',
                 'Content-Disposition': f'attachment; filename="{job_hash}_{node}.tar.gz"'
-            },
-        )
-        await resp.prepare(request)
-
-        zipfn = os.path.join(self.nfs_mount, job_hash, f'{job_hash}_{node}.tar.gz')
-        with open(zipfn, 'rb') as zipf:
-            await resp.write(zipf.read())
-
-        await resp.write_eof()
-
-        return resp
+            })
 
     ####################
     async def handle_delete_job(self, request):
@@ -265,6 +533,8 @@ class Server:
         build_dir = os.path.join(self.nfs_mount, job_hash)
         check_dir = os.path.dirname(build_dir)
         if check_dir == self.nfs_mount:
+            self.job_queue.remove(job_hash)
+
             if os.path.exists(build_dir):
                 shutil.rmtree(build_dir)
 
@@ -277,10 +547,10 @@ class Server:
     ####################
     async def handle_check_progress(self, request):
         '''
-        API handler for the 'check progress' endpoint. Currently,
-        It only returns a response containing a 'still running', 'done', or
-        'not found' message. In the future, it can respond with up-to-date
-        information about the job's progress and intermediary outputs.
+        API handler for the 'check progress' endpoint. Returns the status of
+        the job, and for running jobs, the status, runtime and metrics of each
+        flowgraph node. Jobs which are done report their final status, ie.
+        'completed' or 'failed'.
         '''
 
         # Process input parameters
@@ -292,19 +562,122 @@ class Server:
         username = job_params['username']
 
         # Determine if the job is running.
-        # TODO: Return information about individual flowgraph nodes.
-        if "%s%s" % (username, job_hash) in self.sc_jobs:
+        job = self.sc_jobs.get(self.__job_name(username, job_hash))
+        if job and job['status'] == 'queued':
+            resp = {
+                'status': 'queued',
+                'message': 'Job is queued on the server.',
+            }
+        elif job:
             resp = {
                 'status': 'running',
                 'message': 'Job is currently running on the server.',
+                'elapsed_time': _format_elapsed(time.time() - job['start_time']),
+                'nodes': await asyncio.get_running_loop().run_in_executor(
+                    None, _get_node_progress, job['chip'], job['manifests'])
             }
         else:
+            record = self.__job_record(username, job_hash)
+            if not record:
+                return self.__response('Job not found.', status=404)
             resp = {
-                'status': 'completed',
+                'status': record['status'],
                 'message': 'Job has no running steps.',
             }
         return web.json_response(resp)
 
+    ####################
+    async def handle_job_events(self, request):
+        '''
+        API handler for the 'job events' endpoint. Streams the progress of a
+        job as server-sent events until the job is done:
+
+        * 'job': status of the job, sent when the job is queued and when it
+          is done, with its final status, ie. 'completed' or 'failed'.
+        * 'node': status, metrics and availability of results of a node,
+          sent whenever they change.
+        * 'log': last lines of the log of a running node.
+        '''
+
+        # Process input parameters
+        job_params, response = self.__check_request(await request.json())
+        if response is not None:
+            return response
+
+        job_hash = job_params['job_hash']
+        username = job_params['username']
+        sc_job_name = self.__job_name(username, job_hash)
+
+        if sc_job_name not in self.sc_jobs and not self.__job_record(username, job_hash):
+            return self.__response('Job not found.', status=404)
+
+        resp = web.StreamResponse(
+            status=200,
+            reason='OK',
+            headers={
+                'Content-Type': 'text/event-stream',
+                'Cache-Control': 'no-cache'
+            },
+        )
+        await resp.prepare(request)
+
+        async def send(event, data):
+            await resp.write(f'event: {event}\ndata: {json.dumps(data)}\n\n'.encode())
+
+        loop = asyncio.get_running_loop()
+        sent_queued = False
+        node_states = {}
+        log_states = {}
+        last_message = time.time()
+        last_job = None
+        try:
+            while True:
+                job = self.sc_jobs.get(sc_job_name)
+
+                if job and job['status'] == 'queued':
+                    if not sent_queued:
+                        await send('job', {'status': 'queued'})
+                        sent_queued = True
+                        last_message = time.time()
+                elif job or last_job:
+                    # Once the job is done, report the final state of its nodes
+                    if job:
+                        last_job = job
+                    nodes = await loop.run_in_executor(
+                        None, _get_node_progress, last_job['chip'], last_job['manifests'])
+                    for node, info in nodes.items():
+                        # Elapsed time changes continuously, so it does not trigger events
+                        state = {key: value for key, value in info.items()
+                                 if key != 'elapsed_time'}
+                        if node_states.get(node) != state:
+                            node_states[node] = state
+                            await send('node', {'node': node, **info})
+                            last_message = time.time()
+
+                    for node, lines in (await loop.run_in_executor(
+                            None, _get_log_tails, last_job['chip'], nodes, log_states)).items():
+                        await send('log', {'node': node, 'lines': lines})
+                        last_message = time.time()
+
+                if not job:
+                    # Report the final status of the job from its record, which
+                    # is gone if the job was deleted meanwhile
+                    record = self.__job_record(username, job_hash)
+                    await send('job', {'status': record['status'] if record else 'unknown'})
+                    break
+
+                if time.time() - last_message > EVENT_KEEPALIVE_INTERVAL:
+                    await resp.write(b': keep-alive\n\n')
+                    last_message = time.time()
+
+                await asyncio.sleep(EVENT_INTERVAL)
+        except ConnectionResetError:
+            # Client disconnected
+            return resp
+
+        await resp.write_eof()
+        return resp
+
     ####################
     async def handle_check_server(self, request):
         '''
@@ -325,6 +698,12 @@ class Server:
             },
         }
 
+        # Report the load of the server.
+        resp['queue'] = {
+            **self.job_queue.stats(),
+            'max_jobs': self.__max_jobs()
+        }
+
         username = job_params['username']
         if username:
             resp['user_info'] = {
@@ -335,51 +714,100 @@ class Server:
         return web.json_response(resp)
 
     ####################
-    async def remote_sc(self, chip, username):
+    def __add_job(self, chip, username):
         '''
-        Async method to delegate an '.run()' command to a host,
-        and send an email notification when the job completes.
+        Track a job which is in the job queue.
         '''
-
-        # Assemble core job parameters.
         job_hash = chip.get('record', 'remoteid')
-        job_nameid = chip.get('option', 'jobname')
+        self.sc_jobs[self.__job_name(username, job_hash)] = {
+            'status': 'queued',
+            'chip': chip,
+            'username': username,
+            'start_time': None,
+            # Cache of node manifests read while reporting progress
+            'manifests': {}
+        }
 
-        # Mark the job run as busy.
-        if username:
-            sc_job_name = f'{username}_{job_hash}_{job_nameid}'
-        else:
-            sc_job_name = f'{job_hash}_{job_nameid}'
-        self.sc_jobs[sc_job_name] = 'busy'
+    def __schedule_jobs(self):
+        '''
+        Start queued jobs while job slots are available.
+        '''
+        if not self.__job_executor:
+            # The server is stopping
+            return
+
+        running = len([job for job in self.sc_jobs.values() if job['status'] == 'busy'])
+        while running < self.__max_jobs():
+            record = self.job_queue.next_job(user_limit=self.__user_max_jobs)
+            if not record:
+                break
 
-        build_dir = os.path.join(self.nfs_mount, job_hash)
-        chip.set('option', 'builddir', build_dir)
-        chip.set('option', 'remote', False)
+            job = self.sc_jobs[self.__job_name(record['username'], record['job_hash'])]
+            self.job_queue.start(record['job_hash'])
+            job['status'] = 'busy'
+            job['start_time'] = time.time()
+            running += 1
 
-        os.makedirs(os.path.join(build_dir, 'configs'), exist_ok=True)
-        chip.write_manifest(f"{build_dir}/configs/chip{chip.get('option', 'jobname')}.json")
+            self.__job_tasks[record['job_hash']] = asyncio.ensure_future(
+                self.remote_sc(job['chip'], record['username']))
 
-        if self.get('option', 'cluster') == 'slurm':
-            # Run the job with slurm clustering.
-            chip.set('option', 'scheduler', 'name', 'slurm')
+    def __user_priority(self, username):
+        if username in self.user_keys:
+            return self.user_keys[username]['priority']
+        return 0
 
-        # Run the job.
-        chip.run()
+    def __user_max_jobs(self, username):
+        if username in self.user_keys:
+            return self.user_keys[username]['max_jobs']
+        return None
 
-        # Archive each task.
-        for (step, index) in chip.nodes_to_execute():
-            chip.cwd = os.path.join(chip.get('option', 'builddir'), '..')
-            tf = tarfile.open(os.path.join(self.nfs_mount,
-                                           job_hash,
-                                           f'{job_hash}_{step}{index}.tar.gz'),
-                              mode='w:gz')
-            chip._archive_node(tf, step=step, index=index)
-            tf.close()
+    ####################
+    async def remote_sc(self, chip, username):
+        '''
+        Async method to delegate an '.run()' command to a host,
+        and send an email notification when the job completes.
+        '''
 
-        # (Email notifications can be sent here using your preferred API)
+        # Assemble core job parameters.
+        job_hash = chip.get('record', 'remoteid')
+        sc_job_name = self.__job_name(username, job_hash)
+
+        status = 'failed'
+        try:
+            # Run the job without blocking the event loop.
+            await asyncio.get_running_loop().run_in_executor(
+                self.__job_executor,
+                _run_job,
+                chip,
+                os.path.join(self.nfs_mount, job_hash),
+                self.get('option', 'cluster'))
+            status = 'completed'
+        except Exception as e:
+            self.logger.error(f'Job {job_hash} failed: {e}')
+        finally:
+            # (Email notifications can be sent here using your preferred API)
+
+            # Mark the job hash as being done, unless the server is stopping.
+            self.__job_tasks.pop(job_hash, None)
+            if self.job_queue:
+                self.job_queue.finish(job_hash, status)
+                self.sc_jobs.pop(sc_job_name)
+                self.__schedule_jobs()
+
+    def __job_record(self, username, job_hash):
+        '''
+        Returns the record of a job of a user in the job queue, or None if
+        the server does not know the job.
+        '''
+        record = self.job_queue.get(job_hash) if self.job_queue else None
+        if record and record['username'] != username:
+            return None
+        return record
 
-        # Mark the job hash as being done.
-        self.sc_jobs.pop(sc_job_name)
+    def __job_name(self, username, job_hash):
+        if username:
+            return f'{username}_{job_hash}'
+        return job_hash
 
     ####################
     def __auth_password(self, username, password):
@@ -438,6 +866,10 @@ class Server:
         # Ensure that NFS mounting path is absolute.
         return os.path.abspath(self.get('option', 'nfsmount'))
 
+    @property
+    def blob_store(self):
+        return os.path.join(self.nfs_mount, blobs.STORE_DIR)
+
     def get(self, *keypath, field='value'):
         return self.schema.get(*keypath, field=field)
 
@@ -453,3 +885,261 @@ class Server:
     def write_configuration(self, filepath):
         with open(filepath, 'w') as f:
             self.schema.write_json(f)
+
+
+class _UploadStream(io.RawIOBase):
+    '''
+    Readable file object over the chunks of an upload, so that the upload can be
+    processed on a worker thread while it is received by the event loop.
+
+    The event loop passes chunks to feed(), which waits while the worker is
+    behind to bound memory usage, and an empty chunk at the end of the upload.
+    '''
+
+    def __init__(self, loop, max_chunks=16):
+        super().__init__()
+        self.__loop = loop
+        self.__chunks = asyncio.Queue(maxsize=max_chunks)
+        self.__buffer = memoryview(b'')
+        self.__eof = False
+        self.__done = False
+
+    async def feed(self, chunk):
+        if not self.__done:
+            await self.__chunks.put(chunk)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self.__buffer:
+            if self.__eof:
+                return 0
+            chunk = asyncio.run_coroutine_threadsafe(self.__chunks.get(), self.__loop).result()
+            if not chunk:
+                self.__eof = True
+            self.__buffer = memoryview(chunk)
+
+        size = min(len(buffer), len(self.__buffer))
+        buffer[:size] = self.__buffer[:size]
+        self.__buffer = self.__buffer[size:]
+        return size
+
+    def abort(self):
+        '''
+        Ends the upload early, ie. when the client disconnected, so that the
+        worker stops waiting for chunks which will never be received. Called
+        from the event loop.
+        '''
+        self.__discard()
+        self.__chunks.put_nowait(b'')
+
+    def close(self):
+        # Stop waiting for the worker once it no longer reads, ie. when it
+        # failed or the archive has trailing padding.
+        if not self.closed:
+            self.__loop.call_soon_threadsafe(self.__discard)
+        super().close()
+
+    def __discard(self):
+        self.__done = True
+        while not self.__chunks.empty():
+            self.__chunks.get_nowait()
+
+
+def _extract_stream(stream, job_dir):
+    '''
+    Extract a job archive from a stream.
+    '''
+    try:
+        with sc_archive.open_archive(stream, 'r') as tar:
+            tar.extractall(path=job_dir)
+    finally:
+        stream.close()
+
+
+def _extract_upload(tmp_file, job_dir):
+    '''
+    Extract an uploaded job archive and remove it.
+    '''
+    try:
+        with tarfile.open(tmp_file, "r:gz") as tar:
+            tar.extractall(path=job_dir)
+    finally:
+        # Delete the temporary file if it still exists.
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+
+def _run_job(chip, build_dir, cluster):
+    '''
+    Run a job and archive the results of each node.
+
+    Nodes are archived in the background as soon as they succeed, so their
+    results can be downloaded while the rest of the job is running.
+
+    This is executed in a worker process of the server.
+    '''
+    job_hash = chip.get('record', 'remoteid')
+
+    chip.set('option', 'builddir', build_dir)
+    chip.set('option', 'remote', False)
+
+    os.makedirs(os.path.join(build_dir, 'configs'), exist_ok=True)
+    chip.write_manifest(f"{build_dir}/configs/chip{chip.get('option', 'jobname')}.json")
+
+    if cluster == 'slurm':
+        # Run the job with slurm clustering.
+        chip.set('option', 'scheduler', 'name', 'slurm')
+
+    # Archives are paths relative to the job's root directory, the archiving
+    # chip is separate to leave the working directory of the run unchanged.
+    archive_chip = copy.deepcopy(chip)
+    archive_chip.cwd = os.path.join(build_dir, '..')
+
+    archived = set()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=ARCHIVE_WORKERS) as executor:
+        def archive_node(step, index, status):
+            if status == NodeStatus.SUCCESS:
+                archived.add((step, index))
+                executor.submit(_archive_node, archive_chip, job_hash, step, index)
+
+        chip._add_node_callback(archive_node)
+
+        try:
+            # Run the job.
+            chip.run()
+        finally:
+            # Archive nodes which were not run by this job, ie. when resuming.
+            for (step, index) in chip.nodes_to_execute():
+                if (step, index) not in archived and \
+                        os.path.isdir(chip._getworkdir(step=step, index=index)):
+                    executor.submit(_archive_node, archive_chip, job_hash, step, index)
+
+
+def _archive_node(chip, job_hash, step, index):
+    '''
+    Archive the results of a node next to the job's directory.
+    '''
+    build_dir = chip.get('option', 'builddir')
+    archive = os.path.join(build_dir, f'{job_hash}_{step}{index}.tar.gz')
+
+    # The archive is only visible to clients once it is complete.
+    tmp_archive = f'{archive}.{uuid.uuid4().hex}'
+    try:
+        with sc_archive.open_archive(tmp_archive,
+                                     mode='w',
+                                     archive_format='gz',
+                                     threads=os.cpu_count()) as tf:
+            chip._archive_node(tf, step=step, index=index)
+        os.replace(tmp_archive, archive)
+    except Exception as e:
+        chip.logger.error(f'Failed to archive {step}{index}: {e}')
+    finally:
+        if os.path.exists(tmp_archive):
+            os.remove(tmp_archive)
+
+
+def _format_elapsed(seconds):
+    hours, seconds = divmod(int(seconds), 3600)
+    minutes, seconds = divmod(seconds, 60)
+    return f'{hours:02}:{minutes:02}:{seconds:02}'
+
+
+def _get_node_progress(chip, manifests):
+    '''
+    Collect the status of each node of a running job from its work directory.
+
+    Args:
+        chip (Chip): chip of the job
+        manifests (dict): cache of node manifests, keyed by path, which
+            is updated when a manifest changes.
+
+    Returns:
+        Dictionary of {node: {'status', 'elapsed_time', 'metrics', 'results'}}
+    '''
+    flow = chip.get('option', 'flow')
+    job_hash = chip.get('record', 'remoteid')
+
+    nodes = {}
+    for step, index in chip.nodes_to_execute():
+        node = f'{step}{index}'
+        workdir = chip._getworkdir(step=step, index=index)
+        manifest = os.path.join(workdir, 'outputs', f'{chip.design}.pkg.json')
+
+        node_schema = None
+        if os.path.isfile(manifest):
+            mtime = os.path.getmtime(manifest)
+            if manifest in manifests and manifests[manifest][0] == mtime:
+                node_schema = manifests[manifest][1]
+            else:
+                try:
+                    node_schema = Schema(manifest=manifest)
+                    manifests[manifest] = (mtime, node_schema)
+                except Exception:
+                    # Manifest is still being written
+                    pass
+
+        info = {}
+        if node_schema:
+            status = node_schema.get('flowgraph', flow, step, index, 'status')
+            info['status'] = 'completed' if status == NodeStatus.SUCCESS else 'failed'
+            metrics = {}
+            for metric in node_schema.getkeys('metric'):
+                value = node_schema.get('metric', metric, step=step, index=index)
+                if value is not None:
+                    metrics[metric] = value
+            info['metrics'] = metrics
+            if 'tasktime' in metrics:
+                info['elapsed_time'] = _format_elapsed(metrics['tasktime'])
+        elif os.path.isdir(workdir):
+            info['status'] = 'running'
+            # Inputs are staged when the node starts
+            start_dir = os.path.join(workdir, 'inputs')
+            if not os.path.isdir(start_dir):
+                start_dir = workdir
+            info['elapsed_time'] = _format_elapsed(time.time() - os.path.getmtime(start_dir))
+        else:
+            info['status'] = 'pending'
+
+        info['results'] = os.path.isfile(
+            os.path.join(chip.get('option', 'builddir'), f'{job_hash}_{node}.tar.gz'))
+
+        nodes[node] = info
+
+    return nodes
+
+
+def _get_log_tails(chip, nodes, log_states):
+    '''
+    Collect the end of the logs of running nodes which have grown.
+
+    Args:
+        chip (Chip): chip of the job
+        nodes (dict): node progress, see _get_node_progress()
+        log_states (dict): size and time of the last tail of each log, which
+            is updated when a tail is returned.
+
+    Returns:
+        Dictionary of {node: [lines]}
+    '''
+    tails = {}
+    for step, index in chip.nodes_to_execute():
+        node = f'{step}{index}'
+        if node not in nodes or nodes[node]['status'] != 'running':
+            continue
+
+        logfile = os.path.join(chip._getworkdir(step=step, index=index), f'{step}.log')
+        if not os.path.isfile(logfile):
+            continue
+
+        size = os.path.getsize(logfile)
+        last_size, last_time = log_states.get(node, (0, 0))
+        if size == last_size or time.time() - last_time < LOG_EVENT_INTERVAL:
+            continue
+
+        with LogFile(logfile, cache=False) as log:
+            tails[node] = log.tail(LOG_EVENT_LINES)
+        log_states[node] = (size, time.time())
+
+    return tails
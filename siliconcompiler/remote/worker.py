@@ -0,0 +1,329 @@
+# Copyright 2024 Silicon Compiler Authors. All Rights Reserved.
+
+from aiohttp import web
+import aiohttp
+import asyncio
+import hmac
+import logging as log
+import os
+import socket
+import subprocess
+import sys
+import time
+import uuid
+
+import psutil
+
+from siliconcompiler import utils
+from siliconcompiler._metadata import version as sc_version
+from siliconcompiler.scheduler.worker import DEFAULT_PORT, TOKEN_HEADER, WORKER_TIMEOUT, _fits
+
+
+# Interval between registrations of a worker with its coordinator, in seconds
+REGISTER_INTERVAL = 2
+
+# Interval between checks of whether the jobs of a worker ended, in seconds
+JOB_POLL_INTERVAL = 0.5
+
+
+class Worker:
+    """
+    Daemon which runs the nodes dispatched by the 'worker' scheduler.
+
+    A worker advertises its cores and memory, and runs the scripts of
+    deferred nodes as local processes. Workers do not transfer any files:
+    the build directory must be on storage shared by the workers and the
+    hosts running flows, and the results of a node land there.
+
+    Workers register with a coordinator, which keeps the list of workers
+    available to the scheduler. A worker which is not given a coordinator
+    is itself the coordinator of the pool.
+
+    Workers run any script they are sent, so they only accept requests which
+    carry the token shared by the pool, and only listen on localhost unless
+    another host is given.
+
+    Args:
+        token (str): token shared by the workers of the pool and the flows
+            which use them
+        host (str): interface to listen on, ie. '0.0.0.0' for all interfaces
+        address (str): host name under which the worker is reachable,
+            defaults to host, or to the host name of the machine if the
+            worker listens on all interfaces
+        port (int): port to serve on
+        coordinator (str): host:port of the coordinator to register with
+        cores (int): number of cores to advertise, defaults to the number of
+            cores of the machine
+        memory (int): memory to advertise, in MB, defaults to the memory of
+            the machine
+        loglevel (str): level of the log messages
+    """
+
+    def __init__(self, token, host='localhost', address=None, port=DEFAULT_PORT,
+                 coordinator=None, cores=None, memory=None, loglevel="INFO"):
+        if not token:
+            raise ValueError('A token is required to run a worker')
+
+        self.logger = log.getLogger(f'sc_worker_{id(self)}')
+        handler = log.StreamHandler(stream=sys.stdout)
+        formatter = log.Formatter('%(asctime)s | %(levelname)-8s | %(message)s')
+        handler.setFormatter(formatter)
+        self.logger.addHandler(handler)
+        self.logger.setLevel(loglevel)
+
+        if not address:
+            address = host if host not in ('', '0.0.0.0', '::') else socket.gethostname()
+        self.address = f'{address}:{port}'
+        self.host = host
+        self.port = port
+        self.__token = token
+        self.coordinator = coordinator
+        self.cores = cores or os.cpu_count() or 1
+        self.memory = memory or psutil.virtual_memory().total // (1024 * 1024)
+
+        # {job ID: job}
+        self.__jobs = {}
+        self.__completed = 0
+
+        # Workers registered with this worker as their coordinator,
+        # {address: (status, time of registration)}
+        self.__workers = {}
+
+        # Tasks waiting for the jobs to end
+        self.__waiters = set()
+
+        self.__register_task = None
+        self.__changed = None
+
+    def run(self):
+        self.logger.info(f"Running worker {self.address} with {self.cores} cores and "
+                         f"{self.memory} MB")
+        web.run_app(self._create_app(), host=self.host, port=self.port, print=None)
+
+    def _create_app(self):
+        '''
+        Create the web application serving the worker and coordinator API.
+        '''
+        app = web.Application(middlewares=[self.__authenticate])
+        app.on_startup.append(self.__start_registration)
+        app.on_cleanup.append(self.__stop)
+        app.add_routes([
+            web.post('/check_worker/', self.handle_check_worker),
+            web.post('/run_job/', self.handle_run_job),
+            web.post('/check_jobs/', self.handle_check_jobs),
+            web.post('/cancel_jobs/', self.handle_cancel_jobs),
+            web.post('/register_worker/', self.handle_register_worker),
+            web.post('/list_workers/', self.handle_list_workers),
+        ])
+        return app
+
+    def status(self):
+        '''
+        Returns the resources of this worker, and how many are in use.
+        '''
+        running = [job for job in self.__jobs.values() if job['returncode'] is None]
+        return {
+            'address': self.address,
+            'version': sc_version,
+            'cores': self.cores,
+            'memory': self.memory,
+            'free_cores': self.cores - sum(job['cores'] for job in running),
+            'free_memory': self.memory - sum(job['memory'] for job in running),
+            'jobs': len(running),
+            'completed': self.__completed
+        }
+
+    @web.middleware
+    async def __authenticate(self, request, handler):
+        token = request.headers.get(TOKEN_HEADER, '')
+        if not hmac.compare_digest(token.encode(), self.__token.encode()):
+            return self.__response("Authentication error.", status=403)
+        return await handler(request)
+
+    ####################
+    async def handle_check_worker(self, request):
+        '''
+        API handler for 'check_worker' requests. Returns the status of the worker.
+        '''
+        return web.json_response(self.status())
+
+    ####################
+    async def handle_run_job(self, request):
+        '''
+        API handler for 'run_job' requests. Starts the script of a node, if
+        the cores and memory it requests are free.
+        '''
+        params = await request.json()
+        try:
+            job = {
+                'name': str(params['name']),
+                'script': str(params['script']),
+                'cwd': str(params['cwd']),
+                'log': str(params['log']),
+                'cores': int(params['cores']),
+                'memory': int(params['memory']),
+                'returncode': None
+            }
+        except (KeyError, TypeError, ValueError):
+            return self.__response("Error: invalid job.", status=400)
+
+        if not _fits(self.status(), job['cores'], job['memory']):
+            return self.__response("Worker is busy.", status=409)
+
+        try:
+            with open(job['log'], 'w') as log_file:
+                job['proc'] = subprocess.Popen([job['script']],
+                                               cwd=job['cwd'],
+                                               stdout=log_file,
+                                               stderr=subprocess.STDOUT)
+        except OSError as e:
+            return self.__response(f"Error: unable to start {job['name']}: {e}", status=400)
+
+        job_id = uuid.uuid4().hex
+        self.__jobs[job_id] = job
+        waiter = asyncio.get_running_loop().create_task(self.__wait_for_job(job_id))
+        self.__waiters.add(waiter)
+        waiter.add_done_callback(self.__waiters.discard)
+        self.logger.info(f"Started {job['name']} ({job_id})")
+
+        return web.json_response({'job_id': job_id})
+
+    ####################
+    async def handle_check_jobs(self, request):
+        '''
+        API handler for 'check_jobs' requests. Returns the state of jobs,
+        which is 'running', 'success', 'failed' or 'unknown'. Jobs which
+        ended are forgotten once their state has been returned.
+        '''
+        params = await request.json()
+        states = {}
+        for job_id in params.get('jobs', []):
+            job = self.__jobs.get(job_id)
+            if not job:
+                states[job_id] = 'unknown'
+            elif job['returncode'] is None:
+                states[job_id] = 'running'
+            else:
+                del self.__jobs[job_id]
+                states[job_id] = 'success' if job['returncode'] == 0 else 'failed'
+
+        return web.json_response({'jobs': states})
+
+    ####################
+    async def handle_cancel_jobs(self, request):
+        '''
+        API handler for 'cancel_jobs' requests. Stops jobs, and forgets them.
+        '''
+        params = await request.json()
+        jobs = [self.__jobs.pop(job_id) for job_id in params.get('jobs', [])
+                if job_id in self.__jobs]
+        loop = asyncio.get_running_loop()
+        for job in jobs:
+            self.logger.info(f"Cancelling {job['name']}")
+            await loop.run_in_executor(None, _stop_job, job['proc'])
+
+        return self.__response("Jobs cancelled.")
+
+    ####################
+    async def handle_register_worker(self, request):
+        '''
+        API handler for 'register_worker' requests, sent by the workers of
+        the pool to their coordinator.
+        '''
+        status = await request.json()
+        if 'address' not in status:
+            return self.__response("Error: no worker address provided.", status=400)
+
+        if status['address'] not in self.__workers:
+            self.logger.info(f"Worker {status['address']} registered with "
+                             f"{status.get('cores')} cores and {status.get('memory')} MB")
+        self.__workers[status['address']] = (status, time.time())
+
+        return self.__response("Worker registered.")
+
+    ####################
+    async def handle_list_workers(self, request):
+        '''
+        API handler for 'list_workers' requests. Returns the last status of
+        the workers which registered with this coordinator recently.
+        '''
+        now = time.time()
+        for address, (_, registered) in list(self.__workers.items()):
+            if now - registered > WORKER_TIMEOUT:
+                self.logger.warning(f"Worker {address} was lost")
+                del self.__workers[address]
+
+        return web.json_response({
+            'workers': [status for status, _ in self.__workers.values()]
+        })
+
+    ####################
+    async def __wait_for_job(self, job_id):
+        job = self.__jobs[job_id]
+        # Poll the job, since waiting for it would hold a thread of the
+        # executor per running job
+        while job['proc'].poll() is None:
+            await asyncio.sleep(JOB_POLL_INTERVAL)
+        returncode = job['proc'].returncode
+
+        job['returncode'] = returncode
+        self.__completed += 1
+        self.logger.info(f"Finished {job['name']} ({job_id}) with exit code {returncode}")
+
+        # Advertise the freed resources right away.
+        self.__changed.set()
+
+    async def __start_registration(self, app):
+        self.__changed = asyncio.Event()
+        self.__register_task = asyncio.get_running_loop().create_task(self.__register())
+
+    async def __register(self):
+        async with aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=REGISTER_INTERVAL),
+                headers={TOKEN_HEADER: self.__token}) as session:
+            while True:
+                self.__changed.clear()
+                if self.coordinator:
+                    try:
+                        async with session.post(f'http://{self.coordinator}/register_worker/',
+                                                json=self.status()) as resp:
+                            resp.raise_for_status()
+                    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                        self.logger.warning(f"Unable to register with {self.coordinator}: {e}")
+                else:
+                    self.__workers[self.address] = (self.status(), time.time())
+
+                try:
+                    await asyncio.wait_for(self.__changed.wait(), REGISTER_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def __stop(self, app):
+        if self.__register_task:
+            self.__register_task.cancel()
+            try:
+                await self.__register_task
+            except asyncio.CancelledError:
+                pass
+            self.__register_task = None
+
+        # Jobs which are still running are stopped with the worker.
+        loop = asyncio.get_running_loop()
+        for job in self.__jobs.values():
+            if job['returncode'] is None:
+                await loop.run_in_executor(None, _stop_job, job['proc'])
+        self.__jobs.clear()
+        for waiter in list(self.__waiters):
+            waiter.cancel()
+
+    ###################
+    def __response(self, message, status=200):
+        return web.json_response({'message': message}, status=status)
+
+
+def _stop_job(proc):
+    try:
+        utils.terminate_process(proc.pid)
+    except psutil.NoSuchProcess:
+        pass
+    proc.wait()
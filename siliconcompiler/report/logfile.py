@@ -0,0 +1,225 @@
+import hashlib
+import mmap
+import os
+import re
+from pathlib import Path
+
+import numpy
+
+
+# Suffix of the cached line index of a log file.
+INDEX_SUFFIX = '.scidx'
+
+# Directory of the cached line indexes, which keeps them out of the build
+# directories. It is private to the user, since the indexes name the logs
+INDEX_DIR = os.path.join(Path.home(), '.sc', 'logindex')
+
+# Version of the line index file format
+_INDEX_VERSION = 1
+
+
+class LogFile:
+    '''
+    Random access to the lines of a (possibly very large) log file.
+
+    The file is memory mapped, so only the parts of the file which are
+    displayed are read. A line-offset index is built on first use and cached
+    in :data:`INDEX_DIR`, so that later reads of any line range are O(1).
+    If the log file has grown since the index was built, the index is extended
+    rather than rebuilt, which keeps tailing a running tool's log cheap.
+
+    Args:
+        path (str): path to the log file
+        cache (bool): if True, the line index is stored on disk.
+
+    Examples:
+        >>> with LogFile('build/gcd/job0/place/0/place.log') as log:
+        ...     last_lines = log.tail(10)
+    '''
+
+    def __init__(self, path, cache=True):
+        self.path = path
+        self.__cache = cache
+        self.__offsets = None
+
+        self.__file = open(path, 'rb')
+        self.__size = os.fstat(self.__file.fileno()).st_size
+        if self.__size > 0:
+            self.__map = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            # Empty files cannot be memory mapped
+            self.__map = b''
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        '''
+        Release the memory map and the file handle.
+        '''
+        if isinstance(self.__map, mmap.mmap):
+            self.__map.close()
+        self.__map = b''
+        self.__file.close()
+
+    def __len__(self):
+        return len(self._offsets())
+
+    @property
+    def index_path(self):
+        '''
+        Path to the cached line index.
+        '''
+        name = hashlib.sha1(os.path.realpath(self.path).encode()).hexdigest()
+        return os.path.join(INDEX_DIR, f'{name}{INDEX_SUFFIX}')
+
+    def _offsets(self):
+        '''
+        Returns an array with the starting offset of each line.
+        '''
+        if self.__offsets is not None:
+            return self.__offsets
+
+        offsets = None
+        indexed_size = 0
+        if self.__cache:
+            offsets, indexed_size = self.__read_index()
+
+        if offsets is None or indexed_size != self.__size:
+            new_offsets = self.__build_offsets(indexed_size)
+            if offsets is None:
+                offsets = new_offsets
+            else:
+                offsets = numpy.concatenate((offsets, new_offsets))
+            if self.__cache:
+                self.__write_index(offsets)
+
+        self.__offsets = offsets
+        return offsets
+
+    def __build_offsets(self, start):
+        '''
+        Returns the starting offsets of lines which start at or after start.
+        '''
+        if start == 0:
+            offsets = [numpy.zeros(1 if self.__size else 0, dtype=numpy.uint64)]
+        else:
+            # Include the newline just before start, since it may end the last indexed line
+            start -= 1
+            offsets = []
+        data = numpy.frombuffer(self.__map, dtype=numpy.uint8, offset=start)
+        offsets.append(numpy.flatnonzero(data == ord('\n')).astype(numpy.uint64) + (start + 1))
+        del data
+
+        offsets = numpy.concatenate(offsets)
+        # Drop the offset past the final newline, since no line starts there
+        return offsets[offsets < self.__size]
+
+    def __read_index(self):
+        try:
+            stat = os.stat(self.path)
+            with open(self.index_path, 'rb') as f:
+                header = numpy.fromfile(f, dtype=numpy.uint64, count=3)
+                if len(header) != 3 or header[0] != _INDEX_VERSION or \
+                        header[1] != stat.st_ino or header[2] > self.__size:
+                    return None, 0
+                offsets = numpy.fromfile(f, dtype=numpy.uint64)
+            # Ensure the index still lines up with the file
+            if len(offsets) and offsets[-1] > 0 and \
+                    self.__map[int(offsets[-1]) - 1:int(offsets[-1])] != b'\n':
+                return None, 0
+            return offsets, int(header[2])
+        except (OSError, ValueError):
+            return None, 0
+
+    def __write_index(self, offsets):
+        try:
+            stat = os.stat(self.path)
+            os.makedirs(INDEX_DIR, mode=0o700, exist_ok=True)
+            tmp_path = f'{self.index_path}.{os.getpid()}'
+            with open(tmp_path, 'wb') as f:
+                numpy.array([_INDEX_VERSION, stat.st_ino, self.__size],
+                            dtype=numpy.uint64).tofile(f)
+                offsets.tofile(f)
+            os.replace(tmp_path, self.index_path)
+        except OSError:
+            # Caching is best effort
+            pass
+
+    def __decode(self, start, end):
+        return self.__map[start:end].decode(errors='replace').rstrip('\r\n')
+
+    def lines(self, start=0, end=None):
+        '''
+        Returns the lines in the range [start, end).
+
+        Args:
+            start (int): first line to return, starting from 0
+            end (int): line to stop at, if None, reads until the end of the file
+        '''
+        offsets = self._offsets()
+        start, end, _ = slice(start, end).indices(len(offsets))
+        lines = []
+        for line in range(start, end):
+            line_end = int(offsets[line + 1]) if line + 1 < len(offsets) else self.__size
+            lines.append(self.__decode(int(offsets[line]), line_end))
+        return lines
+
+    def head(self, count=10):
+        '''
+        Returns the first count lines.
+        '''
+        return self.lines(0, count)
+
+    def tail(self, count=10):
+        '''
+        Returns the last count lines.
+
+        If the line index has not been built yet, the lines are found by
+        scanning backwards from the end of the file.
+        '''
+        if self.__offsets is not None:
+            return self.lines(-count) if count > 0 else []
+
+        lines = []
+        end = self.__size
+        if end > 0 and self.__map[end - 1:end] == b'\n':
+            end -= 1
+        while end > 0 and len(lines) < count:
+            start = self.__map.rfind(b'\n', 0, end) + 1
+            lines.append(self.__decode(start, end))
+            end = start - 1
+        lines.reverse()
+        return lines
+
+    def search(self, pattern, flags=0, max_matches=None):
+        '''
+        Search the log file for a regular expression.
+
+        Args:
+            pattern (str): regular expression to search for
+            flags (int): regular expression flags
+            max_matches (int): maximum number of matches to return
+
+        Returns:
+            List of (line number, line) tuples for each line that matches.
+        '''
+        regex = re.compile(pattern.encode(), flags | re.MULTILINE)
+        offsets = self._offsets()
+
+        matches = []
+        if len(offsets) == 0:
+            return matches
+        last_line = None
+        for match in regex.finditer(self.__map):
+            line = int(numpy.searchsorted(offsets, match.start(), side='right')) - 1
+            if line == last_line:
+                continue
+            last_line = line
+            matches.append((line, self.lines(line, line + 1)[0]))
+            if max_matches and len(matches) >= max_matches:
+                break
+        return matches
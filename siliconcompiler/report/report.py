@@ -1,6 +1,7 @@
 import pandas
 import os
 from siliconcompiler import Schema
+from siliconcompiler import units
 from siliconcompiler.report import utils
 
 
@@ -325,27 +326,32 @@ def get_chart_data(chips, metric, nodes):
         metric (string) : The metric that the user is searching.
         nodes (list) : A list of dictionaries with the form (step, index).
     '''
-    metric_units = set()  # the set of all units for this metric (hopefully, it's length is 0 or 1)
+    metric_unit = None
     metric_datapoints = {}
-    metric_unit = ''
     for chip_and_chip_name in chips:
         chip = chip_and_chip_name['chip_object']
         chip_name = chip_and_chip_name['chip_name']
         nodes_list, errors, metrics, metrics_unit, metrics_to_show, reports = \
             utils._collect_data(chip, format_as_string=False)
+
+        chip_nodes = [node for node in nodes if node in metrics]
+        values = [metrics[node][metric] for node in chip_nodes]
+
         if metric in metrics_unit:
-            metric_unit = metrics_unit[metric]
-            metric_units.add(metric_unit)
-        for node in nodes:
-            if node not in metrics:
-                continue
-            value = metrics[node][metric]
+            chip_unit = metrics_unit[metric]
+            if metric_unit is None:
+                metric_unit = chip_unit
+            elif chip_unit != metric_unit:
+                # Report all values in the units of the first chip
+                if not units.is_convertible(chip_unit, metric_unit):
+                    raise ValueError('Not all measurements were made with the same units')
+                values = units.convert_many(values, from_unit=chip_unit, to_unit=metric_unit)
+
+        for node, value in zip(chip_nodes, values):
             if value is None:
                 continue
             if node in metric_datapoints:
                 metric_datapoints[node][chip_name] = value
             else:
                 metric_datapoints[node] = {chip_name: value}
-    if len(metric_units) > 1:
-        raise ValueError('Not all measurements were made with the same units')
-    return metric_datapoints, metric_unit
+    return metric_datapoints, metric_unit if metric_unit is not None else ''
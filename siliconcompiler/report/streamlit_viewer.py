@@ -10,7 +10,9 @@ import pandas
 import altair
 import gzip
 import base64
+import re
 from siliconcompiler.report import report
+from siliconcompiler.report.logfile import LogFile
 from siliconcompiler import Chip, NodeStatus, utils
 from siliconcompiler import __version__ as sc_version
 
@@ -236,6 +238,11 @@ def file_viewer_module(display_file_content, chip, step, index, header_col_width
 
     if file_extension.lower() in ("png", "jpg"):
         streamlit.image(path)
+    elif compressed_file_extension != '.gz' and file_extension.lower() != "json":
+        if is_text_file(path):
+            text_file_viewer(path)
+        else:
+            streamlit.markdown('Cannot read file')
     else:
         try:
             if compressed_file_extension == '.gz':
@@ -252,6 +259,71 @@ def file_viewer_module(display_file_content, chip, step, index, header_col_width
             streamlit.markdown('Cannot read file')
 
 
+def is_text_file(path, block_size=8192):
+    """
+    Returns True if the start of the file looks like text, ie. it decodes as
+    UTF-8 and contains no null bytes.
+
+    Args:
+        path (string) : path to the file to check.
+        block_size (int) : number of bytes to check.
+    """
+    with open(path, 'rb') as f:
+        block = f.read(block_size)
+    if b'\0' in block:
+        return False
+    try:
+        block.decode()
+    except UnicodeDecodeError as e:
+        # The block may end in the middle of a multi-byte character
+        return len(block) == block_size and e.start >= block_size - 3
+    return True
+
+
+def text_file_viewer(path, page_size=1000):
+    """
+    Displays a page of a text file along with a search box. Only the displayed
+    lines are read from the file, so large log files can be viewed.
+
+    Args:
+        path (string) : path to the file to display.
+        page_size (int) : number of lines to display at a time.
+    """
+    with LogFile(path) as log:
+        line_count = len(log)
+
+        search_col, line_col = streamlit.columns([0.7, 0.3], gap='small')
+        with search_col:
+            pattern = streamlit.text_input('Search',
+                                           key=f'file_search_{path}',
+                                           placeholder='regular expression')
+        with line_col:
+            start_line = streamlit.number_input('Line',
+                                                min_value=1,
+                                                max_value=max(1, line_count),
+                                                value=1,
+                                                step=page_size,
+                                                key=f'file_line_{path}')
+
+        if pattern:
+            try:
+                matches = log.search(pattern, max_matches=page_size)
+            except re.error as e:
+                streamlit.error(f'Invalid search: {e}')
+                return
+            streamlit.caption(f'{len(matches)} matches')
+            streamlit.code('\n'.join([f'{line + 1}: {text}' for line, text in matches]),
+                           language='markdown')
+            return
+
+        start = int(start_line) - 1
+        streamlit.caption(
+            f'Lines {start + 1} to {min(start + page_size, line_count)} of {line_count}')
+        lines = log.lines(start, start + page_size)
+        streamlit.code('\n'.join([f'{start + n + 1}: {text}' for n, text in enumerate(lines)]),
+                       language='markdown')
+
+
 def show_files(chip, step, index):
     """
     Displays the logs and reports using streamlit_tree_select.
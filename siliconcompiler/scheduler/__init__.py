@@ -0,0 +1,93 @@
+import os
+import shlex
+
+from siliconcompiler.scheduler.backend import SchedulerBackend, _get_cfg_dir, _make_executable
+from siliconcompiler.scheduler.batch import BatchBackend
+from siliconcompiler.scheduler.local import LocalBackend
+from siliconcompiler.scheduler.slurm import SlurmBackend
+from siliconcompiler.scheduler.worker import WorkerBackend
+
+
+# Schedulers which run deferred nodes, keyed by ['option', 'scheduler', 'name'].
+_BACKENDS = {
+    'batch': BatchBackend,
+    'local': LocalBackend,
+    'slurm': SlurmBackend,
+    'worker': WorkerBackend
+}
+
+
+def register_backend(name, backend):
+    '''
+    Registers a job scheduler for nodes whose ['option', 'scheduler', 'name']
+    is name.
+
+    Args:
+        name (str): name of the scheduler
+        backend (class): subclass of SchedulerBackend, which is created with
+            the chip running the flow
+    '''
+    if not issubclass(backend, SchedulerBackend):
+        raise TypeError(f'{backend} is not a SchedulerBackend')
+    _BACKENDS[name] = backend
+
+
+def get_backend(chip, name):
+    '''
+    Returns a new job scheduler for nodes whose ['option', 'scheduler', 'name']
+    is name.
+
+    Args:
+        chip (Chip): chip running the flow
+        name (str): name of the scheduler
+    '''
+    if name not in _BACKENDS:
+        raise ValueError(f'{name} is not a supported scheduler')
+    return _BACKENDS[name](chip)
+
+
+def _is_deferred(chip, step, index):
+    '''
+    Returns True if a node is run by a job scheduler rather than locally.
+
+    Entry nodes are always run locally.
+    '''
+    flow = chip.get('option', 'flow')
+    return bool(chip.get('option', 'scheduler', 'name', step=step, index=index) and
+                chip._get_flowgraph_node_inputs(flow, (step, index)))
+
+
+###########################################################################
+def _defernode(chip, step, index):
+    '''
+    Helper method to prepare an individual step to run on a job scheduler.
+
+    Writes the manifest and the script which the scheduler runs. The job is
+    submitted and tracked by the scheduler backend of the process running
+    the flow.
+    '''
+
+    # Determine which job scheduler being used.
+    scheduler_type = chip.get('option', 'scheduler', 'name', step=step, index=index)
+
+    if scheduler_type not in _BACKENDS:
+        raise ValueError(f'{scheduler_type} is not a supported scheduler')
+
+    # Write out the current schema for the compute node to pick up.
+    cfg_dir = _get_cfg_dir(chip)
+    cfg_file = f'{cfg_dir}/{step}{index}.json'
+    os.makedirs(cfg_dir, exist_ok=True)
+
+    chip.set('option', 'scheduler', 'name', None, step=step, index=index)
+    chip.write_manifest(cfg_file)
+
+    # Allow user-defined compute node execution script if it already exists on the filesystem.
+    # Otherwise, create a minimal script to run the task using the SiliconCompiler CLI.
+    script_path = f'{cfg_dir}/{step}{index}.sh'
+    buildir = chip.get("option", "builddir")
+    if not os.path.isfile(script_path):
+        with open(script_path, 'w') as sf:
+            sf.write('#!/bin/bash\n')
+            sf.write(f'sc -cfg {shlex.quote(cfg_file)} -builddir {shlex.quote(buildir)} '
+                     f'-arg_step {shlex.quote(step)} -arg_index {shlex.quote(index)}\n')
+    _make_executable(script_path)
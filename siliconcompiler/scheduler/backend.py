@@ -0,0 +1,304 @@
+import os
+import stat
+import threading
+import time
+
+
+# Time between status checks of the jobs submitted to a scheduler, in seconds.
+POLL_INTERVAL = 3.0
+
+# Minimum time between disk usage checks when 'max_fs_bytes' is set, in seconds.
+DISK_CHECK_INTERVAL = 30.0
+
+
+class SchedulerBackend:
+    '''
+    Base class of the job schedulers which run deferred nodes.
+
+    Nodes are prepared by _defernode() in the process which sets them up, and
+    queued with submit(). A single thread calls poll() once per interval,
+    which submits the queued nodes, checks the state of the outstanding jobs
+    and enforces the disk usage limit of the run. collect() returns the nodes
+    whose jobs ended.
+
+    Backends implement:
+
+    * _submit_jobs(jobs): starts jobs, and returns {job ID: job} for the jobs
+      which were started. Jobs which are not returned have failed.
+    * _check_jobs(jobs): takes {job ID: job}, and returns {job ID: success}
+      for the jobs which ended, or None if their state is unknown.
+    * _cancel_jobs(job_ids): stops jobs.
+
+    Args:
+        chip (Chip): chip running the flow
+        poll_interval (float): time between polls, in seconds, defaults to
+            POLL_INTERVAL
+    '''
+
+    def __init__(self, chip, poll_interval=None):
+        self._chip = chip
+        self.__poll_interval = poll_interval or POLL_INTERVAL
+
+        self.__disk_usage = None
+        if 'max_fs_bytes' in chip.status:
+            self.__disk_usage = _DiskUsage(
+                os.path.join(chip.cwd, chip.get('option', 'builddir')))
+
+        self.__lock = threading.Lock()
+        # Held while the jobs are submitted, checked or cancelled
+        self.__poll_lock = threading.Lock()
+        # Jobs waiting to be submitted
+        self.__pending = []
+        # {job ID: job}
+        self.__jobs = {}
+        # List of (node, success)
+        self.__finished = []
+
+        self.__stop = threading.Event()
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+
+    def start(self):
+        self.__thread.start()
+
+    def stop(self):
+        '''
+        Stop tracking jobs, and cancel the jobs which are still running.
+        '''
+        self.__stop.set()
+        if self.__thread.is_alive():
+            self.__thread.join()
+
+        with self.__poll_lock:
+            if self.__jobs:
+                self._cancel_jobs(list(self.__jobs))
+                self.__jobs.clear()
+
+    def submit(self, nodes):
+        '''
+        Queue nodes which have been prepared by _defernode() for submission.
+
+        Args:
+            nodes (list): list of (step, index)
+        '''
+        chip = self._chip
+        cfg_dir = _get_cfg_dir(chip)
+        jobs = []
+        for step, index in nodes:
+            def get(*key):
+                return chip.get('option', 'scheduler', *key, step=step, index=index)
+
+            jobs.append({
+                'node': (step, index),
+                'queue': get('queue'),
+                'defer': get('defer'),
+                'cores': get('cores'),
+                'memory': get('memory'),
+                'options': get('options'),
+                'script': f'{cfg_dir}/{step}{index}.sh',
+                'workdir': chip._getworkdir(step=step, index=index),
+                'log': _get_log_path(chip, step, index)
+            })
+        with self.__lock:
+            self.__pending.extend(jobs)
+
+    def poll(self):
+        '''
+        Submit the queued nodes and check the state of the outstanding jobs.
+        '''
+        with self.__lock:
+            pending = self.__pending
+            self.__pending = []
+
+        with self.__poll_lock:
+            if pending:
+                started = self._submit_jobs(pending)
+                failed = [job for job in pending if job not in started.values()]
+                if failed:
+                    self.__fail(failed)
+                for job_id, job in started.items():
+                    self.__jobs[job_id] = job
+                    if self.__disk_usage:
+                        self.__disk_usage.track(job['workdir'])
+
+            if not self.__jobs:
+                return
+
+            ended = self._check_jobs(dict(self.__jobs))
+            if ended is None:
+                # The scheduler may be temporarily unavailable, check again later.
+                return
+            for job_id, success in ended.items():
+                self.__finish(job_id, success)
+
+            if self.__jobs and 'watchdog' in self._chip.status:
+                self._chip.status['watchdog'].set()
+
+            self.__check_disk_usage()
+
+    def cancel(self, nodes=None):
+        '''
+        Cancel the jobs of nodes, which are reported as failed.
+
+        Args:
+            nodes (list): list of (step, index), if not provided all
+                outstanding jobs are cancelled
+        '''
+        def selected(job):
+            return nodes is None or job['node'] in nodes
+
+        with self.__lock:
+            pending = [job for job in self.__pending if selected(job)]
+            self.__pending = [job for job in self.__pending if not selected(job)]
+        self.__fail(pending)
+
+        with self.__poll_lock:
+            job_ids = [job_id for job_id, job in self.__jobs.items() if selected(job)]
+            if job_ids:
+                self._cancel_jobs(job_ids)
+            for job_id in job_ids:
+                self.__finish(job_id, False)
+
+    def collect(self):
+        '''
+        Returns the nodes whose jobs ended since the last call, as a list of
+        (node, success).
+        '''
+        with self.__lock:
+            finished = self.__finished
+            self.__finished = []
+        return finished
+
+    def _submit_jobs(self, jobs):
+        raise NotImplementedError
+
+    def _check_jobs(self, jobs):
+        raise NotImplementedError
+
+    def _cancel_jobs(self, job_ids):
+        raise NotImplementedError
+
+    def __run(self):
+        # Nodes which are submitted within one interval are submitted together.
+        while not self.__stop.wait(self.__poll_interval):
+            self.poll()
+
+    def __finish(self, job_id, success):
+        job = self.__jobs.pop(job_id)
+        if self.__disk_usage:
+            self.__disk_usage.freeze(job['workdir'])
+        with self.__lock:
+            self.__finished.append((job['node'], success))
+
+    def __fail(self, jobs):
+        with self.__lock:
+            self.__finished.extend((job['node'], False) for job in jobs)
+
+    def __check_disk_usage(self):
+        if not self.__disk_usage or not self.__jobs:
+            return
+
+        max_fs_bytes = int(self._chip.status['max_fs_bytes'])
+        cur_fs_bytes = self.__disk_usage.check()
+        if cur_fs_bytes is None or cur_fs_bytes <= max_fs_bytes:
+            return
+
+        # File size overrun; cancel the running tasks, and mark them as errors.
+        self._chip.logger.error(f'Build directory uses {cur_fs_bytes} bytes, which exceeds '
+                                f'the limit of {max_fs_bytes} bytes.')
+        self._cancel_jobs(list(self.__jobs))
+        for job_id in list(self.__jobs):
+            self.__finish(job_id, False)
+
+
+def _get_cfg_dir(chip):
+    return f'{chip._getworkdir()}/configs'
+
+
+def _get_log_path(chip, step, index):
+    '''
+    Returns the path to the scheduler log of a node.
+    '''
+    return os.path.join(chip._getworkdir(), f'sc_remote-{step}-{index}.log')
+
+
+def _make_executable(path):
+    # This is Python for: `chmod +x [path]`
+    fst = os.stat(path)
+    os.chmod(path, fst.st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+
+class _DiskUsage:
+    '''
+    Tracks the disk space used by a build directory.
+
+    The build directory, without the work directories of the tracked nodes,
+    is scanned once, and again whenever a new work directory is tracked.
+    Otherwise only the work directories of nodes running on the cluster are
+    scanned again, and checks are limited to one per DISK_CHECK_INTERVAL.
+    '''
+
+    def __init__(self, path):
+        self.__path = os.path.abspath(path)
+        self.__base = None
+        self.__last_check = None
+        # {work directory: size}, for directories of running nodes
+        self.__active = {}
+        # {work directory: size}, for directories of finished nodes
+        self.__frozen = {}
+
+    def track(self, workdir):
+        workdir = os.path.abspath(workdir)
+        if workdir not in self.__active and workdir not in self.__frozen:
+            # The size of the build directory includes this directory
+            self.__base = None
+        self.__frozen.pop(workdir, None)
+        self.__active[workdir] = 0
+
+    def freeze(self, workdir):
+        workdir = os.path.abspath(workdir)
+        if workdir in self.__active:
+            del self.__active[workdir]
+            self.__frozen[workdir] = _get_dir_size(workdir)
+
+    def check(self):
+        '''
+        Returns the number of bytes used by the build directory, or None if
+        it was checked less than DISK_CHECK_INTERVAL ago.
+        '''
+        now = time.time()
+        if self.__last_check is not None and now - self.__last_check < DISK_CHECK_INTERVAL:
+            return None
+        self.__last_check = now
+
+        if self.__base is None:
+            self.__base = _get_dir_size(self.__path,
+                                        exclude=set(self.__active) | set(self.__frozen))
+        for workdir in self.__active:
+            self.__active[workdir] = _get_dir_size(workdir)
+
+        return self.__base + sum(self.__active.values()) + sum(self.__frozen.values())
+
+
+def _get_dir_size(path, exclude=None):
+    '''
+    Returns the apparent size of the files in a directory, like 'du -sb',
+    skipping the directories in exclude.
+    '''
+    size = 0
+    try:
+        entries = os.scandir(path)
+    except OSError:
+        return 0
+
+    with entries:
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if not exclude or entry.path not in exclude:
+                        size += _get_dir_size(entry.path, exclude=exclude)
+                else:
+                    size += entry.stat(follow_symlinks=False).st_size
+            except OSError:
+                # Files may be removed while the directory is scanned.
+                continue
+    return size
@@ -0,0 +1,130 @@
+import json
+import os
+import uuid
+
+from siliconcompiler.scheduler.backend import SchedulerBackend
+
+
+# Time between status checks of the queue, in seconds.
+POLL_INTERVAL = 0.5
+
+# Default queue directory, relative to the build directory.
+QUEUE_DIR = 'sc_batch'
+
+# Files of a job in the queue directory:
+# * <job ID>.job: description of a job waiting for a worker, written by the backend
+# * <job ID>.run: description of a job claimed by a worker
+# * <job ID>.cancel: request to stop a job, written by the backend, and
+#   removed by the workers once the job stopped or if it already ended
+# * <job ID>.rc: exit code of a job which ended, written by the worker
+JOB_EXT = '.job'
+RUN_EXT = '.run'
+CANCEL_EXT = '.cancel'
+RC_EXT = '.rc'
+
+
+class BatchBackend(SchedulerBackend):
+    '''
+    Runs deferred nodes through a queue directory on shared storage.
+
+    Each job is written as a file in the queue directory, and run by one of
+    the workers watching that directory, which can be on any host sharing
+    the build directory. Workers are started separately with::
+
+        python -m siliconcompiler.scheduler.batch_worker <queue directory>
+
+    The queue directory is ['option', 'scheduler', 'queue'], and defaults to
+    'sc_batch' in the build directory.
+
+    Args:
+        chip (Chip): chip running the flow
+    '''
+
+    def __init__(self, chip):
+        super().__init__(chip, poll_interval=POLL_INTERVAL)
+
+        self.__job_hash = uuid.uuid4().hex
+        self.__job_count = 0
+        # {job ID: queue directory}
+        self.__queues = {}
+
+    def _submit_jobs(self, jobs):
+        chip = self._chip
+        started = {}
+        for job in jobs:
+            queue = get_queue_dir(chip, job['queue'])
+            job_id = f'{self.__job_hash}-{self.__job_count:06d}'
+            self.__job_count += 1
+
+            try:
+                os.makedirs(queue, exist_ok=True)
+                tmp_file = os.path.join(queue, f'.{job_id}.tmp')
+                with open(tmp_file, 'w') as f:
+                    json.dump({
+                        'script': os.path.abspath(job['script']),
+                        'cwd': chip.cwd,
+                        'log': os.path.abspath(job['log']),
+                        'cores': job['cores']
+                    }, f)
+                # Workers only pick up complete job files.
+                os.replace(tmp_file, os.path.join(queue, job_id + JOB_EXT))
+            except OSError as e:
+                step, index = job['node']
+                chip.logger.error(f'Unable to queue {step}{index} in {queue}: {e}')
+                continue
+
+            self.__queues[job_id] = queue
+            started[job_id] = job
+        return started
+
+    def _check_jobs(self, jobs):
+        ended = {}
+        for job_id in jobs:
+            rc_file = os.path.join(self.__queues[job_id], job_id + RC_EXT)
+            try:
+                with open(rc_file) as f:
+                    rc = f.read().strip()
+            except FileNotFoundError:
+                continue
+            os.remove(rc_file)
+            del self.__queues[job_id]
+
+            ended[job_id] = rc == '0'
+            if rc != '0':
+                step, index = jobs[job_id]['node']
+                self._chip.logger.error(f'Job for {step}{index} failed with exit code {rc}, '
+                                        f'see {jobs[job_id]["log"]}.')
+        return ended
+
+    def _cancel_jobs(self, job_ids):
+        for job_id in job_ids:
+            queue = self.__queues.pop(job_id)
+            try:
+                # Jobs which no worker has claimed yet are removed from the queue.
+                os.remove(os.path.join(queue, job_id + JOB_EXT))
+                continue
+            except FileNotFoundError:
+                pass
+
+            if os.path.exists(os.path.join(queue, job_id + RUN_EXT)):
+                open(os.path.join(queue, job_id + CANCEL_EXT), 'w').close()
+            else:
+                # The job already ended, so nothing else removes its exit code.
+                try:
+                    os.remove(os.path.join(queue, job_id + RC_EXT))
+                except FileNotFoundError:
+                    pass
+
+
+def get_queue_dir(chip, queue=None):
+    '''
+    Returns the absolute path to a queue directory.
+
+    Args:
+        chip (Chip): chip running the flow
+        queue (str): queue directory, relative to the working directory of
+            the chip, defaults to QUEUE_DIR in the build directory
+    '''
+    if not queue:
+        queue = os.path.join(chip.get('option', 'builddir'), QUEUE_DIR)
+    return os.path.abspath(os.path.join(chip.cwd, queue))
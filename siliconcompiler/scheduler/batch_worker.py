@@ -0,0 +1,152 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import psutil
+
+from siliconcompiler import utils
+from siliconcompiler.scheduler.batch import JOB_EXT, RUN_EXT, CANCEL_EXT, RC_EXT
+
+
+# Time between checks of the queue directory, in seconds.
+POLL_INTERVAL = 0.2
+
+
+def run_worker(queue, jobs=1, idle_timeout=None):
+    '''
+    Runs the jobs written to a queue directory by the batch scheduler.
+
+    Several workers can watch the same queue directory, each job is claimed
+    by exactly one of them.
+
+    Args:
+        queue (str): queue directory
+        jobs (int): maximum number of jobs to run at once
+        idle_timeout (float): return once no jobs ran for this many seconds,
+            if not provided the worker runs until it is interrupted
+    '''
+    os.makedirs(queue, exist_ok=True)
+
+    # {job ID: (process, log file)}
+    running = {}
+    idle_since = time.time()
+    try:
+        while True:
+            for job_id, (proc, log) in list(running.items()):
+                cancel_file = os.path.join(queue, job_id + CANCEL_EXT)
+                if os.path.exists(cancel_file):
+                    __stop_job(proc)
+                    os.remove(cancel_file)
+                elif proc.poll() is not None:
+                    __write_rc(queue, job_id, proc.returncode)
+                else:
+                    continue
+                log.close()
+                os.remove(os.path.join(queue, job_id + RUN_EXT))
+                del running[job_id]
+
+            __remove_stale_cancels(queue)
+
+            while len(running) < jobs:
+                job = __claim_job(queue)
+                if not job:
+                    break
+                job_id, description = job
+                log = open(description['log'], 'w')
+                running[job_id] = (subprocess.Popen([description['script']],
+                                                    cwd=description['cwd'],
+                                                    stdout=log,
+                                                    stderr=subprocess.STDOUT),
+                                   log)
+
+            now = time.time()
+            if running:
+                idle_since = now
+            elif idle_timeout is not None and now - idle_since > idle_timeout:
+                return
+
+            time.sleep(POLL_INTERVAL)
+    finally:
+        # Jobs which are interrupted are reported as failed.
+        for job_id, (proc, log) in running.items():
+            __stop_job(proc)
+            log.close()
+            __write_rc(queue, job_id, proc.returncode)
+            os.remove(os.path.join(queue, job_id + RUN_EXT))
+
+
+def __claim_job(queue):
+    for name in sorted(os.listdir(queue)):
+        if not name.endswith(JOB_EXT):
+            continue
+        job_id = name[:-len(JOB_EXT)]
+        run_file = os.path.join(queue, job_id + RUN_EXT)
+        try:
+            # Only one worker succeeds in renaming the job file.
+            os.rename(os.path.join(queue, name), run_file)
+        except FileNotFoundError:
+            continue
+        with open(run_file) as f:
+            return job_id, json.load(f)
+    return None
+
+
+def __remove_stale_cancels(queue):
+    '''
+    Removes the requests to stop jobs which already ended, ie. which are
+    neither waiting nor running.
+    '''
+    names = set(os.listdir(queue))
+    for name in names:
+        if not name.endswith(CANCEL_EXT):
+            continue
+        job_id = name[:-len(CANCEL_EXT)]
+        if job_id + JOB_EXT in names or job_id + RUN_EXT in names:
+            continue
+        try:
+            os.remove(os.path.join(queue, name))
+        except FileNotFoundError:
+            # Removed by another worker
+            pass
+
+
+def __stop_job(proc):
+    try:
+        utils.terminate_process(proc.pid)
+    except psutil.NoSuchProcess:
+        pass
+    proc.wait()
+
+
+def __write_rc(queue, job_id, returncode):
+    tmp_file = os.path.join(queue, f'.{job_id}.rc.tmp')
+    with open(tmp_file, 'w') as f:
+        f.write(str(returncode))
+    os.replace(tmp_file, os.path.join(queue, job_id + RC_EXT))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='python -m siliconcompiler.scheduler.batch_worker',
+        description='Run the jobs of the batch scheduler from a queue directory.')
+    parser.add_argument('queue',
+                        help='queue directory')
+    parser.add_argument('-jobs', type=int, default=1,
+                        help='maximum number of jobs to run at once')
+    parser.add_argument('-idle_timeout', type=float,
+                        help='exit once no jobs ran for this many seconds')
+    args = parser.parse_args()
+
+    try:
+        run_worker(args.queue, jobs=args.jobs, idle_timeout=args.idle_timeout)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+#########################
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+import os
+import subprocess
+
+import psutil
+
+from siliconcompiler import utils
+from siliconcompiler.scheduler.backend import SchedulerBackend
+
+
+# Time between status checks of the local processes, in seconds.
+POLL_INTERVAL = 0.2
+
+
+class LocalBackend(SchedulerBackend):
+    '''
+    Runs deferred nodes as processes on the local machine.
+
+    Each job runs the script of its node, like a job on a cluster would.
+    Jobs start in the order they were submitted, as long as the cores they
+    request with ['option', 'scheduler', 'cores'] are available. A job which
+    requests more cores than the machine has runs on its own.
+
+    Args:
+        chip (Chip): chip running the flow
+        cores (int): number of cores to schedule, defaults to the number of
+            cores of the machine
+    '''
+
+    def __init__(self, chip, cores=None):
+        super().__init__(chip, poll_interval=POLL_INTERVAL)
+
+        self.__cores = cores or os.cpu_count() or 1
+        self.__job_count = 0
+        # Jobs waiting for free cores, in submission order
+        self.__queue = []
+        # {job ID: (process, log file)}
+        self.__procs = {}
+
+    def _submit_jobs(self, jobs):
+        started = {}
+        for job in jobs:
+            job_id = str(self.__job_count)
+            self.__job_count += 1
+            self.__queue.append(job_id)
+            started[job_id] = job
+        return started
+
+    def _check_jobs(self, jobs):
+        ended = {}
+        for job_id, (proc, log) in list(self.__procs.items()):
+            if proc.poll() is not None:
+                del self.__procs[job_id]
+                log.close()
+                ended[job_id] = proc.returncode == 0
+                if proc.returncode != 0:
+                    step, index = jobs[job_id]['node']
+                    self._chip.logger.error(f'Job for {step}{index} failed with exit code '
+                                            f'{proc.returncode}, see {jobs[job_id]["log"]}.')
+
+        used = sum(self.__get_cores(jobs[job_id]) for job_id in self.__procs)
+        while self.__queue:
+            job = jobs[self.__queue[0]]
+            if self.__procs and used + self.__get_cores(job) > self.__cores:
+                break
+            job_id = self.__queue.pop(0)
+            log = open(job['log'], 'w')
+            self.__procs[job_id] = (subprocess.Popen([job['script']],
+                                                     cwd=self._chip.cwd,
+                                                     stdout=log,
+                                                     stderr=subprocess.STDOUT),
+                                    log)
+            used += self.__get_cores(job)
+
+        return ended
+
+    def _cancel_jobs(self, job_ids):
+        for job_id in job_ids:
+            if job_id in self.__queue:
+                self.__queue.remove(job_id)
+            if job_id not in self.__procs:
+                continue
+            proc, log = self.__procs.pop(job_id)
+            try:
+                utils.terminate_process(proc.pid)
+            except psutil.NoSuchProcess:
+                pass
+            proc.wait()
+            log.close()
+
+    def __get_cores(self, job):
+        return min(job['cores'] or 1, self.__cores)
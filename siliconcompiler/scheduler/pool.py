@@ -0,0 +1,46 @@
+import os
+import threading
+
+
+class NodePool:
+    '''
+    Cores shared by the local nodes of flows which run in the same process.
+
+    A node reserves the cores it requests with ['option', 'scheduler',
+    'cores'], or one core, before it starts. A node which requests more cores
+    than the pool has runs on its own.
+
+    Args:
+        cores (int): number of cores to share, defaults to the number of
+            cores of the machine
+    '''
+
+    def __init__(self, cores=None):
+        self.cores = cores or os.cpu_count() or 1
+        self.__used = 0
+        self.__lock = threading.Lock()
+
+    def acquire(self, cores):
+        '''
+        Reserves cores, and returns False if they are not free.
+        '''
+        cores = min(cores, self.cores)
+        with self.__lock:
+            if self.__used and self.__used + cores > self.cores:
+                return False
+            self.__used += cores
+            return True
+
+    def release(self, cores):
+        '''
+        Frees cores reserved with acquire().
+        '''
+        with self.__lock:
+            self.__used -= min(cores, self.cores)
+
+    @property
+    def used(self):
+        '''
+        Number of cores reserved.
+        '''
+        return self.__used
@@ -0,0 +1,257 @@
+import json
+import shlex
+import subprocess
+import uuid
+
+from siliconcompiler.scheduler.backend import SchedulerBackend, _get_cfg_dir, _get_log_path, \
+    _make_executable
+
+# Full list of Slurm states, split into 'active' and 'inactive' categories.
+# Many of these do not apply to a minimal configuration, but we'll track them all.
+# https://slurm.schedmd.com/squeue.html#SECTION_JOB-STATE-CODES
+SLURM_ACTIVE_STATES = [
+    'RUNNING',
+    'PENDING',
+    'CONFIGURING',
+    'COMPLETING',
+    'SIGNALING',
+    'STAGE_OUT',
+    'RESIZING',
+    'REQUEUED',
+]
+SLURM_INACTIVE_STATES = [
+    'BOOT_FAIL',
+    'CANCELLED',
+    'COMPLETED',
+    'DEADLINE',
+    'FAILED',
+    'NODE_FAIL',
+    'OUT_OF_MEMORY',
+    'PREEMPTED',
+    'RESV_DEL_HOLD',
+    'REQUEUE_FED',
+    'REQUEUE_HOLD',
+    'REVOKED',
+    'SPECIAL_EXIT',
+    'STOPPED',
+    'SUSPENDED',
+    'TIMEOUT',
+]
+
+
+class SlurmBackend(SchedulerBackend):
+    '''
+    Submits deferred nodes to a slurm cluster and tracks their jobs.
+
+    Nodes which are submitted together are grouped into one job array per
+    step and set of sbatch options. All outstanding jobs are checked with one
+    squeue call per interval, so the load on the slurm controller does not
+    grow with the number of nodes.
+
+    Args:
+        chip (Chip): chip running the flow
+    '''
+
+    def __init__(self, chip):
+        super().__init__(chip)
+
+        # Get the temporary UID associated with this job run.
+        self.__job_hash = chip.get('record', 'remoteid')
+        if not self.__job_hash:
+            # Generate a new uuid since it was not set
+            self.__job_hash = uuid.uuid4().hex
+
+        self.__partition = None
+
+    def _submit_jobs(self, jobs):
+        groups = {}
+        for job in jobs:
+            key = (job['node'][0], job['queue'], job['defer'])
+            groups.setdefault(key, []).append(job)
+
+        started = {}
+        for group in groups.values():
+            # Array task IDs must be integers, and the logs of the tasks are
+            # named by their ID, so it must match the index.
+            if len(group) > 1 and all(job['node'][1].isdigit() and
+                                      str(int(job['node'][1])) == job['node'][1]
+                                      for job in group):
+                started.update(self.__submit_array(group))
+            else:
+                for job in group:
+                    started.update(self.__submit_array([job]))
+        return started
+
+    def __submit_array(self, jobs):
+        chip = self._chip
+        step = jobs[0]['node'][0]
+        is_array = len(jobs) > 1
+
+        partition = jobs[0]['queue']
+        if not partition:
+            if not self.__partition:
+                try:
+                    self.__partition = _get_slurm_partition()
+                except RuntimeError as e:
+                    chip.logger.error(f'Unable to submit {step}: {e}')
+                    return {}
+            partition = self.__partition
+
+        if is_array:
+            indices = [job['node'][1] for job in jobs]
+            job_name = f'{self.__job_hash}_{step}'
+            # Each task writes to the log of its node
+            output_file = _get_log_path(chip, step, '%a')
+
+            # Each task of the array runs the script of its node.
+            cfg_dir = _get_cfg_dir(chip)
+            script_path = f'{cfg_dir}/sc_array_{step}.sh'
+            with open(script_path, 'w') as sf:
+                sf.write('#!/bin/bash\n')
+                sf.write(f'exec {shlex.quote(f"{cfg_dir}/{step}")}'
+                         '"${SLURM_ARRAY_TASK_ID}.sh"\n')
+            _make_executable(script_path)
+        else:
+            index = jobs[0]['node'][1]
+            job_name = f'{self.__job_hash}_{step}{index}'
+            output_file = jobs[0]['log']
+            script_path = jobs[0]['script']
+
+        # TODO: May need to prepend ('option', 'builddir') and remove the '--chdir' arg if
+        # running on a locally-managed cluster control node instead of submitting to a server app.
+        schedule_cmd = ['sbatch',
+                        '--parsable',
+                        '--exclusive',
+                        '--partition', partition,
+                        '--chdir', chip.cwd,
+                        '--job-name', job_name,
+                        '--output', output_file]
+        if is_array:
+            schedule_cmd.append(f'--array={",".join(indices)}')
+
+        # The script defining this Chip object may specify feature(s) to
+        # ensure that the job runs on a specific subset of available nodes.
+        # TODO: Maybe we should add a Schema parameter for these values.
+        if 'slurm_constraint' in chip.status:
+            schedule_cmd.extend(['--constraint', chip.status['slurm_constraint']])
+
+        # Only specify an account if accounting is required for this cluster/run.
+        if 'slurm_account' in chip.status:
+            schedule_cmd.extend(['--account', chip.status['slurm_account']])
+
+        # Only delay the starting time if the 'defer' Schema option is specified.
+        if jobs[0]['defer']:
+            schedule_cmd.extend(['--begin', jobs[0]['defer']])
+
+        schedule_cmd.append(script_path)
+
+        result = subprocess.run(schedule_cmd,
+                                stdout=subprocess.PIPE,
+                                stderr=subprocess.STDOUT)
+        result_msg = result.stdout.decode()
+        # The output is '<job ID>' or '<job ID>;<cluster>'
+        sbatch_id = result_msg.split(';')[0].strip()
+
+        if result.returncode != 0 or not sbatch_id.isdigit():
+            chip.logger.error(f'sbatch command for {step} failed.')
+            chip.logger.error(f'sbatch output for {step}:\n{result_msg}')
+            return {}
+
+        if not is_array:
+            return {sbatch_id: jobs[0]}
+        return {f'{sbatch_id}_{job["node"][1]}': job for job in jobs}
+
+    def _check_jobs(self, jobs):
+        chip = self._chip
+        job_ids = list(jobs)
+
+        # Array tasks are reported as <array job ID>_<task ID>.
+        sbatch_ids = sorted(set(job_id.split('_')[0] for job_id in job_ids))
+        jobcheck = subprocess.run(['squeue',
+                                   '--noheader',
+                                   '--array',
+                                   '--format=%i|%T',
+                                   f'--jobs={",".join(sbatch_ids)}'],
+                                  stdout=subprocess.PIPE,
+                                  stderr=subprocess.STDOUT)
+        jobout = jobcheck.stdout.decode()
+        if jobcheck.returncode != 0 and 'Invalid job id specified' not in jobout:
+            chip.logger.warning(f'squeue failed: {jobout.strip()}')
+            return None
+
+        states = _parse_job_states(jobout) if jobcheck.returncode == 0 else {}
+
+        # Jobs which are no longer listed may have already completed and been
+        # purged from the active list, so look them up in the accounting records.
+        purged = [job_id for job_id in job_ids if job_id not in states]
+        if purged:
+            states.update(_get_accounting_states(purged))
+
+        ended = {}
+        for job_id in job_ids:
+            state = states.get(job_id)
+            # 'COMPLETED' is a special case indicating successful job termination.
+            if state == 'COMPLETED' or state is None:
+                ended[job_id] = True
+            # Jobs have a number of potential states that they can be in if they
+            # did not terminate successfully.
+            elif state in SLURM_INACTIVE_STATES:
+                # FAILED, TIMEOUT, etc.
+                step, index = jobs[job_id]['node']
+                chip.logger.error(f'slurm job {job_id} for {step}{index} ended with '
+                                  f'state {state}, see {jobs[job_id]["log"]}.')
+                ended[job_id] = False
+        return ended
+
+    def _cancel_jobs(self, job_ids):
+        subprocess.run(['scancel'] + sorted(job_ids),
+                       stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL)
+
+
+def _parse_job_states(output):
+    '''
+    Parse '<job ID>|<state>' lines, as printed by squeue and sacct.
+    '''
+    states = {}
+    for line in output.splitlines():
+        fields = line.strip().split('|')
+        if len(fields) < 2 or not fields[1]:
+            continue
+        # sacct reports some states with details, ie. 'CANCELLED by 1000'
+        states[fields[0]] = fields[1].split()[0].rstrip('+')
+    return states
+
+
+def _get_accounting_states(job_ids):
+    '''
+    Returns the final states of jobs, from the slurm accounting records.
+
+    Jobs are missing from the result if accounting is not enabled.
+    '''
+    acct = subprocess.run(['sacct',
+                           '--noheader',
+                           '--parsable2',
+                           '--allocations',
+                           '--format=JobID,State',
+                           f'--jobs={",".join(sorted(job_ids))}'],
+                          stdout=subprocess.PIPE,
+                          stderr=subprocess.DEVNULL)
+    if acct.returncode != 0:
+        return {}
+    states = _parse_job_states(acct.stdout.decode())
+    return {job_id: state for job_id, state in states.items() if job_id in job_ids}
+
+
+def _get_slurm_partition():
+    partitions = subprocess.run(['sinfo', '--json'],
+                                stdout=subprocess.PIPE,
+                                stderr=subprocess.STDOUT)
+
+    if partitions.returncode != 0:
+        raise RuntimeError('Unable to determine partitions in slurm')
+
+    sinfo = json.loads(partitions.stdout.decode())
+
+    # Return the first listed partition
+    return sinfo['nodes'][0]['partitions'][0]
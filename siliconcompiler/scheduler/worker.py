@@ -0,0 +1,233 @@
+import os
+import time
+
+import requests
+
+from siliconcompiler.scheduler.backend import SchedulerBackend
+
+
+# Port of the sc-worker daemons and their coordinator
+DEFAULT_PORT = 8090
+
+# Environment variable with the token shared by the workers of a pool and the
+# flows which use them
+TOKEN_ENV = 'SC_WORKER_TOKEN'
+
+# Header which carries the token in requests to workers
+TOKEN_HEADER = 'X-SC-Worker-Token'
+
+# Workers which did not register for this long are considered lost, in seconds
+WORKER_TIMEOUT = 10
+
+# Time between status checks of the jobs on workers, in seconds.
+POLL_INTERVAL = 0.5
+
+# Timeout of requests to workers and coordinators, in seconds.
+REQUEST_TIMEOUT = 10
+
+
+class WorkerBackend(SchedulerBackend):
+    '''
+    Dispatches deferred nodes to a pool of sc-worker daemons.
+
+    The workers of the pool are listed by their coordinator, which is
+    ['option', 'scheduler', 'queue'] as host:port, and defaults to the
+    default port on localhost. Nodes wait until a worker has the cores and
+    memory they request with ['option', 'scheduler', 'cores'] and
+    ['option', 'scheduler', 'memory'], and are then sent to the worker with
+    the most free cores. A node which requests more than any worker has waits
+    for an idle worker, and nodes fail if no worker registers with the
+    coordinator.
+
+    Requests to the workers are authenticated with the token of the pool,
+    which is read from the SC_WORKER_TOKEN environment variable.
+
+    Args:
+        chip (Chip): chip running the flow
+    '''
+
+    def __init__(self, chip):
+        super().__init__(chip, poll_interval=POLL_INTERVAL)
+
+        self.__session = requests.Session()
+        token = os.environ.get(TOKEN_ENV)
+        if token:
+            self.__session.headers[TOKEN_HEADER] = token
+        else:
+            chip.logger.warning(f'{TOKEN_ENV} is not set, workers will reject the nodes.')
+        self.__job_count = 0
+        # Jobs waiting for a worker, in submission order
+        self.__queue = []
+        # {job ID: (worker address, job ID on the worker)}
+        self.__dispatched = {}
+        # {worker or coordinator address: time of the first failed request}
+        self.__unreachable = {}
+        # {coordinator address: time since which it lists no workers}
+        self.__no_workers = {}
+        # Jobs which were reported to request more than any worker has
+        self.__oversized = set()
+
+    def _submit_jobs(self, jobs):
+        started = {}
+        for job in jobs:
+            job_id = str(self.__job_count)
+            self.__job_count += 1
+            self.__queue.append(job_id)
+            started[job_id] = job
+        return started
+
+    def _check_jobs(self, jobs):
+        chip = self._chip
+        ended = {}
+
+        workers = {}
+        for job_id, (address, worker_job_id) in self.__dispatched.items():
+            workers.setdefault(address, {})[worker_job_id] = job_id
+
+        for address, worker_jobs in workers.items():
+            try:
+                states = self.__post(address, 'check_jobs', {'jobs': list(worker_jobs)})['jobs']
+            except requests.RequestException as e:
+                if self.__is_lost(address):
+                    chip.logger.error(f'Worker {address} is unreachable: {e}')
+                    states = {}
+                else:
+                    continue
+
+            for worker_job_id, job_id in worker_jobs.items():
+                state = states.get(worker_job_id, 'unknown')
+                if state == 'running':
+                    continue
+                del self.__dispatched[job_id]
+                ended[job_id] = state == 'success'
+                if state != 'success':
+                    step, index = jobs[job_id]['node']
+                    chip.logger.error(f'Job for {step}{index} on {address} ended with state '
+                                      f'{state}, see {jobs[job_id]["log"]}.')
+
+        self.__dispatch(jobs, ended)
+
+        return ended
+
+    def _cancel_jobs(self, job_ids):
+        workers = {}
+        for job_id in job_ids:
+            if job_id in self.__queue:
+                self.__queue.remove(job_id)
+            if job_id in self.__dispatched:
+                address, worker_job_id = self.__dispatched.pop(job_id)
+                workers.setdefault(address, []).append(worker_job_id)
+
+        for address, worker_job_ids in workers.items():
+            try:
+                self.__post(address, 'cancel_jobs', {'jobs': worker_job_ids})
+            except requests.RequestException as e:
+                self._chip.logger.warning(f'Unable to cancel jobs on {address}: {e}')
+
+    def __dispatch(self, jobs, ended):
+        chip = self._chip
+
+        coordinators = {}
+        for job_id in self.__queue:
+            coordinator = jobs[job_id]['queue'] or f'localhost:{DEFAULT_PORT}'
+            coordinators.setdefault(coordinator, []).append(job_id)
+
+        for coordinator, job_ids in coordinators.items():
+            try:
+                workers = self.__post(coordinator, 'list_workers', {})['workers']
+            except requests.RequestException as e:
+                if self.__is_lost(coordinator):
+                    chip.logger.error(f'Worker coordinator {coordinator} is unreachable: {e}')
+                    for job_id in job_ids:
+                        self.__queue.remove(job_id)
+                        ended[job_id] = False
+                continue
+
+            if not workers:
+                no_workers = self.__no_workers.setdefault(coordinator, time.time())
+                if time.time() - no_workers > WORKER_TIMEOUT:
+                    chip.logger.error(f'No workers are registered with {coordinator}.')
+                    for job_id in job_ids:
+                        self.__queue.remove(job_id)
+                        ended[job_id] = False
+                continue
+            self.__no_workers.pop(coordinator, None)
+
+            for job_id in job_ids:
+                job = jobs[job_id]
+                cores = job['cores'] or 1
+                memory = job['memory'] or 0
+
+                if job_id not in self.__oversized and \
+                        not any(cores <= worker['cores'] and memory <= worker['memory']
+                                for worker in workers):
+                    self.__oversized.add(job_id)
+                    step, index = job['node']
+                    chip.logger.warning(f'{step}{index} requests {cores} cores and {memory} MB, '
+                                        f'more than any worker of {coordinator} has, it will '
+                                        'run once a worker is idle.')
+
+                while True:
+                    candidates = [worker for worker in workers
+                                  if _fits(worker, cores, memory)]
+                    if not candidates:
+                        break
+                    worker = max(candidates, key=lambda worker: worker['free_cores'])
+                    if self.__run_job(worker['address'], job_id, job, cores, memory):
+                        # Account for the job until the worker registers again.
+                        worker['jobs'] += 1
+                        worker['free_cores'] -= cores
+                        worker['free_memory'] -= memory
+                        break
+                    # The worker is busy or gone, try the others.
+                    workers.remove(worker)
+
+    def __run_job(self, address, job_id, job, cores, memory):
+        step, index = job['node']
+        try:
+            resp = self.__post(address, 'run_job', {
+                'name': f'{step}{index}',
+                'script': os.path.abspath(job['script']),
+                'cwd': self._chip.cwd,
+                'log': os.path.abspath(job['log']),
+                'cores': cores,
+                'memory': memory
+            })
+        except requests.HTTPError as e:
+            if e.response.status_code != 409:
+                self._chip.logger.warning(f'Unable to run {step}{index} on {address}: {e}')
+            return False
+        except requests.RequestException as e:
+            self._chip.logger.warning(f'Unable to run {step}{index} on {address}: {e}')
+            return False
+
+        self.__queue.remove(job_id)
+        self.__dispatched[job_id] = (address, resp['job_id'])
+        self._chip.logger.info(f'Running {step}{index} on {address}')
+        return True
+
+    def __post(self, address, action, data):
+        resp = self.__session.post(f'http://{address}/{action}/', json=data,
+                                   timeout=REQUEST_TIMEOUT)
+        resp.raise_for_status()
+        self.__unreachable.pop(address, None)
+        return resp.json()
+
+    def __is_lost(self, address):
+        '''
+        Returns True if requests to address have failed for longer than
+        WORKER_TIMEOUT.
+        '''
+        first_failure = self.__unreachable.setdefault(address, time.time())
+        return time.time() - first_failure > WORKER_TIMEOUT
+
+
+def _fits(worker, cores, memory):
+    '''
+    Returns True if a worker can run a job requesting cores and memory.
+
+    A job which requests more than a worker has runs once the worker is idle.
+    '''
+    if worker['jobs'] == 0:
+        return True
+    return cores <= worker['free_cores'] and memory <= worker['free_memory']
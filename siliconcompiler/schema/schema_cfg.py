@@ -11,7 +11,7 @@ try:
 except ImportError:
     from siliconcompiler.schema.utils import trim
 
-SCHEMA_VERSION = '0.40.3'
+SCHEMA_VERSION = '0.40.8'
 
 #############################################################################
 # PARAM DEFINITION
@@ -2981,6 +2981,45 @@ def schema_option(cfg):
             EDA tool. If the step is a command line tool, then the flow
             drops into a Python interpreter.""")
 
+    scparam(cfg, ['option', 'speculate'],
+            sctype='bool',
+            scope='job',
+            pernode='optional',
+            shorthelp="Terminate dominated indices early",
+            switch="-speculate <bool>",
+            example=[
+                "cli: -speculate true",
+                "api: chip.set('option', 'speculate', True)"],
+            schelp="""
+            Terminates parallel indices of a step early, when they can no longer
+            be picked by the minimum or maximum step they feed. While a node runs,
+            its runtime, memory usage and the metrics reported by its tool are
+            compared with its goals, and with the final metrics of the indices
+            of the same step which already finished. A node which exceeds a goal,
+            or which is no better on any weighted metric than a finished index,
+            is stopped and marked as failed, so that its cores are freed for
+            the remaining nodes. The tools bundled with SiliconCompiler do not
+            report metrics while they run, so only goals and weights on the
+            runtime and memory usage can stop their nodes.""")
+
+    scparam(cfg, ['option', 'speculatemargin'],
+            sctype='float',
+            scope='job',
+            pernode='optional',
+            defvalue=0.1,
+            shorthelp="Margin before terminating dominated indices",
+            switch="-speculatemargin <float>",
+            example=[
+                "cli: -speculatemargin 0.2",
+                "api: chip.set('option', 'speculatemargin', 0.2)"],
+            schelp="""
+            Relative margin applied by :keypath:`option, speculate` before a running
+            node is stopped because an index which already finished is better.
+            The finished index must be at least as good as the running node on
+            every weighted metric, and better on one, by this fraction of its
+            own weighted metrics. A larger margin leaves more room for the live
+            metrics of the running node to improve before it finishes.""")
+
     filetype = 'default'
     scparam(cfg, ['option', 'showtool', filetype],
             sctype='str',
@@ -3037,6 +3076,21 @@ def schema_option(cfg):
             * any files generated by schema-specified regexes
             * files specified by :keypath:`tool, <tool>, task, <task>, keep`""")
 
+    scparam(cfg, ['option', 'artifactstore'],
+            sctype='bool',
+            scope='job',
+            shorthelp="Enable artifact store",
+            switch="-artifactstore <bool>",
+            example=["cli: -artifactstore",
+                     "api: chip.set('option', 'artifactstore', True)"],
+            schelp="""
+            Enables the content-addressed artifact store. Node outputs are
+            stored once as immutable files in the job directory, and the
+            inputs of downstream nodes are populated with links to the stored
+            files instead of copies. When :keypath:`option, clean` is set,
+            stored files which are no longer referenced by any node are
+            removed at the end of the run.""")
+
     scparam(cfg, ['option', 'hash'],
             sctype='bool',
             scope='job',
@@ -3373,7 +3427,7 @@ def schema_option(cfg):
     # job scheduler
     scparam(cfg, ['option', 'scheduler', 'name'],
             sctype='enum',
-            enum=["slurm", "lsf", "sge"],
+            enum=["slurm", "lsf", "sge", "local", "batch", "worker"],
             scope='job',
             pernode='optional',
             shorthelp="Option: Scheduler platform",
@@ -3388,7 +3442,14 @@ def schema_option(cfg):
             the host running the 'sc' command must be running a 'slurmctld' daemon
             managing a Slurm cluster. Additionally, the build directory ('-dir')
             must be located in shared storage which can be accessed by all hosts
-            in the cluster.""")
+            in the cluster. If 'local' is used, the steps are run as separate
+            processes on the same machine, limited by the number of cores.
+            If 'batch' is used, the steps are written to the queue directory
+            :keypath:`option, scheduler, queue` and run by workers started
+            with 'python -m siliconcompiler.scheduler.batch_worker <queue>'.
+            If 'worker' is used, the steps are dispatched to a pool of
+            'sc-worker' daemons, whose coordinator is
+            :keypath:`option, scheduler, queue`.""")
 
     scparam(cfg, ['option', 'scheduler', 'cores'],
             sctype='int',
@@ -3429,7 +3490,11 @@ def schema_option(cfg):
                      "api: chip.set('option', 'scheduler', 'queue', 'nightrun')"],
             schelp="""
             Send the job to the specified queue. With slurm, this
-            translates to 'partition'. The queue name must match
+            translates to 'partition'. With the batch scheduler, this is
+            the queue directory, which defaults to 'sc_batch' in the build
+            directory. With the worker scheduler, this is the <host>:<port>
+            of the coordinator of the workers, which defaults to
+            localhost:8090. The queue name must match
             the name of an existing job scheduler queue. For more information,
             see the job scheduler documentation""")
 
@@ -207,11 +207,14 @@ class Schema:
 
     ###########################################################################
     @staticmethod
-    def _set(*args, logger=None, cfg=None, field='value', clobber=True, step=None, index=None):
+    def _set(*args, logger=None, cfg=None, field='value', clobber=True, step=None, index=None,
+             normalize=True):
         '''
         Sets a schema parameter field.
 
         See :meth:`~siliconcompiler.core.Chip.set` for detailed documentation.
+        With normalize=False, the value must already have been checked and
+        normalized with :meth:`_check_and_normalize`.
         '''
         keypath = args[:-1]
         value = args[-1]
@@ -242,7 +245,9 @@ class Schema:
         if 'enum' in cfg:
             allowed_values = cfg['enum']
 
-        value = Schema._check_and_normalize(value, cfg['type'], field, keypath, allowed_values)
+        if normalize:
+            value = Schema._check_and_normalize(value, cfg['type'], field, keypath,
+                                                allowed_values)
 
         if field in Schema.PERNODE_FIELDS:
             step = step if step is not None else Schema.GLOBAL_KEY
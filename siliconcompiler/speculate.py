@@ -0,0 +1,213 @@
+import json
+import os
+import time
+import uuid
+
+from siliconcompiler._common import NodeStatus
+from siliconcompiler.schema import Schema
+
+
+# Name of the file in the work directory of a running node with its live metrics
+LIVE_METRICS_FILE = 'sc_live_metrics.json'
+
+# Minimum time between updates of the live metrics of a running node, in seconds
+LIVE_METRICS_INTERVAL = 2.0
+
+# Minimum time between checks of the running nodes, in seconds
+CHECK_INTERVAL = 2.0
+
+
+def write_live_metrics(workdir, metrics):
+    '''
+    Publishes the current metrics of a running node.
+
+    Args:
+        workdir (str): work directory of the node
+        metrics (dict): {metric: value}, in the units of the metric schema
+    '''
+    path = os.path.join(workdir, LIVE_METRICS_FILE)
+    tmp_path = f'{path}.{uuid.uuid4().hex}'
+    with open(tmp_path, 'w') as f:
+        json.dump(metrics, f)
+    os.replace(tmp_path, path)
+
+
+def read_live_metrics(workdir):
+    '''
+    Returns the last metrics published by a running node, or None.
+    '''
+    try:
+        with open(os.path.join(workdir, LIVE_METRICS_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def get_live_metrics(chip, step, index, elapsed, memory):
+    '''
+    Collects the live metrics of a running node.
+
+    The runtime and memory usage are measured while the tool runs. A task
+    can report further metrics, such as the timing of an intermediate
+    stage, with a live_metrics(chip) function which returns {metric: value}.
+
+    Args:
+        chip (Chip): chip of the running node
+        step (str): step of the node
+        index (str): index of the node
+        elapsed (float): time the tool has been running, in seconds
+        memory (int): maximum memory used by the tool so far, in bytes
+    '''
+    metrics = {'tasktime': elapsed, 'memory': memory}
+
+    flow = chip.get('option', 'flow')
+    live_metrics = getattr(chip._get_task_module(step, index, flow=flow, error=False),
+                           'live_metrics', None)
+    if live_metrics:
+        try:
+            metrics.update(live_metrics(chip))
+        except Exception as e:
+            chip.logger.debug(f'Unable to collect live metrics: {e}')
+
+    return metrics
+
+
+class Speculator:
+    '''
+    Terminates parallel indices of a step which can no longer be selected.
+
+    Applies to the running nodes with ['option', 'speculate'] set, which feed
+    a minimum or maximum builtin. A node is terminated when one of its live
+    metrics exceeds its goal, or when a sibling index which already finished
+    and met its goals is at least as good on every weighted metric, and
+    better on one, by the margin in ['option', 'speculatemargin']. The
+    terminated nodes fail, so the selection skips them.
+
+    Live metrics are estimates of the final metrics: the runtime and memory
+    usage only grow, while metrics reported by tools from intermediate
+    stages may still improve. None of the bundled tools defines
+    live_metrics(), so their nodes are only terminated on goals and weights
+    of 'tasktime' and 'memory'.
+
+    Args:
+        chip (Chip): chip running the flow
+        nodes (list): nodes to run
+    '''
+
+    def __init__(self, chip, nodes):
+        self.__chip = chip
+        self.__flow = chip.get('option', 'flow')
+        self.__last_check = 0
+
+        # {node: selector operation}, for the nodes which can be terminated
+        self.__nodes = {}
+        for step, index in nodes:
+            if not chip.get('option', 'speculate', step=step, index=index):
+                continue
+            op = self.__get_selector(step, index)
+            if op:
+                self.__nodes[(step, index)] = op
+
+        # {node: metrics}, final metrics of the finished nodes
+        self.__final_metrics = {}
+
+    def __bool__(self):
+        return bool(self.__nodes)
+
+    def check(self, running_nodes, status):
+        '''
+        Returns the running nodes to terminate, as {node: reason}.
+
+        Args:
+            running_nodes (list): nodes which are running
+            status (dict): status of the nodes of the flow
+        '''
+        now = time.time()
+        if now - self.__last_check < CHECK_INTERVAL:
+            return {}
+        self.__last_check = now
+
+        terminate = {}
+        for node in running_nodes:
+            if node not in self.__nodes:
+                continue
+            step, index = node
+            live = read_live_metrics(self.__chip._getworkdir(step=step, index=index))
+            if not live:
+                continue
+
+            reason = self.__exceeded_goal(node, live)
+            if not reason:
+                reason = self.__dominated(node, live, status)
+            if reason:
+                terminate[node] = reason
+
+        return terminate
+
+    def __get_selector(self, step, index):
+        chip = self.__chip
+        for out_step, out_index in chip._get_flowgraph_node_outputs(self.__flow, (step, index)):
+            tool, task = chip._get_tool_task(out_step, out_index, self.__flow)
+            if tool == 'builtin' and task in ('minimum', 'maximum'):
+                return task
+        return None
+
+    def __exceeded_goal(self, node, metrics):
+        step, index = node
+        for metric in self.__chip.getkeys('flowgraph', self.__flow, step, index, 'goal'):
+            goal = self.__chip.get('flowgraph', self.__flow, step, index, 'goal', metric)
+            value = metrics.get(metric)
+            if goal is not None and value is not None and abs(value) > goal:
+                return f"'{metric}' is {value}, which exceeds the goal of {goal}"
+        return None
+
+    def __dominated(self, node, live, status):
+        chip = self.__chip
+        flow = self.__flow
+        step, index = node
+
+        weights = {}
+        for metric in chip.getkeys('flowgraph', flow, step, index, 'weight'):
+            weight = chip.get('flowgraph', flow, step, index, 'weight', metric)
+            if weight:
+                weights[metric] = weight
+        if not weights or any(metric not in live for metric in weights):
+            return None
+
+        margin = chip.get('option', 'speculatemargin', step=step, index=index) or 0
+
+        # Lower values are better for a minimum selection with positive weights
+        sign = 1 if self.__nodes[node] == 'minimum' else -1
+        for sibling in chip._get_flowgraph_nodes(flow, steps=[step]):
+            if sibling == node or status.get(sibling) != NodeStatus.SUCCESS:
+                continue
+            final = self.__get_final_metrics(sibling)
+            if final is None or self.__exceeded_goal(sibling, final):
+                continue
+            if any(final.get(metric) is None for metric in weights):
+                continue
+
+            # The sibling must win by the margin, relative to its own metrics
+            better = [sign * weight * (final[metric] - live[metric]) +
+                      margin * abs(weight * final[metric])
+                      for metric, weight in weights.items()]
+            if all(diff <= 0 for diff in better) and any(diff < 0 for diff in better):
+                return f'{sibling[0]}{sibling[1]} already finished with better ' + \
+                    ', '.join(f"'{metric}'" for metric in weights)
+        return None
+
+    def __get_final_metrics(self, node):
+        if node not in self.__final_metrics:
+            step, index = node
+            chip = self.__chip
+            manifest = os.path.join(chip._getworkdir(step=step, index=index),
+                                    'outputs', f'{chip.design}.pkg.json')
+            metrics = None
+            try:
+                schema = Schema(manifest=manifest)
+                metrics = {metric: schema.get('metric', metric, step=step, index=index)
+                           for metric in schema.getkeys('metric')}
+            except Exception as e:
+                chip.logger.debug(f'Unable to read metrics of {step}{index}: {e}')
+            self.__final_metrics[node] = metrics
+        return self.__final_metrics[node]
@@ -317,6 +317,8 @@ def post_process(chip):
         or_units['area'] = f"{or_units['distance']}^2"
         or_units['frequency'] = 'Hz'  # always hertz
 
+        record_metrics = {}
+
         has_timing = True
         if 'sc__metric__timing__clocks' in metrics:
             has_timing = metrics['sc__metric__timing__clocks'] > 0
@@ -359,28 +361,14 @@ def post_process(chip):
                         or_unit = None
 
                 if or_use:
-                    chip._record_metric(step, index, metric, value,
-                                        get_metric_sources(metric),
-                                        source_unit=or_unit)
+                    record_metrics[metric] = (value, or_unit, get_metric_sources(metric))
 
         # setup wns and hold wns can be computed from setup slack and hold slack
-        if 'sc__metric__timing__setup__ws' in metrics and \
-           has_timing and \
-           chip.get('metric', 'setupslack', step=step, index=index) is not None:
-            wns = min(0.0, chip.get('metric', 'setupslack', step=step, index=index))
-            wns_units = chip.get('metric', 'setupslack', field='unit')
-            chip._record_metric(step, index, 'setupwns', wns,
-                                get_metric_sources('setupslack'),
-                                source_unit=wns_units)
-
-        if 'sc__metric__timing__hold__ws' in metrics and \
-           has_timing and \
-           chip.get('metric', 'holdslack', step=step, index=index) is not None:
-            wns = min(0.0, chip.get('metric', 'holdslack', step=step, index=index))
-            wns_units = chip.get('metric', 'holdslack', field='unit')
-            chip._record_metric(step, index, 'holdwns', wns,
-                                get_metric_sources('holdslack'),
-                                source_unit=wns_units)
+        for wns_metric, slack_metric in [('setupwns', 'setupslack'),
+                                         ('holdwns', 'holdslack')]:
+            if slack_metric in record_metrics and record_metrics[slack_metric][0] is not None:
+                slack, slack_unit, slack_sources = record_metrics[slack_metric]
+                record_metrics[wns_metric] = (min(0.0, slack), slack_unit, slack_sources)
 
         drvs = None
         for metric in ['sc__metric__timing__drv__max_slew',
@@ -396,7 +384,9 @@ def post_process(chip):
                     drvs += int(metrics[metric])
 
         if drvs is not None:
-            chip._record_metric(step, index, 'drvs', drvs, get_metric_sources('drv'))
+            record_metrics['drvs'] = (drvs, None, get_metric_sources('drv'))
+
+        chip._record_metrics(step, index, record_metrics)
 
 
 ######
@@ -242,6 +242,7 @@ def vpr_post_process(chip):
         "dsps": 0,
         "brams": 0
     }
+    record_metrics = {}
     with open(log_file, 'r') as f:
         in_stats = False
         for line in f:
@@ -256,9 +257,9 @@ def vpr_post_process(chip):
                     value = int(value)
 
                     if dtype == "Blocks":
-                        chip._record_metric(step, index, "cells", value, log_file)
+                        record_metrics["cells"] = (value, None, log_file)
                     elif dtype == "Nets":
-                        chip._record_metric(step, index, "nets", value, log_file)
+                        record_metrics["nets"] = (value, None, log_file)
                     elif dtype in dff_cells:
                         mdata["registers"] += value
                     elif dtype in dsps_cells:
@@ -279,20 +280,17 @@ def vpr_post_process(chip):
                 if route_len_data:
                     # Fake the unit since this is meaningless for the FPGA
                     units = chip.get('metric', 'wirelength', field='unit')
-                    chip._record_metric(step, index, 'wirelength',
-                                        int(route_len_data[0]),
-                                        log_file,
-                                        source_unit=units)
+                    record_metrics['wirelength'] = (int(route_len_data[0]), units, log_file)
 
     for metric, value in mdata.items():
-        chip._record_metric(step, index, metric, value, log_file)
+        record_metrics[metric] = (value, None, log_file)
 
     if os.path.exists(__block_file):
         with open(__block_file, 'r') as f:
             data = json.load(f)
 
-            if "num_nets" in data and chip.get('metric', 'nets', step=step, index=index) is None:
-                chip._record_metric(step, index, "nets", int(data["num_nets"]), __block_file)
+            if "num_nets" in data and "nets" not in record_metrics:
+                record_metrics["nets"] = (int(data["num_nets"]), None, __block_file)
 
             io = 0
             if "input_pins" in data:
@@ -300,7 +298,9 @@ def vpr_post_process(chip):
             if "output_pins" in data:
                 io += int(data["output_pins"])
 
-            chip._record_metric(step, index, "pins", io, __block_file)
+            record_metrics["pins"] = (io, None, __block_file)
+
+    chip._record_metrics(step, index, record_metrics)
 
 
 ##################################################
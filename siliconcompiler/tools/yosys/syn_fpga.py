@@ -125,5 +125,5 @@ def post_process(chip):
             elif cell in brams_cells:
                 data["brams"] += count
 
-        for metric, value in data.items():
-            chip._record_metric(step, index, metric, value, "reports/stat.json")
+        chip._record_metrics(step, index, {
+            metric: (value, None, "reports/stat.json") for metric, value in data.items()})
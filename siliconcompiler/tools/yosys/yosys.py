@@ -103,24 +103,18 @@ def syn_post_process(chip):
     step = chip.get('arg', 'step')
     index = chip.get('arg', 'index')
 
+    record_metrics = {}
     with open("reports/stat.json", 'r') as f:
         metrics = json.load(f)
         if "design" in metrics:
             metrics = metrics["design"]
 
         if "area" in metrics:
-            chip._record_metric(step, index, 'cellarea',
-                                float(metrics["area"]),
-                                "reports/stat.json",
-                                source_unit='um^2')
+            record_metrics['cellarea'] = (float(metrics["area"]), 'um^2', "reports/stat.json")
         if "num_cells" in metrics:
-            chip._record_metric(step, index, 'cells',
-                                metrics["num_cells"],
-                                "reports/stat.json")
+            record_metrics['cells'] = (metrics["num_cells"], None, "reports/stat.json")
         if "num_wire_bits" in metrics:
-            chip._record_metric(step, index, 'nets',
-                                metrics["num_wire_bits"],
-                                "reports/stat.json")
+            record_metrics['nets'] = (metrics["num_wire_bits"], None, "reports/stat.json")
 
     registers = None
     with open(f"{step}.log", 'r') as f:
@@ -131,7 +125,9 @@ def syn_post_process(chip):
                     registers = 0
                 registers += int(line_registers[0])
     if registers is not None:
-        chip._record_metric(step, index, 'registers', registers, f"{step}.log")
+        record_metrics['registers'] = (registers, None, f"{step}.log")
+
+    chip._record_metrics(step, index, record_metrics)
 
 
 ##################################################
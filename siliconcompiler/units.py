@@ -51,6 +51,13 @@ BINARY_TYPES = (
 )
 
 
+# Compiled (scale, power, base unit) of each unit, see _get_unit()
+_UNIT_TABLE = {}
+
+# Compiled scale factors for each (from_unit, to_unit) pair, see _get_conversion_scale()
+_CONVERSION_TABLE = {}
+
+
 def convert(value, from_unit=None, to_unit=None):
     '''
     Convert a value to from one SI power to another SI power
@@ -63,13 +70,64 @@ def convert(value, from_unit=None, to_unit=None):
     Returns:
         float: scaled value
     '''
-    value = float(value)
+    return float(value) * _get_conversion_scale(from_unit, to_unit)
+
+
+def convert_many(values, from_unit=None, to_unit=None):
+    '''
+    Convert a list of values from one SI power to another SI power.
+
+    The units are only looked up once, so this is faster than calling
+    :func:`convert` for each value. None values are passed through unchanged.
 
-    power = get_si_power(to_unit)
+    Args:
+        values (list of float): values to convert
+        from_unit (str): unit of the values, default is None and assumes no magnitude
+        to_unit (str): unit of the return, default is None and assumes no magnitude
+
+    Returns:
+        list of float: scaled values
+    '''
+    scale = _get_conversion_scale(from_unit, to_unit)
+    return [None if value is None else float(value) * scale for value in values]
+
+
+def is_convertible(from_unit, to_unit):
+    '''
+    Check if two units only differ in their SI prefix.
 
-    from_scale = _get_scale(from_unit) ** power
-    to_scale = _get_scale(to_unit) ** power
-    scale = from_scale / to_scale
+    For example:
+    is_convertible('um^2', 'mm^2') -> True
+    is_convertible('um', 'ns') -> False
+    '''
+    _, from_power, from_base = _get_unit(from_unit)
+    _, to_power, to_base = _get_unit(to_unit)
+    return from_power == to_power and from_base.lower() == to_base.lower()
+
+
+def _get_unit(unit):
+    try:
+        return _UNIT_TABLE[unit]
+    except KeyError:
+        pass
+
+    power = get_si_power(unit)
+    base = re.sub(r'\^[0-9]+$', '', unit or '')[len(get_si_prefix(unit)):]
+    info = (_get_scale(unit), power, base)
+    _UNIT_TABLE[unit] = info
+    return info
+
+
+def _get_conversion_scale(from_unit, to_unit):
+    try:
+        return _CONVERSION_TABLE[(from_unit, to_unit)]
+    except KeyError:
+        pass
+
+    from_scale, _, _ = _get_unit(from_unit)
+    to_scale, power, _ = _get_unit(to_unit)
+
+    scale = (from_scale ** power) / (to_scale ** power)
     if scale > 1:
         scale = round(scale)
     elif scale < 1:
@@ -77,7 +135,21 @@ def convert(value, from_unit=None, to_unit=None):
     else:
         scale = round(scale)
 
-    return value * scale
+    _CONVERSION_TABLE[(from_unit, to_unit)] = scale
+    return scale
+
+
+def _compile_tables():
+    '''
+    Precompute the scale factors between all prefixes of each SI unit, so
+    conversions of recorded metrics and report values are table lookups.
+    '''
+    for si_type in SI_TYPES + ('',):
+        for power in ('', '^2', '^3'):
+            units = [None] + [f'{prefix}{si_type}{power}' for prefix, _ in SI_UNITS]
+            for from_unit in units:
+                for to_unit in units:
+                    _get_conversion_scale(from_unit, to_unit)
 
 
 def _get_scale(unit):
@@ -257,3 +329,6 @@ def format_time(value):
     ftime += f'{int(seconds):02}.'
     ftime += f'{int(milliseconds):03}'
     return ftime
+
+
+_compile_tables()
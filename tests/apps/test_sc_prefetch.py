@@ -0,0 +1,74 @@
+import json
+import os
+import pathlib
+
+import git
+import pytest
+
+import siliconcompiler
+from siliconcompiler import package
+from siliconcompiler.apps import sc_prefetch
+
+
+@pytest.fixture
+def remote_repo(monkeypatch):
+    '''
+    Git repository which is cloned in place of https://example.com/remote
+    '''
+    repo_path = os.path.abspath('remote')
+    repo = git.Repo.init(repo_path)
+    os.makedirs(os.path.join(repo_path, 'lib'))
+    with open(os.path.join(repo_path, 'lib', 'a.v'), 'w') as f:
+        f.write('a')
+    repo.index.add(['lib/a.v'])
+    repo.index.commit('initial')
+    repo.create_tag('v1')
+
+    monkeypatch.setenv('GIT_CONFIG_COUNT', '1')
+    monkeypatch.setenv('GIT_CONFIG_KEY_0', f'url.{pathlib.Path(repo_path).as_uri()}.insteadOf')
+    monkeypatch.setenv('GIT_CONFIG_VALUE_0', 'https://example.com/remote')
+    monkeypatch.setattr(package, 'CHECK_DIRTY_CACHE', False)
+    return repo
+
+
+def write_manifest(path):
+    chip = siliconcompiler.Chip('test')
+    chip.register_package_source('remote', 'git+https://example.com/remote', 'v1')
+    chip.input(path, package='remote')
+    chip.write_manifest('test.pkg.json')
+
+
+def test_sc_prefetch(remote_repo, monkeypatch):
+    write_manifest('lib/a.v')
+    cache = os.path.abspath('cache')
+
+    monkeypatch.setattr('sys.argv', ['sc-prefetch', '-cfg', 'test.pkg.json', '-cache', cache])
+    assert sc_prefetch.main() == 0
+
+    with open(os.path.join(cache, package.CACHE_INDEX)) as f:
+        assert json.load(f) == {
+            'remote-v1': {'path': 'git+https://example.com/remote', 'ref': 'v1'}}
+
+    # Indexed data sources are used without git operations
+    def no_repo(path):
+        raise AssertionError(f'git used for {path}')
+    monkeypatch.setattr(package, 'Repo', no_repo)
+
+    chip = siliconcompiler.Chip('test')
+    chip.read_manifest('test.pkg.json')
+    chip.set('option', 'cache', cache)
+    assert package.path(chip, 'remote') == os.path.join(cache, 'remote-v1')
+
+
+def test_sc_prefetch_missing_file(remote_repo, monkeypatch):
+    write_manifest('lib/missing.v')
+    cache = os.path.abspath('cache')
+
+    monkeypatch.setattr('sys.argv', ['sc-prefetch', '-cfg', 'test.pkg.json', '-cache', cache])
+    assert sc_prefetch.main() == 1
+    assert not os.path.exists(os.path.join(cache, package.CACHE_INDEX))
+
+
+def test_sc_prefetch_unknown_package(monkeypatch):
+    monkeypatch.setattr('sys.argv', ['sc-prefetch', '-package', 'unknown'])
+    assert sc_prefetch.main() == 1
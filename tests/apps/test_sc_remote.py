@@ -28,7 +28,7 @@ def mock_results(chip, node):
 
 
 ###########################
-def mock_post(url, data={}, files={}, stream=True, timeout=0):
+def mock_post(session, url, data={}, files={}, headers={}, stream=True, timeout=0):
     '''Mocked 'post' method which imitates a successful quick job run.
     '''
 
@@ -45,7 +45,9 @@ def mock_post(url, data={}, files={}, stream=True, timeout=0):
 
         return resp
 
-    if url.endswith('remote_run/'):
+    if url.endswith('check_blobs/'):
+        return build_response(200, json_obj={'missing': []})
+    elif url.endswith('remote_run/'):
         job_hash = uuid.uuid4().hex
         return build_response(200, json_obj={
             'message': f"Starting job: {job_hash}",
@@ -57,6 +59,10 @@ def mock_post(url, data={}, files={}, stream=True, timeout=0):
             'message': 'Job has no running steps.',
             'status': 'completed'
         })
+    elif url.endswith('job_events/'):
+        resp = build_response(200, text='event: job\ndata: {"status": "completed"}\n\n')
+        resp._content_consumed = True
+        return resp
     elif url.endswith('delete_job/'):
         return build_response(200, json_obj={
             'message': 'Job has been deleted.',
@@ -123,7 +129,7 @@ def test_sc_remote_check_progress(monkeypatch, unused_tcp_port, scroot, scserver
     '''
 
     # Mock server responses
-    monkeypatch.setattr(requests, 'post', mock_post)
+    monkeypatch.setattr(requests.Session, 'post', mock_post)
 
     # Create the temporary credentials file, and set the Chip to use it.
     tmp_creds = scserver_credential(unused_tcp_port)
@@ -159,7 +165,7 @@ def test_sc_remote_reconnect(monkeypatch, unused_tcp_port, scroot, scserver_cred
     '''
 
     # Mock server responses
-    monkeypatch.setattr(requests, 'post', mock_post)
+    monkeypatch.setattr(requests.Session, 'post', mock_post)
     monkeypatch.setattr(client, 'fetch_results', mock_results)
 
     # Create the temporary credentials file, and set the Chip to use it.
@@ -453,3 +459,24 @@ def test_configure_override_n(monkeypatch):
     assert generated_creds['address'] != server_name
     assert 'username' not in generated_creds
     assert 'password' not in generated_creds
+
+
+###########################
+@pytest.mark.quick
+def test_process_progress_info():
+    '''Test that nodes are only reported for fetching once their results are available.
+    '''
+
+    chip = Chip('test')
+    progress = {
+        'message': 'Job is currently running on the server.',
+        'elapsed_time': '00:01:00',
+        'nodes': {
+            'import0': {'status': 'completed', 'results': True},
+            'syn0': {'status': 'completed', 'results': False},
+            'floorplan0': {'status': 'running', 'elapsed_time': '00:00:10', 'results': False},
+            'place0': {'status': 'pending', 'results': False}
+        }
+    }
+
+    assert client._process_progress_info(chip, progress) == ['import0']
@@ -0,0 +1,34 @@
+from siliconcompiler.apps import sc_worker
+from siliconcompiler.remote.worker import Worker, DEFAULT_PORT
+from siliconcompiler.scheduler.worker import TOKEN_ENV
+
+
+def test_sc_worker_args(monkeypatch):
+    workers = []
+
+    def run(worker):
+        workers.append(worker)
+    monkeypatch.setattr(Worker, 'run', run)
+    monkeypatch.setattr('sys.argv', ['sc-worker',
+                                     '-token', 'secret',
+                                     '-host', '0.0.0.0',
+                                     '-address', 'node0',
+                                     '-coordinator', 'node1:8090',
+                                     '-cores', '4',
+                                     '-loglevel', 'DEBUG'])
+
+    assert sc_worker.main() == 0
+
+    worker, = workers
+    assert worker.host == '0.0.0.0'
+    assert worker.port == DEFAULT_PORT
+    assert worker.address == f'node0:{DEFAULT_PORT}'
+    assert worker.coordinator == 'node1:8090'
+    assert worker.logger.level == 10
+
+
+def test_sc_worker_no_token(monkeypatch):
+    monkeypatch.delenv(TOKEN_ENV, raising=False)
+    monkeypatch.setattr('sys.argv', ['sc-worker'])
+
+    assert sc_worker.main() == 1
@@ -2,6 +2,7 @@
 import siliconcompiler
 import os
 import tarfile
+from siliconcompiler.archive import open_archive
 import pytest
 
 
@@ -135,3 +136,86 @@ def test_archive_jobs(chip):
     for item in ('build/oh_parity/job0/oh_parity.pkg.json',
                  'build/oh_parity/job1/oh_parity.pkg.json'):
         assert item in contents
+
+
+@pytest.mark.quick
+def test_archive_parallel_gzip(chip):
+    chip.archive(include='*', threads=4)
+
+    assert os.path.isfile('oh_parity_job0.tgz')
+
+    with tarfile.open('oh_parity_job0.tgz', 'r:gz') as f:
+        contents = f.getnames()
+
+    for item in all_files('job0'):
+        assert item in contents
+
+
+@pytest.mark.quick
+def test_archive_zstd(chip):
+    pytest.importorskip('zstandard')
+
+    chip.archive(archive_format='zst')
+
+    assert os.path.isfile('oh_parity_job0.tar.zst')
+
+    with open_archive('oh_parity_job0.tar.zst') as f:
+        contents = f.getnames()
+
+    for item in ('build/oh_parity/job0/oh_parity.pkg.json',
+                 'build/oh_parity/job0/syn/0/syn.log'):
+        assert item in contents
+
+
+@pytest.mark.parametrize('threads,zstd_threads', [(1, 0), (4, 4)])
+def test_archive_zstd_threads(threads, zstd_threads, monkeypatch):
+    zstandard = pytest.importorskip('zstandard')
+
+    requested = []
+    compressor = zstandard.ZstdCompressor
+
+    def record(threads=0):
+        requested.append(threads)
+        return compressor(threads=threads)
+    monkeypatch.setattr(zstandard, 'ZstdCompressor', record)
+
+    with open_archive('test.tar.zst', 'w', threads=threads) as f:
+        f.add(__file__, arcname='test.py')
+
+    assert requested == [zstd_threads]
+    with open_archive('test.tar.zst') as f:
+        assert f.getnames() == ['test.py']
+
+
+@pytest.mark.quick
+def test_archive_fileobj(chip):
+    with open('stream.tgz', 'wb') as f:
+        assert chip.archive(archive_name=f) is f
+        assert not f.closed
+
+    with open('stream.tgz', 'rb') as f:
+        with open_archive(f) as tar:
+            contents = tar.getnames()
+
+    assert 'build/oh_parity/job0/oh_parity.pkg.json' in contents
+
+
+def test_open_archive_roundtrip():
+    payload = os.urandom(1024) * 10000
+    with open('data.bin', 'wb') as f:
+        f.write(payload)
+
+    with open_archive('data.tgz', 'w', threads=8) as tar:
+        tar.add('data.bin')
+
+    os.remove('data.bin')
+    with open_archive('data.tgz') as tar:
+        tar.extractall()
+
+    with open('data.bin', 'rb') as f:
+        assert f.read() == payload
+
+
+def test_open_archive_invalid_mode():
+    with pytest.raises(ValueError):
+        open_archive('data.tgz', 'a')
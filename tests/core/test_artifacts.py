@@ -0,0 +1,85 @@
+import os
+import shutil
+import stat
+
+import pytest
+
+import siliconcompiler
+from siliconcompiler import artifacts
+from siliconcompiler.tools.builtin import join, nop
+
+from tests.core.tools.dummy import write
+
+
+def make_chip():
+    chip = siliconcompiler.Chip('test')
+    flow = 'test'
+    chip.set('option', 'flow', flow)
+    chip.set('option', 'mode', 'asic')
+    chip.set('option', 'artifactstore', True)
+
+    for index in range(3):
+        chip.node(flow, 'write', write, index=index)
+        chip.edge(flow, 'write', 'join', tail_index=index)
+    chip.node(flow, 'join', join)
+    chip.node(flow, 'pass', nop)
+    chip.edge(flow, 'join', 'pass')
+
+    return chip
+
+
+def test_artifact_store():
+    chip = make_chip()
+    chip.run()
+
+    entries = artifacts.read_index(chip, 'write', '0')
+    assert list(entries.keys()) == ['test.v']
+    digest, _ = entries['test.v']
+
+    # Identical outputs are stored once
+    for index in ('1', '2'):
+        assert artifacts.read_index(chip, 'write', index)['test.v'][0] == digest
+    blobs = os.path.join(artifacts.store_path(chip), 'blobs')
+    assert sum(len(files) for _, _, files in os.walk(blobs)) == 1
+
+    # Downstream inputs and outputs are links to the stored file
+    blob = os.path.join(blobs, digest[0:2], digest)
+    for step in ('join', 'pass'):
+        workdir = chip._getworkdir(step=step, index='0')
+        assert os.path.samefile(os.path.join(workdir, 'inputs', 'test.v'), blob)
+        assert os.path.samefile(os.path.join(workdir, 'outputs', 'test.v'), blob)
+    assert artifacts.read_index(chip, 'pass', '0')['test.v'][0] == digest
+
+
+def test_artifact_store_readonly():
+    chip = make_chip()
+    chip.run()
+
+    write0 = os.path.join(chip._getworkdir(step='write', index='0'), 'outputs', 'test.v')
+    write1 = os.path.join(chip._getworkdir(step='write', index='1'), 'outputs', 'test.v')
+    assert os.path.samefile(write0, write1)
+    assert stat.S_IMODE(os.stat(write0).st_mode) & (stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH) == 0
+
+    if hasattr(os, 'geteuid') and os.geteuid() == 0:
+        # root ignores file permissions
+        return
+
+    # An in-place write to the file of a node does not change the other nodes
+    with pytest.raises(PermissionError):
+        with open(write0, 'w') as f:
+            f.write('module changed(); endmodule\n')
+    with open(write1) as f:
+        assert f.read() == 'module test(); endmodule\n'
+
+
+def test_artifact_store_collect_garbage():
+    chip = make_chip()
+    chip.run()
+
+    assert artifacts.collect_garbage(chip) == 0
+
+    # Removing all nodes leaves the stored file unreferenced
+    for step, index in chip.nodes_to_execute():
+        shutil.rmtree(chip._getworkdir(step=step, index=index))
+
+    assert artifacts.collect_garbage(chip) == len('module test(); endmodule\n')
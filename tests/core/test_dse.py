@@ -0,0 +1,97 @@
+import os
+
+import pytest
+
+import siliconcompiler
+from siliconcompiler import NodeStatus
+from siliconcompiler.dse import DesignSpace
+
+from tests.core.tools.dummy import area, write
+
+AREA = ['tool', 'dummy', 'task', 'area', 'var', 'area']
+
+
+@pytest.fixture
+def chip():
+    chip = siliconcompiler.Chip('test')
+    flow = 'test'
+    chip.set('option', 'flow', flow)
+    chip.set('option', 'mode', 'asic')
+    chip.set('option', 'quiet', True)
+    chip.node(flow, 'write', write)
+    chip.node(flow, 'syn', area)
+    chip.node(flow, 'place', area)
+    chip.edge(flow, 'write', 'syn')
+    chip.edge(flow, 'syn', 'place')
+    for step in ('syn', 'place'):
+        chip.set('flowgraph', flow, step, '0', 'weight', 'cellarea', 1)
+    return chip
+
+
+def test_dse_grid(chip):
+    dse = DesignSpace(chip, 'syn')
+    dse.add_parameter(AREA, ['3', '1', '2'])
+
+    assert dse.run() == {tuple(AREA): '1'}
+
+    flow = dse.flow
+    assert chip.get('option', 'flow') == flow
+    # The write node is shared by the branches
+    assert chip.getkeys('flowgraph', flow, 'write') == ['0']
+    for index, value in enumerate(['3', '1', '2']):
+        index = str(index)
+        assert chip.get('flowgraph', flow, 'place', index, 'input') == [('syn', index)]
+        assert chip.get('flowgraph', flow, 'place', index, 'status') == NodeStatus.SUCCESS
+        assert chip.get(*AREA, step='place', index=index) == [value]
+
+
+def test_dse_halving(chip):
+    dse = DesignSpace(chip, 'syn', strategy='halving', seed=0)
+    dse.add_parameter(AREA, ['3', '1', '4', '2'])
+
+    candidates = dse.candidates()
+    assert sorted(candidate[tuple(AREA)] for candidate in candidates) == ['1', '2', '3', '4']
+
+    assert dse.run() == {tuple(AREA): '1'}
+
+    # Only the best half of the candidates continued after syn
+    placed = sorted(candidates[int(index)][tuple(AREA)]
+                    for index in chip.getkeys('flowgraph', dse.flow, 'place')
+                    if os.path.isdir(chip._getworkdir(step='place', index=index)))
+    assert placed == ['1', '2']
+
+    # Options changed between rounds are restored
+    assert chip.get('option', 'to') == []
+    assert chip.get('option', 'prune') == []
+    assert chip.get('option', 'resume') is False
+
+
+def test_dse_random_budget(chip):
+    dse = DesignSpace(chip, 'syn', strategy='random', budget=2, seed=1)
+    dse.add_parameter(AREA, ['1', '2', '3', '4'])
+    dse.add_parameter(['option', 'breakpoint'], [False])
+
+    candidates = dse.candidates()
+    assert len(candidates) == 2
+    # Sampling is reproducible with a seed
+    assert dse.candidates() == candidates
+
+    best = dse.run()
+    assert best == min(candidates, key=lambda candidate: int(candidate[tuple(AREA)]))
+
+
+def test_dse_invalid(chip):
+    with pytest.raises(ValueError):
+        DesignSpace(chip, 'syn', strategy='bayesian')
+    with pytest.raises(ValueError):
+        DesignSpace(chip, 'missing')
+
+    dse = DesignSpace(chip, 'syn', budget=2)
+    with pytest.raises(ValueError):
+        dse.add_parameter(['option', 'jobname'], ['a', 'b'])
+    with pytest.raises(ValueError):
+        dse.candidates()
+
+    dse.add_parameter(AREA, ['1', '2', '3'])
+    with pytest.raises(ValueError):
+        dse.candidates()
@@ -0,0 +1,135 @@
+import os
+import stat
+import threading
+
+import pytest
+
+import siliconcompiler
+from siliconcompiler import NodeStatus
+from siliconcompiler.farm import Farm
+from siliconcompiler.tools.builtin import nop
+
+from tests.core.tools.dummy import write
+from tests.core.tools.probe import probe
+
+
+def make_chip(design, task=nop):
+    chip = siliconcompiler.Chip(design)
+    flow = 'test'
+    chip.set('option', 'flow', flow)
+    chip.set('option', 'mode', 'asic')
+    chip.set('option', 'quiet', True)
+    chip.node(flow, 'write', write)
+    for index in range(2):
+        chip.node(flow, 'pass', task, index=index)
+        chip.edge(flow, 'write', 'pass', head_index=index)
+    return chip
+
+
+@pytest.mark.timeout(300)
+def test_farm_run():
+    farm = Farm(cores=2)
+    chips = [farm.add(make_chip(f'design{n}')) for n in range(3)]
+
+    report = farm.run()
+
+    assert report['chips'] == 3
+    assert report['failed'] == []
+    assert report['nodes'] == 9
+    assert report['walltime'] > 0
+    assert report['nodetime'] > 0
+    assert report['speedup'] == report['nodetime'] / report['walltime']
+
+    for chip in chips:
+        for step, index in (('write', '0'), ('pass', '0'), ('pass', '1')):
+            assert chip.get('flowgraph', 'test', step, index, 'status') == NodeStatus.SUCCESS
+        assert os.path.isfile(f'build/{chip.design}/job0/{chip.design}.pkg.json')
+        # The chip is restored once the farm is done
+        assert chip._node_pool is None
+        assert not chip._share_packages
+        assert not chip._share_environ
+
+
+@pytest.mark.timeout(300)
+def test_farm_environment(monkeypatch):
+    # Records the threads which reset the environment
+    clears = []
+    clear = os.environ.clear
+
+    def record_clear():
+        clears.append(threading.current_thread())
+        clear()
+    monkeypatch.setattr(os.environ, 'clear', record_clear)
+
+    farm = Farm(cores=2)
+    for n in range(2):
+        chip = farm.add(make_chip(f'design{n}'))
+        chip.set('option', 'env', 'SC_FARM_TEST', 'farm')
+
+    assert farm.run()['failed'] == []
+
+    # Only the farm restores the environment, once the chips are done
+    assert clears == [threading.main_thread()]
+    assert 'SC_FARM_TEST' not in os.environ
+
+
+@pytest.mark.timeout(300)
+def test_farm_shared_version_check():
+    # Counts its version checks
+    with open('probe', 'w') as f:
+        f.write('#!/bin/sh\n'
+                'if [ "$1" = "--version" ]; then\n'
+                f'  echo probed >> {os.path.abspath("probes.txt")}\n'
+                '  echo 1.0\n'
+                'fi\n')
+    os.chmod('probe', os.stat('probe').st_mode | stat.S_IEXEC)
+
+    farm = Farm(cores=1)
+    for n in range(2):
+        chip = farm.add(make_chip(f'design{n}', task=probe))
+        chip.set('tool', 'probe', 'path', os.getcwd())
+
+    assert farm.run()['failed'] == []
+
+    # One check for the four nodes running the tool
+    with open('probes.txt') as f:
+        assert f.read().splitlines() == ['probed']
+
+
+@pytest.mark.timeout(300)
+def test_farm_failure():
+    farm = Farm()
+    farm.add(make_chip('good'))
+    bad = farm.add(make_chip('bad', task=probe))
+    bad.set('tool', 'probe', 'path', os.getcwd())
+
+    report = farm.run()
+
+    assert report['failed'] == ['bad']
+    assert report['nodes'] == 3
+
+
+def test_farm_invalid():
+    farm = Farm()
+    with pytest.raises(ValueError):
+        farm.run()
+
+    farm.add(make_chip('design'))
+    with pytest.raises(ValueError):
+        farm.add(make_chip('design'))
+
+    other = make_chip('other')
+    other.set('option', 'env', 'SC_FARM_TEST', 'b')
+    farm.chips[0].set('option', 'env', 'SC_FARM_TEST', 'a')
+    farm.add(other)
+    with pytest.raises(ValueError):
+        farm.run()
+
+
+def test_farm_add_manifest():
+    make_chip('design').write_manifest('design.json')
+
+    farm = Farm()
+    chip = farm.add('design.json')
+    assert chip.design == 'design'
+    assert chip.get('option', 'flow') == 'test'
@@ -0,0 +1,73 @@
+import os
+
+from siliconcompiler.report.logfile import LogFile, INDEX_SUFFIX
+
+
+def _write(path, lines, mode='w'):
+    with open(path, mode) as f:
+        for line in lines:
+            f.write(f'{line}\n')
+
+
+def test_logfile_lines():
+    _write('test.log', [f'line {n}' for n in range(100)])
+
+    with LogFile('test.log') as log:
+        assert len(log) == 100
+        assert log.head(2) == ['line 0', 'line 1']
+        assert log.lines(50, 52) == ['line 50', 'line 51']
+        assert log.lines(98) == ['line 98', 'line 99']
+        assert log.tail(3) == ['line 97', 'line 98', 'line 99']
+
+        # The index is cached outside of the directory of the log
+        assert os.path.isfile(log.index_path)
+        assert os.path.dirname(log.index_path) != os.path.abspath('.')
+        if os.name == 'posix':
+            # Only the user can read the indexes
+            assert os.stat(os.path.dirname(log.index_path)).st_mode & 0o077 == 0
+    assert not os.path.exists(f'test.log{INDEX_SUFFIX}')
+
+
+def test_logfile_tail_without_index():
+    _write('test.log', ['first', '', 'last'])
+
+    with LogFile('test.log', cache=False) as log:
+        assert log.tail(10) == ['first', '', 'last']
+        assert log.tail(1) == ['last']
+        assert not os.path.exists(log.index_path)
+
+
+def test_logfile_search():
+    _write('test.log', ['info', '[WARNING] one', 'info', '[WARNING] two [WARNING]'])
+
+    with LogFile('test.log') as log:
+        assert log.search(r'WARNING') == [
+            (1, '[WARNING] one'),
+            (3, '[WARNING] two [WARNING]')]
+        assert log.search(r'^info$', max_matches=1) == [(0, 'info')]
+
+
+def test_logfile_growth():
+    _write('test.log', ['a', 'b'])
+    with LogFile('test.log') as log:
+        assert len(log) == 2
+
+    # Unterminated line, which is completed by the next write
+    with open('test.log', 'a') as f:
+        f.write('c')
+    with LogFile('test.log') as log:
+        assert log.lines() == ['a', 'b', 'c']
+
+    _write('test.log', ['d', 'e'], mode='a')
+    with LogFile('test.log') as log:
+        assert log.lines() == ['a', 'b', 'cd', 'e']
+
+
+def test_logfile_empty():
+    open('test.log', 'w').close()
+
+    with LogFile('test.log') as log:
+        assert len(log) == 0
+        assert log.head() == []
+        assert log.tail() == []
+        assert log.search('.*') == []
@@ -0,0 +1,29 @@
+import pickle
+
+import siliconcompiler
+from siliconcompiler import NodeStatus
+from siliconcompiler.tools.builtin import nop
+
+from tests.core.tools.dummy import write
+
+
+def test_node_callback():
+    chip = siliconcompiler.Chip('test')
+    flow = 'test'
+    chip.set('option', 'flow', flow)
+    chip.set('option', 'mode', 'asic')
+    chip.set('option', 'quiet', True)
+    chip.node(flow, 'write', write)
+    chip.node(flow, 'pass', nop)
+    chip.edge(flow, 'write', 'pass')
+
+    finished = []
+    chip._add_node_callback(lambda step, index, status: finished.append((step, index, status)))
+
+    chip.run()
+
+    assert finished == [('write', '0', NodeStatus.SUCCESS),
+                        ('pass', '0', NodeStatus.SUCCESS)]
+
+    # Callbacks are not sent to other processes
+    assert pickle.loads(pickle.dumps(chip))._node_callbacks == []
@@ -63,3 +63,43 @@ def test_metric_clear(chip):
     assert chip.get('metric', 'cells', step='floorplan', index='0') is None
     assert chip.get('tool', tool, 'task', task, 'report', 'cells',
                     step='floorplan', index='0') == []
+
+
+def test_record_metrics(chip):
+    chip._record_metrics('floorplan', '0', {
+        'peakpower': (1.05e6, 'uW', 'power.rpt'),
+        'cells': (25, None, ['report.txt', 'cells.rpt']),
+        'nets': (30, None, None)})
+
+    assert chip.get('metric', 'peakpower', step='floorplan', index='0') == 1.05e3
+    assert chip.get('metric', 'cells', step='floorplan', index='0') == 25
+    assert chip.get('metric', 'nets', step='floorplan', index='0') == 30
+
+    flow = chip.get('option', 'flow')
+    tool = chip.get('flowgraph', flow, 'floorplan', '0', 'tool')
+    task = chip.get('flowgraph', flow, 'floorplan', '0', 'task')
+    assert chip.get('tool', tool, 'task', task, 'report', 'peakpower',
+                    step='floorplan', index='0') == ['power.rpt']
+    assert chip.get('tool', tool, 'task', task, 'report', 'cells',
+                    step='floorplan', index='0') == ['report.txt', 'cells.rpt']
+    assert chip.get('tool', tool, 'task', task, 'report', 'nets',
+                    step='floorplan', index='0') == []
+
+
+def test_record_metrics_invalid(chip):
+    with pytest.raises(siliconcompiler.SiliconCompilerError):
+        chip._record_metrics('floorplan', '0', {
+            'cells': (25, None, None),
+            'nets': ('thirty', None, None)})
+
+    # Nothing is recorded if any of the metrics is invalid
+    assert chip.get('metric', 'cells', step='floorplan', index='0') is None
+
+
+def test_record_metrics_invalid_step(chip):
+    with pytest.raises(siliconcompiler.SiliconCompilerError):
+        chip._record_metrics('floorplan', None, {
+            'cells': (25, None, None),
+            'nets': (30, None, None)})
+
+    assert chip.get('metric', 'cells', step='floorplan', index='0') is None
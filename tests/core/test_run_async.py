@@ -0,0 +1,113 @@
+import os
+import time
+
+import psutil
+import pytest
+
+import siliconcompiler
+from siliconcompiler import NodeStatus, SiliconCompilerError
+from siliconcompiler.tools.builtin import nop
+
+from tests.core.tools.dummy import sleep, write
+
+
+def sleep_chip(seconds):
+    chip = siliconcompiler.Chip('test')
+    flow = 'test'
+    chip.set('option', 'flow', flow)
+    chip.set('option', 'mode', 'asic')
+    chip.set('option', 'quiet', True)
+    chip.node(flow, 'write', write)
+    for index in range(2):
+        chip.node(flow, 'sleep', sleep, index=index)
+        chip.edge(flow, 'write', 'sleep', head_index=index)
+        chip.set('tool', 'dummy', 'task', 'sleep', 'var', 'seconds', str(seconds),
+                 step='sleep', index=str(index))
+    return chip
+
+
+def sleep_processes():
+    return [proc for proc in psutil.Process().children(recursive=True)
+            if 'sleep' in proc.name()]
+
+
+def wait_for_sleep():
+    start = time.time()
+    while len(sleep_processes()) < 2:
+        assert time.time() - start < 60
+        time.sleep(0.1)
+
+
+@pytest.mark.timeout(300)
+def test_run_async():
+    chip = siliconcompiler.Chip('test')
+    flow = 'test'
+    chip.set('option', 'flow', flow)
+    chip.set('option', 'mode', 'asic')
+    chip.set('option', 'quiet', True)
+    chip.node(flow, 'write', write)
+    chip.node(flow, 'pass', nop)
+    chip.edge(flow, 'write', 'pass')
+
+    handle = chip.run_async()
+    assert handle.wait() == 'success'
+    assert handle.done()
+    assert handle.error is None
+    assert handle.nodes == {('write', '0'): NodeStatus.SUCCESS,
+                            ('pass', '0'): NodeStatus.SUCCESS}
+    assert chip._node_callbacks == []
+
+    # The chip can run again once done
+    assert chip.run_async().wait() == 'success'
+
+
+@pytest.mark.timeout(300)
+def test_run_async_cancel():
+    chip = sleep_chip(60)
+
+    handle = chip.run_async()
+    with pytest.raises(RuntimeError):
+        chip.run_async()
+
+    wait_for_sleep()
+    assert handle.status == 'running'
+    assert not handle.done()
+
+    start = time.time()
+    assert handle.cancel() == 'cancelled'
+    assert time.time() - start < 30
+    assert isinstance(handle.error, SiliconCompilerError)
+
+    # No process is left behind
+    assert sleep_processes() == []
+
+    # The manifest is written with the results of the nodes
+    assert os.path.isfile('build/test/job0/test.pkg.json')
+    manifest = siliconcompiler.Schema(manifest='build/test/job0/test.pkg.json')
+    assert manifest.get('flowgraph', 'test', 'write', '0', 'status') == NodeStatus.SUCCESS
+    for index in ('0', '1'):
+        assert manifest.get('flowgraph', 'test', 'sleep', index, 'status') == NodeStatus.ERROR
+
+
+@pytest.mark.timeout(300)
+def test_run_async_timeout():
+    chip = sleep_chip(60)
+
+    start = time.time()
+    handle = chip.run_async(timeout=5)
+    assert handle.deadline == pytest.approx(start + 5, abs=1)
+    assert handle.wait() == 'timeout'
+    assert time.time() - start < 30
+    assert sleep_processes() == []
+
+
+@pytest.mark.timeout(300)
+def test_run_async_failed():
+    chip = sleep_chip('not_a_number')
+
+    handle = chip.run_async()
+    assert handle.wait() == 'failed'
+    assert isinstance(handle.error, SiliconCompilerError)
+    assert handle.nodes[('sleep', '0')] == NodeStatus.ERROR
+    # Cancelling a finished run has no effect
+    assert handle.cancel() == 'failed'
@@ -0,0 +1,435 @@
+import os
+import stat
+import subprocess
+import sys
+import time
+
+import pytest
+
+import siliconcompiler
+from siliconcompiler import NodeStatus, scheduler
+from siliconcompiler.scheduler import backend
+from siliconcompiler.scheduler import batch as batch_queue
+from siliconcompiler.tools.builtin import nop
+
+from tests.core.tools.dummy import write
+
+
+# Stand-in for the slurm commands, which runs jobs as local processes.
+# Each task of a job writes its exit code to <state>/<job ID>.rc when it ends.
+FAKE_SLURM = '''
+import os
+import subprocess
+import sys
+
+state = os.environ['FAKE_SLURM_STATE']
+command = os.path.basename(sys.argv[0])
+args = sys.argv[1:]
+
+with open(os.path.join(state, 'calls'), 'a') as f:
+    f.write(' '.join([command] + args) + '\\n')
+
+
+def option(name):
+    for arg in args:
+        if arg.startswith(f'--{name}='):
+            return arg.split('=', 1)[1]
+    if f'--{name}' in args:
+        return args[args.index(f'--{name}') + 1]
+    return None
+
+
+def tasks(job_ids):
+    for name in sorted(os.listdir(state)):
+        if name.endswith('.task') and name.split('_')[0].split('.')[0] in job_ids:
+            yield name[:-len('.task')]
+
+
+def rc_file(task):
+    return os.path.join(state, f'{task}.rc')
+
+
+if command == 'sbatch':
+    job_id = str(100 + len([name for name in os.listdir(state) if name.endswith('.task')]))
+    array = option('array')
+    for index in (array.split(',') if array else [None]):
+        task = f'{job_id}_{index}' if array else job_id
+        open(os.path.join(state, f'{task}.task'), 'w').close()
+        if 'FAKE_SLURM_RC' in os.environ:
+            if os.environ['FAKE_SLURM_RC'] != 'running':
+                with open(rc_file(task), 'w') as f:
+                    f.write(os.environ['FAKE_SLURM_RC'])
+            continue
+        env = dict(os.environ)
+        if array:
+            env['SLURM_ARRAY_TASK_ID'] = index
+        output = option('output').replace('%a', index or '')
+        subprocess.Popen(['sh', '-c', f'{args[-1]}; echo $? > {rc_file(task)}'],
+                         cwd=option('chdir'), env=env,
+                         stdout=open(output, 'w'), stderr=subprocess.STDOUT)
+    print(job_id)
+elif command == 'squeue':
+    # Jobs are purged from the active list as soon as they end.
+    for task in tasks(option('jobs').split(',')):
+        if not os.path.exists(rc_file(task)):
+            print(f'{task}|RUNNING')
+elif command == 'sacct':
+    for task in tasks(option('jobs').split(',')):
+        if os.path.exists(rc_file(task)):
+            with open(rc_file(task)) as f:
+                rc = f.read().strip()
+            state_name = {'0': 'COMPLETED', 'cancel': 'CANCELLED by 0'}.get(rc, 'FAILED')
+            print(f'{task}|{state_name}')
+elif command == 'scancel':
+    for task in tasks(args):
+        with open(rc_file(task), 'w') as f:
+            f.write('cancel')
+else:
+    sys.exit(1)
+'''
+
+
+@pytest.fixture
+def fake_slurm(monkeypatch):
+    state = os.path.abspath('slurm_state')
+    bin_dir = os.path.abspath('slurm_bin')
+    os.makedirs(state)
+    os.makedirs(bin_dir)
+
+    for command in ('sbatch', 'squeue', 'sacct', 'scancel', 'scontrol', 'sinfo'):
+        path = os.path.join(bin_dir, command)
+        with open(path, 'w') as f:
+            f.write(f'#!{sys.executable}\n')
+            f.write(FAKE_SLURM)
+        os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR)
+
+    monkeypatch.setenv('PATH', bin_dir + os.pathsep + os.environ['PATH'])
+    monkeypatch.setenv('FAKE_SLURM_STATE', state)
+    monkeypatch.setattr(backend, 'POLL_INTERVAL', 0.5)
+
+    def calls(command):
+        with open(os.path.join(state, 'calls')) as f:
+            return [line.split()[1:] for line in f if line.split()[0] == command]
+
+    return calls
+
+
+def wait_for_finished(scheduler_backend, count):
+    finished = []
+    start = time.time()
+    while len(finished) < count:
+        assert time.time() - start < 30
+        finished.extend(scheduler_backend.collect())
+        time.sleep(0.1)
+    return finished
+
+
+def fanout_chip(scheduler_name):
+    chip = siliconcompiler.Chip('test')
+    flow = 'test'
+    chip.set('option', 'flow', flow)
+    chip.set('option', 'mode', 'asic')
+    chip.set('option', 'quiet', True)
+    chip.set('option', 'scheduler', 'name', scheduler_name)
+    chip.node(flow, 'write', write)
+    for index in range(3):
+        chip.node(flow, 'pass', nop, index=index)
+        chip.edge(flow, 'write', 'pass', head_index=index)
+    return chip
+
+
+def run_fanout(chip):
+    finished = []
+    chip._add_node_callback(lambda step, index, status: finished.append((step, index, status)))
+
+    chip.run()
+
+    return sorted(finished) == [('pass', '0', NodeStatus.SUCCESS),
+                                ('pass', '1', NodeStatus.SUCCESS),
+                                ('pass', '2', NodeStatus.SUCCESS),
+                                ('write', '0', NodeStatus.SUCCESS)]
+
+
+@pytest.mark.timeout(300)
+def test_slurm_job_array(fake_slurm):
+    chip = fanout_chip('slurm')
+    chip.set('option', 'scheduler', 'queue', 'debug')
+
+    assert run_fanout(chip)
+
+    # The fan-out is submitted as one job array, and polled with one call per interval.
+    sbatch = fake_slurm('sbatch')
+    assert len(sbatch) == 1
+    assert '--array=0,1,2' in sbatch[0]
+    assert all(len(call[-1].split(',')) == 1 for call in fake_slurm('squeue'))
+
+    for index in range(3):
+        assert os.path.isfile(f'build/test/job0/sc_remote-pass-{index}.log')
+
+
+def test_slurm_monitor_failed_job(fake_slurm, monkeypatch):
+    monkeypatch.setenv('FAKE_SLURM_RC', '1')
+
+    chip = siliconcompiler.Chip('test')
+    chip.set('option', 'scheduler', 'queue', 'debug')
+    os.makedirs(scheduler._get_cfg_dir(chip))
+
+    slurm = scheduler.SlurmBackend(chip)
+    slurm.start()
+    try:
+        slurm.submit([('syn', '0'), ('syn', 'a')])
+        finished = wait_for_finished(slurm, 2)
+    finally:
+        slurm.stop()
+
+    # Indices which are not integers can not be part of an array
+    assert len(fake_slurm('sbatch')) == 2
+    assert sorted(finished) == [(('syn', '0'), False), (('syn', 'a'), False)]
+
+
+def test_slurm_array_logs(fake_slurm, monkeypatch):
+    monkeypatch.setenv('FAKE_SLURM_RC', '0')
+
+    chip = siliconcompiler.Chip('test')
+    chip.set('option', 'scheduler', 'queue', 'debug')
+    os.makedirs(scheduler._get_cfg_dir(chip))
+
+    slurm = scheduler.SlurmBackend(chip)
+    slurm.start()
+    try:
+        slurm.submit([('syn', '1'), ('syn', '2'), ('place', '01'), ('place', '02')])
+        wait_for_finished(slurm, 4)
+    finally:
+        slurm.stop()
+
+    # Array tasks write to the log of their node, which is named by the task ID
+    sbatch = fake_slurm('sbatch')
+    assert len(sbatch) == 3
+    array = [call for call in sbatch if '--array=1,2' in call]
+    assert len(array) == 1
+    output = array[0][array[0].index('--output') + 1]
+    assert output.replace('%a', '1') == scheduler.backend._get_log_path(chip, 'syn', '1')
+
+
+def test_slurm_monitor_disk_limit(fake_slurm, monkeypatch):
+    monkeypatch.setenv('FAKE_SLURM_RC', 'running')
+    monkeypatch.setattr(backend, 'DISK_CHECK_INTERVAL', 0)
+
+    chip = siliconcompiler.Chip('test')
+    chip.set('option', 'scheduler', 'queue', 'debug')
+    chip.status['max_fs_bytes'] = 1024
+    os.makedirs(scheduler._get_cfg_dir(chip))
+
+    slurm = scheduler.SlurmBackend(chip)
+    slurm.start()
+    try:
+        slurm.submit([('syn', '0'), ('syn', '1')])
+
+        workdir = chip._getworkdir(step='syn', index='0')
+        os.makedirs(workdir)
+        with open(os.path.join(workdir, 'large.txt'), 'w') as f:
+            f.write(2048 * 'x')
+
+        finished = wait_for_finished(slurm, 2)
+    finally:
+        slurm.stop()
+
+    assert sorted(finished) == [(('syn', '0'), False), (('syn', '1'), False)]
+    assert len(fake_slurm('scancel')) == 1
+
+
+def test_dir_size():
+    os.makedirs('dir/sub')
+    with open('dir/a.txt', 'w') as f:
+        f.write(10 * 'x')
+    with open('dir/sub/b.txt', 'w') as f:
+        f.write(20 * 'x')
+
+    assert backend._get_dir_size('dir') == 30
+    assert backend._get_dir_size('dir', exclude={os.path.join('dir', 'sub')}) == 10
+
+
+def test_disk_usage(monkeypatch):
+    monkeypatch.setattr(backend, 'DISK_CHECK_INTERVAL', 0)
+
+    os.makedirs('build/a')
+    os.makedirs('build/b')
+    for path in ('build/a/a.txt', 'build/b/b.txt', 'build/c.txt'):
+        with open(path, 'w') as f:
+            f.write(10 * 'x')
+
+    usage = backend._DiskUsage('build')
+    usage.track('build/a')
+    assert usage.check() == 30
+
+    # Directories tracked after the first check are not counted twice
+    usage.track('build/b')
+    assert usage.check() == 30
+    with open('build/b/b2.txt', 'w') as f:
+        f.write(10 * 'x')
+    assert usage.check() == 40
+
+    usage.freeze('build/a')
+    usage.freeze('build/b')
+    assert usage.check() == 40
+
+
+@pytest.mark.timeout(300)
+def test_local_scheduler():
+    chip = fanout_chip('local')
+
+    assert run_fanout(chip)
+    for index in range(3):
+        assert os.path.isfile(f'build/test/job0/sc_remote-pass-{index}.log')
+
+
+@pytest.mark.timeout(300)
+def test_local_scheduler_cores():
+    chip = siliconcompiler.Chip('test')
+    os.makedirs(scheduler._get_cfg_dir(chip))
+    for index in range(3):
+        chip.set('option', 'scheduler', 'cores', 2, step='syn', index=str(index))
+        with open(f'{scheduler._get_cfg_dir(chip)}/syn{index}.sh', 'w') as f:
+            f.write(f'#!/bin/sh\nsleep 0.5\nexit {index}\n')
+        scheduler._make_executable(f'{scheduler._get_cfg_dir(chip)}/syn{index}.sh')
+
+    local = scheduler.LocalBackend(chip, cores=3)
+    local.start()
+    try:
+        local.submit([('syn', '0'), ('syn', '1'), ('syn', '2')])
+        finished = wait_for_finished(local, 3)
+    finally:
+        local.stop()
+
+    # Only one job fits at a time, so they end in submission order
+    assert finished == [(('syn', '0'), True), (('syn', '1'), False), (('syn', '2'), False)]
+
+
+@pytest.fixture
+def batch_workers():
+    workers = []
+
+    def start(queue, count=2):
+        for _ in range(count):
+            workers.append(subprocess.Popen([sys.executable,
+                                             '-m', 'siliconcompiler.scheduler.batch_worker',
+                                             queue, '-jobs', '2']))
+
+    yield start
+
+    for worker in workers:
+        worker.terminate()
+        worker.wait()
+
+
+@pytest.mark.timeout(300)
+def test_batch_scheduler(batch_workers):
+    chip = fanout_chip('batch')
+    chip.set('option', 'scheduler', 'queue', 'queue')
+    batch_workers(os.path.abspath('queue'))
+
+    assert run_fanout(chip)
+    for index in range(3):
+        assert os.path.isfile(f'build/test/job0/sc_remote-pass-{index}.log')
+    # Jobs leave no files in the queue
+    assert os.listdir('queue') == []
+
+
+@pytest.mark.timeout(300)
+def test_batch_scheduler_cancel(batch_workers):
+    chip = siliconcompiler.Chip('test')
+    os.makedirs(scheduler._get_cfg_dir(chip))
+    for index in range(2):
+        with open(f'{scheduler._get_cfg_dir(chip)}/syn{index}.sh', 'w') as f:
+            f.write('#!/bin/sh\nsleep 60\n')
+        scheduler._make_executable(f'{scheduler._get_cfg_dir(chip)}/syn{index}.sh')
+
+    batch = scheduler.BatchBackend(chip)
+    batch.start()
+    try:
+        batch.submit([('syn', '0')])
+        batch.poll()
+        # Wait for a worker to claim the first job
+        batch_workers(batch_queue.get_queue_dir(chip), count=1)
+        start = time.time()
+        while not any(name.endswith('.run') for name in os.listdir('build/sc_batch')):
+            assert time.time() - start < 30
+            time.sleep(0.1)
+
+        batch.submit([('syn', '1')])
+        batch.poll()
+        batch.cancel()
+        assert sorted(batch.collect()) == [(('syn', '0'), False), (('syn', '1'), False)]
+
+        start = time.time()
+        while os.listdir('build/sc_batch'):
+            assert time.time() - start < 30
+            time.sleep(0.1)
+    finally:
+        batch.stop()
+
+
+@pytest.mark.timeout(300)
+def test_batch_scheduler_cancel_ended(batch_workers):
+    chip = siliconcompiler.Chip('test')
+    os.makedirs(scheduler._get_cfg_dir(chip))
+    with open(f'{scheduler._get_cfg_dir(chip)}/syn0.sh', 'w') as f:
+        f.write('#!/bin/sh\nexit 0\n')
+    scheduler._make_executable(f'{scheduler._get_cfg_dir(chip)}/syn0.sh')
+
+    batch = scheduler.BatchBackend(chip)
+    try:
+        batch.submit([('syn', '0')])
+        batch.poll()
+        batch_workers(batch_queue.get_queue_dir(chip), count=1)
+        start = time.time()
+        while not any(name.endswith('.rc') for name in os.listdir('build/sc_batch')):
+            assert time.time() - start < 30
+            time.sleep(0.1)
+
+        # Cancelling a job which already ended leaves no files in the queue
+        batch.cancel()
+        assert batch.collect() == [(('syn', '0'), False)]
+        assert os.listdir('build/sc_batch') == []
+    finally:
+        batch.stop()
+
+
+@pytest.mark.timeout(300)
+def test_batch_worker_stale_cancel(batch_workers):
+    os.makedirs('queue')
+    open('queue/0123.cancel', 'w').close()
+
+    batch_workers(os.path.abspath('queue'), count=1)
+
+    start = time.time()
+    while os.listdir('queue'):
+        assert time.time() - start < 30
+        time.sleep(0.1)
+
+
+def test_register_backend():
+    class TestBackend(scheduler.SchedulerBackend):
+        def _submit_jobs(self, jobs):
+            return {str(n): job for n, job in enumerate(jobs)}
+
+        def _check_jobs(self, jobs):
+            return {job_id: job['node'][1] == '0' for job_id, job in jobs.items()}
+
+        def _cancel_jobs(self, job_ids):
+            pass
+
+    scheduler.register_backend('test', TestBackend)
+    try:
+        chip = siliconcompiler.Chip('test')
+        test_backend = scheduler.get_backend(chip, 'test')
+        test_backend.submit([('syn', '0'), ('syn', '1')])
+        test_backend.poll()
+        assert test_backend.collect() == [(('syn', '0'), True), (('syn', '1'), False)]
+    finally:
+        del scheduler._BACKENDS['test']
+
+    with pytest.raises(ValueError):
+        scheduler.get_backend(chip, 'test')
+    with pytest.raises(TypeError):
+        scheduler.register_backend('test', object)
@@ -0,0 +1,92 @@
+import time
+
+import pytest
+
+import siliconcompiler
+from siliconcompiler import NodeStatus
+from siliconcompiler.tools.builtin import minimum
+
+from tests.core.tools.dummy import sleep
+
+
+def sleep_chip(seconds):
+    '''
+    Returns a chip with one sleep index per duration, which feed a minimum.
+    '''
+    chip = siliconcompiler.Chip('test')
+    flow = 'test'
+    chip.set('option', 'flow', flow)
+    chip.set('option', 'mode', 'asic')
+    chip.set('option', 'quiet', True)
+    chip.set('option', 'speculate', True)
+    chip.node(flow, 'select', minimum)
+    for index, duration in enumerate(seconds):
+        chip.node(flow, 'sleep', sleep, index=index)
+        chip.edge(flow, 'sleep', 'select', tail_index=index)
+        chip.set('tool', 'dummy', 'task', 'sleep', 'var', 'seconds', str(duration),
+                 step='sleep', index=str(index))
+    return chip
+
+
+@pytest.mark.timeout(120)
+def test_speculate_dominated():
+    chip = sleep_chip([1, 60])
+    flow = 'test'
+    for index in ('0', '1'):
+        chip.set('flowgraph', flow, 'sleep', index, 'weight', 'tasktime', 1)
+
+    start = time.time()
+    chip.run()
+    assert time.time() - start < 50
+
+    assert chip.get('flowgraph', flow, 'sleep', '0', 'status') == NodeStatus.SUCCESS
+    assert chip.get('flowgraph', flow, 'sleep', '1', 'status') == NodeStatus.ERROR
+    assert chip.get('flowgraph', flow, 'select', '0', 'status') == NodeStatus.SUCCESS
+    assert chip.get('flowgraph', flow, 'select', '0', 'select') == [('sleep', '0')]
+
+
+@pytest.mark.timeout(120)
+def test_speculate_goal():
+    chip = sleep_chip([60, 1])
+    flow = 'test'
+    chip.set('flowgraph', flow, 'sleep', '0', 'goal', 'tasktime', 2)
+
+    start = time.time()
+    chip.run()
+    assert time.time() - start < 50
+
+    assert chip.get('flowgraph', flow, 'sleep', '0', 'status') == NodeStatus.ERROR
+    assert chip.get('flowgraph', flow, 'sleep', '1', 'status') == NodeStatus.SUCCESS
+    assert chip.get('flowgraph', flow, 'select', '0', 'select') == [('sleep', '1')]
+
+
+@pytest.mark.timeout(120)
+def test_speculate_disabled():
+    chip = sleep_chip([1, 5])
+    flow = 'test'
+    chip.set('option', 'speculate', False)
+    for index in ('0', '1'):
+        chip.set('flowgraph', flow, 'sleep', index, 'weight', 'tasktime', 1)
+
+    chip.run()
+
+    # Without speculation, all indices run to completion
+    assert chip.get('flowgraph', flow, 'sleep', '0', 'status') == NodeStatus.SUCCESS
+    assert chip.get('flowgraph', flow, 'sleep', '1', 'status') == NodeStatus.SUCCESS
+    assert chip.get('flowgraph', flow, 'select', '0', 'select') == [('sleep', '0')]
+
+
+@pytest.mark.timeout(120)
+def test_speculate_margin():
+    chip = sleep_chip([1, 5])
+    flow = 'test'
+    chip.set('option', 'speculatemargin', 10)
+    for index in ('0', '1'):
+        chip.set('flowgraph', flow, 'sleep', index, 'weight', 'tasktime', 1)
+
+    chip.run()
+
+    # The second index finishes within ten times the runtime of the first
+    assert chip.get('flowgraph', flow, 'sleep', '0', 'status') == NodeStatus.SUCCESS
+    assert chip.get('flowgraph', flow, 'sleep', '1', 'status') == NodeStatus.SUCCESS
+    assert chip.get('flowgraph', flow, 'select', '0', 'select') == [('sleep', '0')]
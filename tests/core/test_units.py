@@ -58,3 +58,17 @@ def test_si_with_none_to_mm():
 def test_si_with_none_to_mm2():
     assert units.convert(1555, to_unit='mm^2') == 1555e6
     assert units.convert(1, to_unit='mm^2') == 1e6
+
+
+def test_convert_many():
+    assert units.convert_many([1555, 1, None], from_unit='um', to_unit='mm') == \
+        [1.555, 0.001, None]
+    assert units.convert_many([1, 2], from_unit='mm^2', to_unit='um^2') == [1e6, 2e6]
+    assert units.convert_many([], from_unit='um', to_unit='mm') == []
+
+
+def test_is_convertible():
+    assert units.is_convertible('um^2', 'mm^2')
+    assert units.is_convertible('mw', 'W')
+    assert not units.is_convertible('um', 'um^2')
+    assert not units.is_convertible('um', 'ns')
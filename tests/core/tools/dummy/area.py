@@ -0,0 +1,13 @@
+def setup(chip):
+    step = chip.get('arg', 'step')
+    index = chip.get('arg', 'index')
+    chip.set('tool', 'dummy', 'task', 'area', 'var', 'area', '1',
+             step=step, index=index, clobber=False)
+
+
+def run(chip):
+    step = chip.get('arg', 'step')
+    index = chip.get('arg', 'index')
+    area = chip.get('tool', 'dummy', 'task', 'area', 'var', 'area', step=step, index=index)[0]
+    chip._record_metric(step, index, 'cellarea', float(area), None)
+    return 0
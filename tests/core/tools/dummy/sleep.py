@@ -0,0 +1,9 @@
+def setup(chip):
+    step = chip.get('arg', 'step')
+    index = chip.get('arg', 'index')
+
+    chip.set('tool', 'dummy', 'exe', 'sleep')
+    seconds = chip.get('tool', 'dummy', 'task', 'sleep', 'var', 'seconds',
+                       step=step, index=index)
+    chip.set('tool', 'dummy', 'task', 'sleep', 'option', seconds,
+             step=step, index=index)
@@ -0,0 +1,14 @@
+import os
+
+
+def setup(chip):
+    step = chip.get('arg', 'step')
+    index = chip.get('arg', 'index')
+    chip.add('tool', 'dummy', 'task', 'write', 'output', chip.top() + '.v',
+             step=step, index=index)
+
+
+def run(chip):
+    with open(os.path.join('outputs', chip.top() + '.v'), 'w') as f:
+        f.write('module test(); endmodule\n')
+    return 0
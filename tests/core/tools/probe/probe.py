@@ -0,0 +1,15 @@
+def setup(chip):
+    '''
+    Runs 'probe', which the tests provide, and checks its version.
+    '''
+    step = chip.get('arg', 'step')
+    index = chip.get('arg', 'index')
+
+    chip.set('tool', 'probe', 'exe', 'probe')
+    chip.set('tool', 'probe', 'vswitch', '--version')
+    chip.set('tool', 'probe', 'task', 'probe', 'option', step + index,
+             step=step, index=index, clobber=False)
+
+
+def parse_version(stdout):
+    return stdout.strip()
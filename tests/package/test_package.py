@@ -1,9 +1,17 @@
+import git
 import siliconcompiler
 from siliconcompiler import package
+from siliconcompiler.tools.builtin import nop
 from pathlib import Path
 import pytest
+import io
 import logging
 import os
+import pathlib
+import tarfile
+import sys
+import threading
+import time
 
 
 def cache_path(path, ref, chip=None, cache=None):
@@ -89,12 +97,296 @@ def test_dependency_path_dirty_warning(caplog):
     local_dependency_cache_path = cache_path(
         'git+https://github.com/siliconcompiler/siliconcompiler',
         'main', chip=chip)
+    package._wait_for_dirty_checks()
     assert "The repo of the cached data is dirty." in caplog.text
 
     file.unlink()
     assert not file.exists()
 
 
+@pytest.fixture
+def cached_repo():
+    cache = os.path.abspath('cache')
+    repo_path = os.path.join(cache, 'test-source-v1')
+    repo = git.Repo.init(repo_path)
+    with open(os.path.join(repo_path, 'file.txt'), 'w') as f:
+        f.write('test')
+    repo.index.add(['file.txt'])
+    repo.index.commit('initial')
+    return cache, repo_path
+
+
+def test_package_path_memoized(cached_repo, monkeypatch):
+    cache, repo_path = cached_repo
+
+    repos = []
+
+    def count_repos(path):
+        repos.append(path)
+        return git.Repo(path)
+    monkeypatch.setattr(package, 'Repo', count_repos)
+    monkeypatch.setattr(package, 'CHECK_DIRTY_CACHE', False)
+
+    chip = siliconcompiler.Chip('test')
+    chip.set('option', 'cache', cache)
+    chip.register_package_source('test-source', 'git+https://example.com/test', 'v1')
+
+    for _ in range(3):
+        assert package.path(chip, 'test-source') == repo_path
+    assert repos == [repo_path]
+
+    # Other chips of the process reuse the verified cache
+    other = siliconcompiler.Chip('test')
+    other.set('option', 'cache', cache)
+    other.register_package_source('test-source', 'git+https://example.com/test', 'v1')
+    assert package.path(other, 'test-source') == repo_path
+    assert repos == [repo_path]
+
+
+def test_package_path_dirty_check(cached_repo, caplog):
+    cache, repo_path = cached_repo
+    with open(os.path.join(repo_path, 'untracked.txt'), 'w') as f:
+        f.write('test')
+
+    chip = siliconcompiler.Chip('test')
+    chip.logger = logging.getLogger()
+    chip.set('option', 'cache', cache)
+    chip.register_package_source('test-source', 'git+https://example.com/test', 'v1')
+
+    assert package.path(chip, 'test-source') == repo_path
+    package._wait_for_dirty_checks()
+    assert "The repo of the cached data is dirty." in caplog.text
+
+
+def test_package_path_dirty_check_verified(cached_repo, caplog):
+    cache, repo_path = cached_repo
+
+    chip = siliconcompiler.Chip('test')
+    chip.set('option', 'cache', cache)
+    chip.register_package_source('test-source', 'git+https://example.com/test', 'v1')
+    assert package.path(chip, 'test-source') == repo_path
+    package._wait_for_dirty_checks()
+    assert "The repo of the cached data is dirty." not in caplog.text
+
+    with open(os.path.join(repo_path, 'untracked.txt'), 'w') as f:
+        f.write('test')
+
+    # Data sources which were already verified are also checked
+    chip = siliconcompiler.Chip('test')
+    chip.logger = logging.getLogger()
+    chip.set('option', 'cache', cache)
+    chip.register_package_source('test-source', 'git+https://example.com/test', 'v1')
+    assert package.path(chip, 'test-source') == repo_path
+    package._wait_for_dirty_checks()
+    assert "The repo of the cached data is dirty." in caplog.text
+
+
+def test_package_path_stale_lock(cached_repo):
+    cache, repo_path = cached_repo
+
+    # Lock files left behind by killed processes are not held
+    with open(f'{repo_path}.lock', 'w'):
+        pass
+
+    chip = siliconcompiler.Chip('test')
+    chip.set('option', 'cache', cache)
+    chip.register_package_source('test-source', 'git+https://example.com/test', 'v1')
+
+    start = time.time()
+    assert package.path(chip, 'test-source') == repo_path
+    assert time.time() - start < 5
+
+
+def test_package_path_single_download(monkeypatch):
+    cache = os.path.abspath('cache')
+
+    downloads = []
+
+    def clone_from_git(chip, package, data, repo_path):
+        downloads.append(repo_path)
+        # Give other threads time to wait on the lock
+        time.sleep(0.5)
+        git.Repo.init(repo_path)
+    monkeypatch.setattr(package, 'clone_from_git', clone_from_git)
+    monkeypatch.setattr(package, 'CHECK_DIRTY_CACHE', False)
+
+    paths = []
+
+    def resolve():
+        chip = siliconcompiler.Chip('test')
+        chip.set('option', 'cache', cache)
+        chip.register_package_source('test-source', 'git+https://example.com/test', 'v2')
+        paths.append(package.path(chip, 'test-source'))
+
+    threads = [threading.Thread(target=resolve) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(downloads) == 1
+    assert paths == 4 * [os.path.join(cache, 'test-source-v2')]
+    # Downloads are moved into place once complete
+    assert not os.path.exists(downloads[0])
+
+
+def test_package_path_failed_clone(monkeypatch):
+    cache = os.path.abspath('cache')
+
+    def clone_from_git(chip, package, data, repo_path):
+        git.Repo.init(repo_path)
+        raise git.GitCommandError(['git', 'fetch'], 128,
+                                  b'git@example.com: Permission denied (publickey).')
+    monkeypatch.setattr(package, 'clone_from_git', clone_from_git)
+
+    chip = siliconcompiler.Chip('test')
+    chip.set('option', 'cache', cache)
+    chip.register_package_source('test-source', 'git+ssh://git@example.com/test', 'v1')
+
+    with pytest.raises(git.GitCommandError):
+        package.path(chip, 'test-source')
+
+    # The incomplete clone is not cached
+    assert not os.path.exists(os.path.join(cache, 'test-source-v1'))
+    assert [name for name in os.listdir(cache) if not name.endswith('.lock')] == []
+
+
+@pytest.fixture
+def remote_repo(monkeypatch):
+    '''
+    Git repository which is cloned in place of https://example.com/remote
+    '''
+    repo_path = os.path.abspath('remote')
+    repo = git.Repo.init(repo_path)
+    for commit in range(3):
+        for path in ('lib/a.txt', 'other/b.txt'):
+            os.makedirs(os.path.dirname(os.path.join(repo_path, path)), exist_ok=True)
+            with open(os.path.join(repo_path, path), 'w') as f:
+                f.write(f'{commit}')
+        repo.index.add(['lib/a.txt', 'other/b.txt'])
+        repo.index.commit(f'commit {commit}')
+    repo.create_tag('v1', ref='HEAD~1')
+
+    monkeypatch.setenv('GIT_CONFIG_COUNT', '1')
+    monkeypatch.setenv('GIT_CONFIG_KEY_0', f'url.{pathlib.Path(repo_path).as_uri()}.insteadOf')
+    monkeypatch.setenv('GIT_CONFIG_VALUE_0', 'https://example.com/remote')
+    monkeypatch.setattr(package, 'CHECK_DIRTY_CACHE', False)
+    return repo
+
+
+@pytest.mark.parametrize('ref', ['v1', 'hash'])
+def test_clone_shallow(remote_repo, ref):
+    if ref == 'hash':
+        ref = remote_repo.commit('HEAD~1').hexsha
+
+    chip = siliconcompiler.Chip('test')
+    chip.set('option', 'cache', os.path.abspath('cache'))
+    chip.register_package_source('remote', 'git+https://example.com/remote', ref)
+
+    repo = git.Repo(package.path(chip, 'remote'))
+    assert repo.head.commit.hexsha == remote_repo.commit('HEAD~1').hexsha
+    # Only the requested ref is fetched
+    assert repo.git.rev_list('--count', 'HEAD') == '1'
+
+
+def test_clone_sparse(remote_repo, monkeypatch):
+    monkeypatch.setattr(package, 'SPARSE_CHECKOUT', True)
+
+    chip = siliconcompiler.Chip('test')
+    chip.set('option', 'cache', os.path.abspath('cache'))
+    chip.register_package_source('remote', 'git+https://example.com/remote', 'v1')
+    chip.set('input', 'rtl', 'verilog', 'lib/a.txt', package='remote')
+
+    data_path = package.path(chip, 'remote')
+    assert os.path.isfile(os.path.join(data_path, 'lib', 'a.txt'))
+    assert not os.path.exists(os.path.join(data_path, 'other'))
+
+    # Paths which are not checked out are added when they are looked up
+    chip.add('input', 'rtl', 'verilog', 'other/b.txt', package='remote')
+    assert chip.find_files('input', 'rtl', 'verilog', step='import', index='0') == [
+        os.path.join(data_path, 'lib', 'a.txt'),
+        os.path.join(data_path, 'other', 'b.txt')]
+
+
+def test_extract_from_url(monkeypatch):
+    archive = io.BytesIO()
+    with tarfile.open(fileobj=archive, mode='w:gz') as tar:
+        for name, content in (('repo-v1/lib/a.txt', b'a'), ('repo-v1/b.txt', b'b')):
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            tar.addfile(info, io.BytesIO(content))
+    archive.seek(0)
+
+    class Response:
+        ok = True
+        raw = archive
+
+    monkeypatch.setattr(package.requests, 'get', lambda *args, **kwargs: Response())
+
+    chip = siliconcompiler.Chip('test')
+    chip.set('option', 'cache', os.path.abspath('cache'))
+    chip.register_package_source('remote', 'https://example.com/archive/', 'v1')
+
+    data_path = package.path(chip, 'remote')
+    # The leading directory is removed
+    assert sorted(os.listdir(data_path)) == ['b.txt', 'lib']
+    with open(os.path.join(data_path, 'lib', 'a.txt')) as f:
+        assert f.read() == 'a'
+
+
+def test_resolve_packages_parallel(monkeypatch):
+    running = []
+    max_running = []
+
+    def clone_from_git(chip, package, data, repo_path):
+        running.append(package)
+        max_running.append(len(running))
+        time.sleep(0.5)
+        git.Repo.init(repo_path)
+        running.remove(package)
+    monkeypatch.setattr(package, 'clone_from_git', clone_from_git)
+    monkeypatch.setattr(package, 'CHECK_DIRTY_CACHE', False)
+
+    chip = siliconcompiler.Chip('test')
+    chip.set('option', 'cache', os.path.abspath('cache'))
+    for name in ('pdk', 'lib'):
+        chip.register_package_source(name, f'git+https://example.com/{name}', 'v1')
+    chip.set('input', 'rtl', 'verilog', ['a.v', 'b.v'], package=['pdk', 'lib'])
+
+    assert package.resolve_packages(chip) == {
+        'lib': os.path.join(os.path.abspath('cache'), 'lib-v1'),
+        'pdk': os.path.join(os.path.abspath('cache'), 'pdk-v1')}
+    assert max(max_running) == 2
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='fcntl is not available on Windows')
+def test_lock_cache_shared():
+    chip = siliconcompiler.Chip('test')
+
+    acquired = []
+
+    def read():
+        with package.lock_cache(chip, 'entry.lock', exclusive=False):
+            acquired.append(time.time())
+
+    with package.lock_cache(chip, 'entry.lock', exclusive=False):
+        # Readers do not block each other
+        read()
+        assert len(acquired) == 1
+
+    with package.lock_cache(chip, 'entry.lock', exclusive=True):
+        reader = threading.Thread(target=read)
+        reader.start()
+        time.sleep(0.5)
+        assert len(acquired) == 1
+        released = time.time()
+    reader.join()
+
+    # Waiters resume as soon as the lock is released
+    assert len(acquired) == 2
+    assert acquired[1] - released < 0.5
+
+
 def test_package_with_import():
     chip = siliconcompiler.Chip('test')
 
@@ -176,3 +468,34 @@ def test_register_python_data_source_with_append(monkeypatch):
     path = chip.get("package", "source", "sc_test", "path")
 
     assert path == expect
+
+
+def _nop_chip():
+    chip = siliconcompiler.Chip('test')
+    chip.set('option', 'flow', 'test')
+    chip.set('option', 'mode', 'asic')
+    chip.set('option', 'quiet', True)
+    chip.node('test', 'pass', nop)
+    return chip
+
+
+def test_run_fetch_failure(monkeypatch):
+    def resolve_packages(chip, packages=None):
+        raise git.GitCommandError('clone', 128)
+    monkeypatch.setattr(package, 'resolve_packages', resolve_packages)
+
+    # Nodes fetch the data sources they need again, so the run continues
+    chip = _nop_chip()
+    chip.run()
+    assert chip.get('flowgraph', 'test', 'pass', '0', 'status') == \
+        siliconcompiler.NodeStatus.SUCCESS
+
+
+def test_run_invalid_package(monkeypatch):
+    def resolve_packages(chip, packages=None):
+        raise siliconcompiler.SiliconCompilerError('invalid data source')
+    monkeypatch.setattr(package, 'resolve_packages', resolve_packages)
+
+    chip = _nop_chip()
+    with pytest.raises(siliconcompiler.SiliconCompilerError, match='invalid data source'):
+        chip.run()
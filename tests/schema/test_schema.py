@@ -75,9 +75,9 @@ def test_allkeys():
     partial.sort()
 
     assert len(partial) > 0
-    assert partial[0] == ['autoinstall']
+    assert partial[0] == ['artifactstore']
 
-    complete = schema.allkeys('option', 'autoinstall')
+    complete = schema.allkeys('option', 'artifactstore')
     assert complete == []
 
 
@@ -1,4 +1,17 @@
+import asyncio
+import io
+import json
+import tarfile
+import threading
+
 import pytest
+from aiohttp import FormData, web
+
+import siliconcompiler
+from siliconcompiler.remote.server import Server
+from siliconcompiler.tools.builtin import nop
+
+from tests.core.tools.dummy import write
 
 
 @pytest.fixture
@@ -19,3 +32,73 @@ def gcd_remote_test(gcd_chip, scserver, scserver_credential):
         return gcd_chip
 
     return setup
+
+
+@pytest.fixture
+def remote_job_upload():
+    '''
+    Returns a function which creates the form data of a 'remote_run' request
+    for a chip, by default a small job which does not require any EDA tools.
+    '''
+    chip = siliconcompiler.Chip('test')
+    flow = 'test'
+    chip.set('option', 'flow', flow)
+    chip.set('option', 'mode', 'asic')
+    chip.set('option', 'nodisplay', True)
+    chip.set('option', 'quiet', True)
+    chip.node(flow, 'write', write)
+    chip.node(flow, 'pass', nop)
+    chip.edge(flow, 'write', 'pass')
+
+    def upload(chip=chip):
+        archive = io.BytesIO()
+        with tarfile.open(fileobj=archive, mode='w:gz'):
+            pass
+
+        data = FormData()
+        data.add_field('params',
+                       json.dumps({'chip_cfg': chip.schema.cfg, 'params': {}}),
+                       content_type='application/json')
+        data.add_field('import', archive.getvalue(), filename='import.tar.gz')
+        return data
+
+    return upload
+
+
+@pytest.fixture
+def local_server(scserver_nfs_path, unused_tcp_port):
+    '''
+    Returns a function which starts a server in a background thread of this
+    process and returns its port.
+    '''
+    loop = asyncio.new_event_loop()
+    thread = None
+
+    def start():
+        nonlocal thread
+
+        server = Server()
+        server.set('option', 'nfsmount', scserver_nfs_path)
+
+        runner = web.AppRunner(server._create_app())
+        started = threading.Event()
+
+        def serve():
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(runner.setup())
+            loop.run_until_complete(web.TCPSite(runner, 'localhost', unused_tcp_port).start())
+            started.set()
+            loop.run_forever()
+            loop.run_until_complete(runner.cleanup())
+
+        thread = threading.Thread(target=serve)
+        thread.start()
+        started.wait()
+
+        return unused_tcp_port
+
+    yield start
+
+    if thread:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
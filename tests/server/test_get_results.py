@@ -0,0 +1,120 @@
+import os
+
+import pytest
+import requests
+import urllib3
+
+import siliconcompiler
+from siliconcompiler.remote import client
+
+
+JOB_HASH = '0123456789abcdef0123456789abcdef'
+
+
+@pytest.fixture
+def results_server(scserver_nfs_path, local_server):
+    port = local_server()
+
+    # Results archive for a node
+    os.makedirs(os.path.join(scserver_nfs_path, JOB_HASH))
+    data = os.urandom(3 * 1024 * 1024)
+    with open(os.path.join(scserver_nfs_path, JOB_HASH, f'{JOB_HASH}_syn0.tar.gz'), 'wb') as f:
+        f.write(data)
+
+    chip = siliconcompiler.Chip('test')
+    chip.set('record', 'remoteid', JOB_HASH)
+    chip.status['remote_cfg'] = {'address': 'localhost', 'port': port}
+
+    return chip, data
+
+
+def test_fetch_results(results_server):
+    chip, data = results_server
+
+    assert client.fetch_results_request(chip, 'syn0', 'results.tar.gz') == 0
+    with open('results.tar.gz', 'rb') as f:
+        assert f.read() == data
+
+
+def test_fetch_results_missing(results_server):
+    chip, _ = results_server
+
+    assert client.fetch_results_request(chip, 'place0', 'results.tar.gz') == 404
+
+
+def test_fetch_results_resume(results_server, monkeypatch):
+    chip, data = results_server
+
+    # Drop the connection partway through the first download
+    stream = urllib3.response.HTTPResponse.stream
+    requests_ranges = []
+
+    def interrupted_stream(self, *args, **kwargs):
+        requests_ranges.append(self.headers.get('Content-Range'))
+        for count, chunk in enumerate(stream(self, *args, **kwargs)):
+            if len(requests_ranges) == 1 and count == 2:
+                raise urllib3.exceptions.ProtocolError('Connection broken')
+            yield chunk
+
+    monkeypatch.setattr(urllib3.response.HTTPResponse, 'stream', interrupted_stream)
+
+    assert client.fetch_results_request(chip, 'syn0', 'results.tar.gz') == 0
+    with open('results.tar.gz', 'rb') as f:
+        assert f.read() == data
+
+    # The second request only fetched the rest of the archive
+    assert requests_ranges[0] is None
+    assert requests_ranges[1].startswith('bytes ')
+    assert requests_ranges[1] != f'bytes 0-{len(data) - 1}/{len(data)}'
+
+
+def test_fetch_results_connection_error(results_server, monkeypatch):
+    chip, data = results_server
+
+    # Drop the connection partway through the first download
+    stream = urllib3.response.HTTPResponse.stream
+    streams = []
+
+    def interrupted_stream(self, *args, **kwargs):
+        streams.append(self)
+        for count, chunk in enumerate(stream(self, *args, **kwargs)):
+            if len(streams) == 1 and count == 2:
+                raise urllib3.exceptions.ProtocolError('Connection broken')
+            yield chunk
+
+    monkeypatch.setattr(urllib3.response.HTTPResponse, 'stream', interrupted_stream)
+
+    # and fail to reconnect once
+    post = requests.Session.post
+    headers = []
+
+    def failing_post(self, *args, **kwargs):
+        headers.append(kwargs.get('headers'))
+        if len(headers) == 2:
+            raise requests.ConnectionError('Connection refused')
+        return post(self, *args, **kwargs)
+
+    monkeypatch.setattr(requests.Session, 'post', failing_post)
+
+    assert client.fetch_results_request(chip, 'syn0', 'results.tar.gz') == 0
+    with open('results.tar.gz', 'rb') as f:
+        assert f.read() == data
+
+    # The download resumed after the failed request
+    assert len(headers) == 3
+    assert 'Range' not in headers[0]
+    assert headers[2]['Range'] != 'bytes=0-'
+
+
+def test_fetch_results_reuses_connection(results_server):
+    chip, data = results_server
+
+    for _ in range(3):
+        assert client.fetch_results_request(chip, 'syn0', 'results.tar.gz') == 0
+        client.remote_ping(chip)
+
+    # Requests are sent over a single kept-alive connection
+    pools = client._get_session().get_adapter('http://').poolmanager.pools
+    port = chip.status['remote_cfg']['port']
+    assert [pools[key].num_connections for key in pools.keys()
+            if key.key_port == port] == [1]
@@ -0,0 +1,95 @@
+import asyncio
+import json
+
+import pytest
+import requests
+from aiohttp.test_utils import TestClient, TestServer
+
+from siliconcompiler.remote import client
+from siliconcompiler.remote import server as server_module
+from siliconcompiler.remote.server import Server
+
+
+@pytest.mark.timeout(300)
+def test_job_events(scserver_nfs_path, remote_job_upload):
+    '''
+    Subscribe to the events of a job and ensure every node is reported
+    until the job completes.
+    '''
+    server = Server()
+    server.set('option', 'nfsmount', scserver_nfs_path)
+
+    async def follow_job():
+        async with TestClient(TestServer(server._create_app())) as test_client:
+            resp = await test_client.post('/remote_run/', data=remote_job_upload())
+            job_hash = (await resp.json())['job_hash']
+
+            resp = await test_client.post('/job_events/', json={'job_hash': job_hash})
+            assert resp.status == 200
+            assert resp.headers['Content-Type'] == 'text/event-stream'
+
+            events = []
+            event = None
+            async for line in resp.content:
+                line = line.decode().rstrip('\n')
+                if line.startswith('event:'):
+                    event = line[6:].strip()
+                elif line.startswith('data:'):
+                    events.append((event, json.loads(line[5:])))
+            return events
+
+    events = asyncio.run(follow_job())
+
+    assert events[-1] == ('job', {'status': 'completed'})
+
+    node_status = {}
+    for event, data in events:
+        if event == 'node':
+            node_status[data['node']] = data['status']
+    assert node_status == {'write0': 'completed', 'pass0': 'completed'}
+
+
+def test_job_events_unknown_job(scserver_nfs_path):
+    server = Server()
+    server.set('option', 'nfsmount', scserver_nfs_path)
+
+    async def follow_job():
+        async with TestClient(TestServer(server._create_app())) as test_client:
+            resp = await test_client.post('/job_events/', json={'job_hash': '0' * 32})
+            return resp.status
+
+    assert asyncio.run(follow_job()) == 404
+
+
+@pytest.mark.timeout(300)
+def test_job_events_failed(scserver_nfs_path, remote_job_upload, monkeypatch):
+    def fail(*args):
+        raise RuntimeError('job failed')
+    monkeypatch.setattr(server_module, '_run_job', fail)
+
+    server = Server()
+    server.set('option', 'nfsmount', scserver_nfs_path)
+
+    async def follow_job():
+        async with TestClient(TestServer(server._create_app())) as test_client:
+            resp = await test_client.post('/remote_run/', data=remote_job_upload())
+            job_hash = (await resp.json())['job_hash']
+
+            resp = await test_client.post('/job_events/', json={'job_hash': job_hash})
+            assert resp.status == 200
+            return await resp.text()
+
+    events = asyncio.run(follow_job())
+    assert events.rstrip().endswith('event: job\ndata: {"status": "failed"}')
+
+
+def test_read_events():
+    resp = requests.Response()
+    resp._content_consumed = True
+    resp._content = b'event: job\ndata: {"status": "queued"}\n\n' \
+        b': keep-alive\n\n' \
+        b'event: node\ndata: {"node": "syn0",\ndata: "status": "running"}\n\n'
+
+    assert list(client._read_events(resp)) == [
+        ('job', {'status': 'queued'}),
+        ('node', {'node': 'syn0', 'status': 'running'})]
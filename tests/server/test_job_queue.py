@@ -0,0 +1,201 @@
+import asyncio
+import os
+import time
+
+import psutil
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+import siliconcompiler
+from siliconcompiler.remote import jobqueue
+from siliconcompiler.remote import server as server_module
+from siliconcompiler.remote.server import Server
+
+from tests.core.tools.dummy import sleep
+
+
+def test_job_queue_order():
+    queue = jobqueue.JobQueue('jobs.sqlite')
+    queue.add('job0', 'user0', 'job0.json')
+    queue.add('job1', 'user1', 'job1.json')
+    queue.add('job2', 'user1', 'job2.json', priority=1)
+
+    # Higher priority jobs are started first, then in submission order
+    assert queue.next_job()['job_hash'] == 'job2'
+    queue.start('job2')
+    assert queue.next_job()['job_hash'] == 'job0'
+
+    # Jobs of users at their limit are skipped
+    queue.start('job0')
+    assert queue.next_job(user_limit=lambda user: 1) is None
+    assert queue.next_job(user_limit=lambda user: 2)['job_hash'] == 'job1'
+
+    queue.finish('job2', 'completed')
+    assert queue.next_job(user_limit=lambda user: 1)['job_hash'] == 'job1'
+
+    stats = queue.stats()
+    assert stats['queued'] == 1
+    assert stats['running'] == 1
+    assert stats['max_wait_time'] >= 0
+
+    queue.close()
+
+
+def test_job_queue_persistence():
+    queue = jobqueue.JobQueue('jobs.sqlite')
+    queue.add('job0', None, 'job0.json')
+    queue.add('job1', None, 'job1.json')
+    queue.add('job2', None, 'job2.json')
+    queue.start('job0')
+    queue.start('job2')
+    queue.interrupt('job2')
+    queue.close()
+
+    queue = jobqueue.JobQueue('jobs.sqlite')
+    interrupted = queue.requeue_interrupted()
+    assert [job['job_hash'] for job in interrupted] == ['job0', 'job2']
+    assert [job['job_hash'] for job in queue.jobs('queued')] == ['job0', 'job1', 'job2']
+    assert queue.get('job0')['attempts'] == 1
+    queue.close()
+
+
+@pytest.mark.timeout(300)
+def test_server_recovers_jobs(scserver_nfs_path, remote_job_upload):
+    '''
+    Ensure jobs which were interrupted by a server restart are run again.
+    '''
+    def create_server():
+        server = Server()
+        server.set('option', 'nfsmount', scserver_nfs_path)
+        return server
+
+    async def wait_for_job(client, job_hash):
+        while True:
+            resp = await client.post('/check_progress/', json={'job_hash': job_hash})
+            if (await resp.json())['status'] == 'completed':
+                return
+            await asyncio.sleep(0.5)
+
+    async def run_job():
+        server = create_server()
+        async with TestClient(TestServer(server._create_app())) as client:
+            resp = await client.post('/remote_run/', data=remote_job_upload())
+            job_hash = (await resp.json())['job_hash']
+            await wait_for_job(client, job_hash)
+
+            resp = await client.post('/check_server/', json={})
+            queue_info = (await resp.json())['queue']
+            assert queue_info['queued'] == 0
+            assert queue_info['running'] == 0
+            assert queue_info['max_jobs'] == 2
+        return job_hash
+
+    job_hash = asyncio.run(run_job())
+
+    # Mark the job as interrupted, as if the server stopped while it was running
+    queue = jobqueue.JobQueue(os.path.join(scserver_nfs_path, jobqueue.DATABASE))
+    assert queue.get(job_hash)['status'] == 'completed'
+    queue.start(job_hash)
+    queue.close()
+    archive = os.path.join(scserver_nfs_path, job_hash, f'{job_hash}_pass0.tar.gz')
+    os.remove(archive)
+
+    async def restart():
+        server = create_server()
+        async with TestClient(TestServer(server._create_app())) as client:
+            start = time.time()
+            while not os.path.isfile(archive):
+                assert time.time() - start < 120
+                await asyncio.sleep(0.5)
+            await wait_for_job(client, job_hash)
+            assert server.job_queue.get(job_hash)['status'] == 'completed'
+
+    asyncio.run(restart())
+
+
+def test_check_progress_unknown_job(scserver_nfs_path):
+    server = Server()
+    server.set('option', 'nfsmount', scserver_nfs_path)
+
+    async def check_progress():
+        async with TestClient(TestServer(server._create_app())) as client:
+            resp = await client.post('/check_progress/', json={'job_hash': '0' * 32})
+            return resp.status
+
+    assert asyncio.run(check_progress()) == 404
+
+
+@pytest.mark.timeout(300)
+def test_check_progress_failed_job(scserver_nfs_path, remote_job_upload, monkeypatch):
+    '''
+    Ensure a job which failed is not reported as completed.
+    '''
+    def fail(*args):
+        raise RuntimeError('job failed')
+    monkeypatch.setattr(server_module, '_run_job', fail)
+
+    server = Server()
+    server.set('option', 'nfsmount', scserver_nfs_path)
+
+    async def run_job():
+        async with TestClient(TestServer(server._create_app())) as client:
+            resp = await client.post('/remote_run/', data=remote_job_upload())
+            job_hash = (await resp.json())['job_hash']
+
+            status = 'queued'
+            while status in ('queued', 'running'):
+                await asyncio.sleep(0.5)
+                resp = await client.post('/check_progress/', json={'job_hash': job_hash})
+                status = (await resp.json())['status']
+            return status
+
+    assert asyncio.run(run_job()) == 'failed'
+
+
+def _sleeping():
+    return [process for process in psutil.process_iter(['cmdline'])
+            if process.info['cmdline'] and
+            os.path.basename(process.info['cmdline'][0]) == 'sleep' and
+            process.info['cmdline'][1:] == ['120']]
+
+
+@pytest.mark.timeout(300)
+def test_server_interrupts_jobs(scserver_nfs_path, remote_job_upload, monkeypatch):
+    '''
+    Ensure jobs which are still running when the server stops are terminated
+    and marked as interrupted.
+    '''
+    monkeypatch.setattr(server_module, 'JOB_STOP_TIMEOUT', 1)
+
+    chip = siliconcompiler.Chip('test')
+    flow = 'test'
+    chip.set('option', 'flow', flow)
+    chip.set('option', 'mode', 'asic')
+    chip.set('option', 'nodisplay', True)
+    chip.set('option', 'quiet', True)
+    chip.node(flow, 'sleep', sleep)
+    chip.set('tool', 'dummy', 'task', 'sleep', 'var', 'seconds', '120')
+
+    server = Server()
+    server.set('option', 'nfsmount', scserver_nfs_path)
+
+    async def stop_job():
+        async with TestClient(TestServer(server._create_app())) as client:
+            resp = await client.post('/remote_run/', data=remote_job_upload(chip))
+            job_hash = (await resp.json())['job_hash']
+
+            # Wait for the tool to start
+            while not _sleeping():
+                await asyncio.sleep(0.5)
+        return job_hash
+
+    start = time.time()
+    job_hash = asyncio.run(stop_job())
+    assert time.time() - start < 60
+
+    queue = jobqueue.JobQueue(os.path.join(scserver_nfs_path, jobqueue.DATABASE))
+    assert queue.get(job_hash)['status'] == 'interrupted'
+    queue.close()
+
+    # The processes of the job are stopped with the server
+    assert not _sleeping()
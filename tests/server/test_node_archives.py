@@ -0,0 +1,45 @@
+import os
+import tarfile
+
+import siliconcompiler
+from siliconcompiler.remote import server
+from siliconcompiler.tools.builtin import nop
+
+from tests.core.tools.dummy import write
+
+
+def test_run_job_archives_nodes(monkeypatch):
+    job_hash = '0123456789abcdef0123456789abcdef'
+    build_dir = os.path.abspath(job_hash)
+
+    chip = siliconcompiler.Chip('test')
+    flow = 'test'
+    chip.set('option', 'flow', flow)
+    chip.set('option', 'mode', 'asic')
+    chip.set('option', 'quiet', True)
+    chip.set('record', 'remoteid', job_hash)
+    chip.node(flow, 'write', write)
+    chip.node(flow, 'pass', nop)
+    chip.edge(flow, 'write', 'pass')
+
+    # Record which nodes had finished when each node was archived
+    archive_node = server._archive_node
+    archived = []
+
+    def record_archive(archive_chip, job_hash, step, index):
+        pass_done = os.path.isfile(os.path.join(archive_chip._getworkdir(step='pass', index='0'),
+                                                'outputs', 'test.pkg.json'))
+        archived.append((step, pass_done))
+        archive_node(archive_chip, job_hash, step, index)
+
+    monkeypatch.setattr(server, '_archive_node', record_archive)
+
+    server._run_job(chip, build_dir, 'local')
+
+    # Nodes are archived as soon as they finish, before the rest of the job
+    assert archived == [('write', False), ('pass', True)]
+
+    assert sorted(os.listdir(build_dir)) == [
+        f'{job_hash}_pass0.tar.gz', f'{job_hash}_write0.tar.gz', 'configs', 'test']
+    with tarfile.open(os.path.join(build_dir, f'{job_hash}_write0.tar.gz')) as tar:
+        assert f'{job_hash}/test/job0/write/0/outputs/test.v' in tar.getnames()
@@ -0,0 +1,68 @@
+import asyncio
+import os
+import time
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+from siliconcompiler.remote.server import Server
+
+
+@pytest.mark.timeout(300)
+def test_server_concurrent_jobs(scserver_nfs_path, remote_job_upload):
+    '''
+    Submit several jobs at once to a local server and ensure the server keeps
+    responding while the jobs are queued and run.
+    '''
+    num_jobs = 4
+
+    server = Server()
+    server.set('option', 'nfsmount', scserver_nfs_path)
+    server.set('option', 'maxjobs', 2)
+
+    async def run_jobs():
+        async with TestClient(TestServer(server._create_app())) as client:
+            submissions = [client.post('/remote_run/', data=remote_job_upload())
+                           for _ in range(num_jobs)]
+            job_hashes = []
+            for resp in await asyncio.gather(*submissions):
+                assert resp.status == 200
+                job_hashes.append((await resp.json())['job_hash'])
+
+            seen_status = set()
+            pending = set(job_hashes)
+            while pending:
+                # The server must answer promptly while jobs are running.
+                start = time.time()
+                resp = await client.post('/check_server/', json={})
+                assert resp.status == 200
+                assert time.time() - start < 5
+
+                for job_hash in list(pending):
+                    resp = await client.post('/check_progress/', json={'job_hash': job_hash})
+                    progress = await resp.json()
+                    status = progress['status']
+                    seen_status.add(status)
+                    if status == 'running':
+                        # Per-node progress is reported for running jobs
+                        assert set(progress['nodes'].keys()) == {'write0', 'pass0'}
+                        for node_info in progress['nodes'].values():
+                            assert node_info['status'] in \
+                                ('pending', 'running', 'completed', 'failed')
+                            assert isinstance(node_info['results'], bool)
+                    if status == 'completed':
+                        pending.remove(job_hash)
+                await asyncio.sleep(0.5)
+
+            return job_hashes, seen_status
+
+    job_hashes, seen_status = asyncio.run(run_jobs())
+
+    # With fewer job slots than jobs, some jobs had to wait
+    assert 'queued' in seen_status
+    assert not server.sc_jobs
+
+    for job_hash in job_hashes:
+        for node in ('write0', 'pass0'):
+            assert os.path.isfile(os.path.join(scserver_nfs_path, job_hash,
+                                               f'{job_hash}_{node}.tar.gz'))
@@ -0,0 +1,187 @@
+import asyncio
+import json
+import os
+
+import pytest
+from aiohttp import FormData
+from aiohttp.test_utils import TestClient, TestServer
+
+import siliconcompiler
+from siliconcompiler.remote import blobs, client
+from siliconcompiler.remote.server import Server
+
+
+@pytest.fixture
+def job_dir():
+    chip = siliconcompiler.Chip('test')
+    workdir = chip._getworkdir()
+
+    os.makedirs(os.path.join(workdir, 'import', '0', 'outputs'))
+    os.makedirs(os.path.join(workdir, 'import', '0', 'reports'))
+    with open(os.path.join(workdir, 'import', '0', 'outputs', 'test.v'), 'w') as f:
+        f.write('module test(); endmodule\n')
+    with open(os.path.join(workdir, 'import', '0', 'outputs', 'copy.v'), 'w') as f:
+        f.write('module test(); endmodule\n')
+    with open(os.path.join(workdir, 'import', '0', 'run.sh'), 'w') as f:
+        f.write('#!/bin/sh\n')
+    os.chmod(os.path.join(workdir, 'import', '0', 'run.sh'), 0o755)
+    os.symlink('outputs/test.v', os.path.join(workdir, 'import', '0', 'link.v'))
+
+    return chip
+
+
+def test_manifest_roundtrip(job_dir):
+    workdir = job_dir._getworkdir()
+    manifest = blobs.build_manifest(workdir)
+
+    assert set(manifest['files'].keys()) == {
+        os.path.join('import', '0', 'outputs', 'test.v'),
+        os.path.join('import', '0', 'outputs', 'copy.v'),
+        os.path.join('import', '0', 'run.sh')}
+    assert manifest['dirs'] == [os.path.join('import', '0', 'reports')]
+    assert manifest['links'] == {os.path.join('import', '0', 'link.v'): 'outputs/test.v'}
+
+    store = os.path.abspath('store')
+    for relpath, (digest, _) in manifest['files'].items():
+        tmp_file = os.path.abspath(f'{digest}.tmp')
+        with open(os.path.join(workdir, relpath), 'rb') as src, open(tmp_file, 'wb') as dst:
+            dst.write(src.read())
+        blobs.add_blob(store, digest, tmp_file)
+    # Identical files are stored once
+    assert len(os.listdir(store)) == 2
+
+    blobs.materialize(store, manifest, 'copy')
+    assert blobs.build_manifest('copy') == manifest
+
+
+def test_materialize_rejects_outside_paths(job_dir):
+    manifest = blobs.build_manifest(job_dir._getworkdir())
+    manifest['dirs'] = [os.path.join('..', 'outside')]
+
+    with pytest.raises(ValueError):
+        blobs.materialize('store', {'files': {}, 'dirs': manifest['dirs']}, 'copy')
+    assert not os.path.exists('outside')
+
+
+def test_add_blob_bad_digest():
+    with open('blob', 'w') as f:
+        f.write('content')
+
+    with pytest.raises(ValueError):
+        blobs.add_blob('store', 64 * '0', 'blob')
+    assert not os.path.exists(blobs.blob_path('store', 64 * '0'))
+
+
+def test_upload_blobs_server(scserver_nfs_path):
+    server = Server()
+    server.set('option', 'nfsmount', scserver_nfs_path)
+
+    content = b'module test(); endmodule\n'
+    digest = blobs.new_hash()
+    digest.update(content)
+    digest = digest.hexdigest()
+
+    async def upload():
+        async with TestClient(TestServer(server._create_app())) as test_client:
+            resp = await test_client.post('/check_blobs/', json={'blobs': [digest]})
+            assert (await resp.json())['missing'] == [digest]
+
+            resp = await test_client.post('/check_blobs/', json={'blobs': ['../../etc']})
+            assert resp.status == 400
+
+            # Content which does not match the digest is rejected
+            data = FormData()
+            data.add_field('params', json.dumps({}), content_type='application/json')
+            data.add_field('blob', b'other', filename=digest)
+            resp = await test_client.post('/upload_blobs/', data=data)
+            assert resp.status == 400
+
+            data = FormData()
+            data.add_field('params', json.dumps({}), content_type='application/json')
+            data.add_field('blob', content, filename=digest)
+            resp = await test_client.post('/upload_blobs/', data=data)
+            assert resp.status == 200
+
+            resp = await test_client.post('/check_blobs/', json={'blobs': [digest]})
+            assert (await resp.json())['missing'] == []
+
+    asyncio.run(upload())
+
+    with open(blobs.blob_path(server.blob_store, digest), 'rb') as f:
+        assert f.read() == content
+
+
+def _store_files(store):
+    return [os.path.relpath(os.path.join(root, name), store)
+            for root, _, files in os.walk(store) for name in files]
+
+
+def test_upload_blobs_mismatch(scserver_nfs_path):
+    server = Server()
+    server.set('option', 'nfsmount', scserver_nfs_path)
+
+    data = FormData()
+    data.add_field('params', json.dumps({}), content_type='application/json')
+    data.add_field('blob', b'other', filename=64 * '0')
+
+    async def upload():
+        async with TestClient(TestServer(server._create_app())) as test_client:
+            resp = await test_client.post('/upload_blobs/', data=data)
+            assert resp.status == 400
+
+    asyncio.run(upload())
+
+    # The rejected blob is not left in the store
+    assert _store_files(server.blob_store) == []
+
+
+@pytest.mark.timeout(60)
+def test_upload_blobs_disconnect(scserver_nfs_path):
+    server = Server()
+    server.set('option', 'nfsmount', scserver_nfs_path)
+
+    async def interrupted_blob():
+        yield os.urandom(1024 * 1024)
+        await asyncio.sleep(0.5)
+        raise ConnectionResetError('client disconnected')
+
+    data = FormData()
+    data.add_field('params', json.dumps({}), content_type='application/json')
+    data.add_field('blob', interrupted_blob(), filename=64 * '0')
+
+    async def upload():
+        async with TestClient(TestServer(server._create_app())) as test_client:
+            with pytest.raises(Exception):
+                await test_client.post('/upload_blobs/', data=data)
+
+            # The partial blob is removed once the server noticed the disconnect
+            while _store_files(server.blob_store):
+                await asyncio.sleep(0.1)
+
+    asyncio.run(upload())
+
+
+def test_resubmit_uploads_nothing(job_dir, local_server, scserver_nfs_path, monkeypatch):
+    port = local_server()
+    job_dir.status['remote_cfg'] = {'address': 'localhost', 'port': port}
+
+    uploads = []
+    multipart_request = client._multipart_request
+
+    def count_uploads(parts):
+        uploads.append([filename for name, filename, _ in parts if name == 'blob'])
+        return multipart_request(parts)
+
+    monkeypatch.setattr(client, '_multipart_request', count_uploads)
+
+    manifest = client._upload_job_files(job_dir)
+    # Identical files are only uploaded once
+    assert len(uploads) == 1
+    assert len(uploads[0]) == 2
+
+    assert client._upload_job_files(job_dir) == manifest
+    assert len(uploads) == 1
+
+    store = os.path.join(scserver_nfs_path, blobs.STORE_DIR)
+    blobs.materialize(store, manifest, 'job')
+    assert blobs.build_manifest('job') == manifest
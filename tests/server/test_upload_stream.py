@@ -0,0 +1,187 @@
+import asyncio
+import io
+import json
+import os
+import re
+import tarfile
+
+import pytest
+
+from aiohttp import FormData
+from aiohttp.test_utils import TestClient, TestServer
+
+import siliconcompiler
+from siliconcompiler.remote import client
+from siliconcompiler.remote.server import Server
+
+
+def test_archive_directory():
+    os.makedirs('job/import/0/outputs')
+    data = os.urandom(1024 * 1024)
+    with open('job/import/0/outputs/test.v', 'wb') as f:
+        f.write(data)
+
+    archive = b''.join(client._archive_directory('job'))
+
+    with tarfile.open(fileobj=io.BytesIO(archive), mode='r:gz') as tar:
+        assert tar.extractfile('import/0/outputs/test.v').read() == data
+
+
+def test_archive_directory_closed_early():
+    os.makedirs('job')
+    with open('job/test.v', 'wb') as f:
+        f.write(os.urandom(4 * 1024 * 1024))
+
+    # The archive thread stops when the archive is not read to the end
+    chunks = client._archive_directory('job')
+    next(chunks)
+    chunks.close()
+
+
+def test_session_retries():
+    # Requests turned away by a gateway are not retried for POST, which could
+    # submit a job twice
+    retries = client._get_session().get_adapter('http://').max_retries
+    assert retries.is_retry('GET', 503)
+    assert not retries.is_retry('POST', 503)
+    assert retries.connect
+
+    # Streamed request bodies cannot be sent twice
+    retries = client._get_session(retry=False).get_adapter('http://').max_retries
+    assert retries.total == 0
+    assert not retries.is_retry('GET', 503)
+
+
+def test_remote_run_streamed_upload(scserver_nfs_path, local_server):
+    port = local_server()
+
+    chip = siliconcompiler.Chip('test')
+    chip.status['remote_cfg'] = {'address': 'localhost', 'port': port}
+    os.makedirs(os.path.join(chip._getworkdir(), 'import', '0', 'outputs'))
+    data = os.urandom(2 * 1024 * 1024)
+    with open(os.path.join(chip._getworkdir(), 'import', '0', 'outputs', 'test.v'), 'wb') as f:
+        f.write(data)
+
+    # Send the job directory as an archive, which is created and extracted while it is sent
+    headers, body = client._multipart_request([
+        ('params', None, json.dumps({'chip_cfg': chip.schema.cfg, 'params': {}}).encode()),
+        ('import', 'import.tar.gz', lambda: client._archive_directory(chip._getworkdir()))])
+    resp = client._get_session(retry=False).post(f'http://localhost:{port}/remote_run/',
+                                                 data=body, headers=headers, timeout=30)
+    assert resp.status_code == 200
+    job_hash = resp.json()['job_hash']
+
+    with open(os.path.join(scserver_nfs_path, job_hash, 'test', 'job0',
+                           'import', '0', 'outputs', 'test.v'), 'rb') as f:
+        assert f.read() == data
+    # Nothing was staged on the server
+    assert not [name for name in os.listdir(scserver_nfs_path) if len(name) == 32
+                and name != job_hash]
+
+
+def test_remote_run_archive_before_params(scserver_nfs_path):
+    server = Server()
+    server.set('option', 'nfsmount', scserver_nfs_path)
+
+    archive = io.BytesIO()
+    with tarfile.open(fileobj=archive, mode='w:gz') as tar:
+        info = tarfile.TarInfo('import/0/outputs/test.v')
+        info.size = 4
+        tar.addfile(info, io.BytesIO(b'test'))
+
+    chip = siliconcompiler.Chip('test')
+    data = FormData()
+    data.add_field('import', archive.getvalue(), filename='import.tar.gz')
+    data.add_field('params',
+                   json.dumps({'chip_cfg': chip.schema.cfg, 'params': {}}),
+                   content_type='application/json')
+
+    invalid = FormData()
+    invalid.add_field('params',
+                      json.dumps({'chip_cfg': chip.schema.cfg, 'params': {}}),
+                      content_type='application/json')
+    invalid.add_field('import', b'not an archive' * 1024, filename='import.tar.gz')
+
+    async def upload():
+        async with TestClient(TestServer(server._create_app())) as test_client:
+            resp = await test_client.post('/remote_run/', data=data)
+            assert resp.status == 200
+            job_hash = (await resp.json())['job_hash']
+
+            resp = await test_client.post('/remote_run/', data=invalid)
+            assert resp.status == 400
+
+            return job_hash
+
+    job_hash = asyncio.run(upload())
+
+    with open(os.path.join(scserver_nfs_path, job_hash, 'test', 'job0',
+                           'import', '0', 'outputs', 'test.v'), 'rb') as f:
+        assert f.read() == b'test'
+
+
+def _job_files(nfs_path):
+    # Job directories and saved archives, which are named by a uuid
+    return [name for name in os.listdir(nfs_path) if re.match('^[0-9a-f]{32}$', name)]
+
+
+def test_remote_run_rejected_upload(scserver_nfs_path):
+    server = Server()
+    server.set('option', 'nfsmount', scserver_nfs_path)
+
+    chip = siliconcompiler.Chip('test')
+
+    # Invalid archive received before the parameters
+    invalid = FormData()
+    invalid.add_field('import', b'not an archive' * 1024, filename='import.tar.gz')
+    invalid.add_field('params',
+                      json.dumps({'chip_cfg': chip.schema.cfg, 'params': {}}),
+                      content_type='application/json')
+
+    # Archive received before invalid parameters
+    no_manifest = FormData()
+    no_manifest.add_field('import', b'not an archive' * 1024, filename='import.tar.gz')
+    no_manifest.add_field('params', json.dumps({'params': {}}),
+                          content_type='application/json')
+
+    async def upload():
+        async with TestClient(TestServer(server._create_app())) as test_client:
+            resp = await test_client.post('/remote_run/', data=invalid)
+            assert resp.status == 400
+
+            resp = await test_client.post('/remote_run/', data=no_manifest)
+            assert resp.status == 400
+
+    asyncio.run(upload())
+
+    assert _job_files(scserver_nfs_path) == []
+
+
+@pytest.mark.timeout(60)
+def test_remote_run_disconnect(scserver_nfs_path):
+    server = Server()
+    server.set('option', 'nfsmount', scserver_nfs_path)
+
+    chip = siliconcompiler.Chip('test')
+
+    async def interrupted_archive():
+        yield os.urandom(1024 * 1024)
+        await asyncio.sleep(0.5)
+        raise ConnectionResetError('client disconnected')
+
+    data = FormData()
+    data.add_field('params',
+                   json.dumps({'chip_cfg': chip.schema.cfg, 'params': {}}),
+                   content_type='application/json')
+    data.add_field('import', interrupted_archive(), filename='import.tar.gz')
+
+    async def upload():
+        async with TestClient(TestServer(server._create_app())) as test_client:
+            with pytest.raises(Exception):
+                await test_client.post('/remote_run/', data=data)
+
+            # The job is removed once the extraction stopped
+            while _job_files(scserver_nfs_path):
+                await asyncio.sleep(0.1)
+
+    asyncio.run(upload())
@@ -0,0 +1,307 @@
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+import requests
+from aiohttp import web
+
+import siliconcompiler
+from siliconcompiler import NodeStatus, scheduler
+from siliconcompiler.remote.worker import Worker
+from siliconcompiler.scheduler import worker as worker_scheduler
+from siliconcompiler.tools.builtin import nop
+
+from tests.core.tools.dummy import write
+
+
+TOKEN = 'test-token'
+HEADERS = {worker_scheduler.TOKEN_HEADER: TOKEN}
+
+
+@pytest.fixture
+def worker_pool(unused_tcp_port_factory, monkeypatch):
+    '''
+    Returns a function which starts a coordinator and workers in a background
+    thread of this process, and returns the workers. The first worker is the
+    coordinator.
+    '''
+    monkeypatch.setenv(worker_scheduler.TOKEN_ENV, TOKEN)
+
+    loop = asyncio.new_event_loop()
+    runners = []
+    thread = None
+
+    def start(resources):
+        nonlocal thread
+
+        workers = []
+        coordinator = None
+        for cores, memory in resources:
+            port = unused_tcp_port_factory()
+            worker = Worker(TOKEN, port=port, coordinator=coordinator,
+                            cores=cores, memory=memory)
+            coordinator = coordinator or worker.address
+            workers.append(worker)
+            runners.append((web.AppRunner(worker._create_app()), port))
+
+        started = threading.Event()
+
+        def serve():
+            asyncio.set_event_loop(loop)
+            for runner, port in runners:
+                loop.run_until_complete(runner.setup())
+                loop.run_until_complete(web.TCPSite(runner, 'localhost', port).start())
+            started.set()
+            loop.run_forever()
+            for runner, _ in runners:
+                loop.run_until_complete(runner.cleanup())
+
+        thread = threading.Thread(target=serve)
+        thread.start()
+        started.wait()
+
+        # Wait for all workers to register
+        start_time = time.time()
+        while len(list_workers(coordinator)) < len(workers):
+            assert time.time() - start_time < 30
+            time.sleep(0.1)
+
+        return workers
+
+    yield start
+
+    if thread:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+
+
+def list_workers(coordinator):
+    resp = requests.post(f'http://{coordinator}/list_workers/', json={}, headers=HEADERS)
+    resp.raise_for_status()
+    return resp.json()['workers']
+
+
+def write_script(chip, step, index, content):
+    cfg_dir = scheduler._get_cfg_dir(chip)
+    os.makedirs(cfg_dir, exist_ok=True)
+    with open(f'{cfg_dir}/{step}{index}.sh', 'w') as f:
+        f.write(f'#!/bin/sh\n{content}\n')
+    scheduler._make_executable(f'{cfg_dir}/{step}{index}.sh')
+
+
+def wait_for_finished(scheduler_backend, count):
+    finished = []
+    start = time.time()
+    while len(finished) < count:
+        assert time.time() - start < 60
+        finished.extend(scheduler_backend.collect())
+        time.sleep(0.1)
+    return finished
+
+
+@pytest.mark.timeout(300)
+def test_worker_pool_run(worker_pool):
+    workers = worker_pool([(1, 1000), (1, 1000), (1, 1000)])
+
+    chip = siliconcompiler.Chip('test')
+    flow = 'test'
+    chip.set('option', 'flow', flow)
+    chip.set('option', 'mode', 'asic')
+    chip.set('option', 'quiet', True)
+    chip.set('option', 'scheduler', 'name', 'worker')
+    chip.set('option', 'scheduler', 'queue', workers[0].address)
+    chip.node(flow, 'write', write)
+    for index in range(3):
+        chip.node(flow, 'pass', nop, index=index)
+        chip.edge(flow, 'write', 'pass', head_index=index)
+
+    chip.run()
+
+    for index in range(3):
+        assert chip.get('flowgraph', flow, 'pass', str(index), 'status') == NodeStatus.SUCCESS
+        assert os.path.isfile(f'build/test/job0/sc_remote-pass-{index}.log')
+
+    # Each worker has one core, so the fan-out is spread over all of them
+    assert [worker.status()['completed'] for worker in workers] == [1, 1, 1]
+
+
+@pytest.mark.timeout(300)
+def test_worker_pool_resources(worker_pool):
+    small, large = worker_pool([(1, 1000), (4, 8000)])
+
+    chip = siliconcompiler.Chip('test')
+    chip.set('option', 'scheduler', 'queue', small.address)
+    chip.set('option', 'scheduler', 'memory', 4000, step='syn', index='0')
+    chip.set('option', 'scheduler', 'cores', 2, step='syn', index='1')
+    for index in range(3):
+        write_script(chip, 'syn', index, 'sleep 1')
+
+    pool = scheduler.get_backend(chip, 'worker')
+    pool.start()
+    try:
+        pool.submit([('syn', '0'), ('syn', '1'), ('syn', '2')])
+        finished = wait_for_finished(pool, 3)
+    finally:
+        pool.stop()
+
+    assert sorted(finished) == [(('syn', '0'), True), (('syn', '1'), True), (('syn', '2'), True)]
+    # Only the large worker fits the first two jobs, and the third fills the small one
+    assert small.status()['completed'] == 1
+    assert large.status()['completed'] == 2
+
+
+@pytest.mark.timeout(300)
+def test_worker_busy_and_cancel(worker_pool):
+    worker, = worker_pool([(1, 1000)])
+
+    chip = siliconcompiler.Chip('test')
+    write_script(chip, 'syn', '0', 'sleep 60')
+    job = {
+        'name': 'syn0',
+        'script': os.path.abspath(f'{scheduler._get_cfg_dir(chip)}/syn0.sh'),
+        'cwd': os.getcwd(),
+        'log': os.path.abspath('syn0.log'),
+        'cores': 1,
+        'memory': 0
+    }
+
+    url = f'http://{worker.address}'
+    resp = requests.post(f'{url}/run_job/', json=job, headers=HEADERS)
+    assert resp.status_code == 200
+    job_id = resp.json()['job_id']
+
+    assert requests.post(f'{url}/run_job/', json=job, headers=HEADERS).status_code == 409
+    assert requests.post(f'{url}/run_job/', json={}, headers=HEADERS).status_code == 400
+
+    resp = requests.post(f'{url}/check_jobs/', json={'jobs': [job_id, 'missing']},
+                         headers=HEADERS)
+    assert resp.json()['jobs'] == {job_id: 'running', 'missing': 'unknown'}
+
+    requests.post(f'{url}/cancel_jobs/', json={'jobs': [job_id]},
+                  headers=HEADERS).raise_for_status()
+    assert worker.status()['jobs'] == 0
+    resp = requests.post(f'{url}/check_jobs/', json={'jobs': [job_id]}, headers=HEADERS)
+    assert resp.json()['jobs'] == {job_id: 'unknown'}
+
+
+@pytest.mark.timeout(300)
+def test_worker_authentication(worker_pool):
+    worker, = worker_pool([(1, 1000)])
+
+    chip = siliconcompiler.Chip('test')
+    write_script(chip, 'syn', '0', 'true')
+    job = {
+        'name': 'syn0',
+        'script': os.path.abspath(f'{scheduler._get_cfg_dir(chip)}/syn0.sh'),
+        'cwd': os.getcwd(),
+        'log': os.path.abspath('syn0.log'),
+        'cores': 1,
+        'memory': 0
+    }
+
+    # Requests without the token of the pool are rejected
+    url = f'http://{worker.address}'
+    assert requests.post(f'{url}/run_job/', json=job).status_code == 403
+    assert requests.post(f'{url}/run_job/', json=job,
+                         headers={worker_scheduler.TOKEN_HEADER: 'wrong'}).status_code == 403
+    assert requests.post(f'{url}/list_workers/', json={}).status_code == 403
+    assert worker.status()['completed'] == 0
+
+    with pytest.raises(ValueError):
+        Worker(None)
+
+
+@pytest.mark.timeout(300)
+def test_worker_many_jobs(worker_pool):
+    worker, = worker_pool([(64, 1000)])
+
+    chip = siliconcompiler.Chip('test')
+    write_script(chip, 'syn', '0', 'sleep 5')
+    write_script(chip, 'syn', '1', 'true')
+
+    def run_job(index):
+        resp = requests.post(f'http://{worker.address}/run_job/', json={
+            'name': f'syn{index}',
+            'script': os.path.abspath(f'{scheduler._get_cfg_dir(chip)}/syn{index}.sh'),
+            'cwd': os.getcwd(),
+            'log': os.path.abspath(f'syn{index}.log'),
+            'cores': 1,
+            'memory': 0
+        }, headers=HEADERS)
+        resp.raise_for_status()
+        return resp.json()['job_id']
+
+    # More long running jobs than threads in the default executor
+    for _ in range(40):
+        run_job(0)
+    job_id = run_job(1)
+
+    # Jobs which end are reported while the others are running
+    start = time.time()
+    while True:
+        resp = requests.post(f'http://{worker.address}/check_jobs/', json={'jobs': [job_id]},
+                             headers=HEADERS)
+        if resp.json()['jobs'][job_id] != 'running':
+            break
+        assert time.time() - start < 4
+        time.sleep(0.1)
+    assert resp.json()['jobs'][job_id] == 'success'
+
+
+def test_worker_coordinator_unreachable(unused_tcp_port, monkeypatch):
+    monkeypatch.setattr(worker_scheduler, 'WORKER_TIMEOUT', 0)
+
+    chip = siliconcompiler.Chip('test')
+    chip.set('option', 'scheduler', 'queue', f'localhost:{unused_tcp_port}')
+    write_script(chip, 'syn', '0', 'true')
+
+    pool = scheduler.get_backend(chip, 'worker')
+    pool.submit([('syn', '0')])
+    pool.poll()
+    time.sleep(0.1)
+    pool.poll()
+
+    assert pool.collect() == [(('syn', '0'), False)]
+
+
+def test_worker_no_workers(monkeypatch):
+    monkeypatch.setattr(worker_scheduler, 'WORKER_TIMEOUT', 0)
+
+    chip = siliconcompiler.Chip('test')
+    write_script(chip, 'syn', '0', 'true')
+
+    pool = scheduler.get_backend(chip, 'worker')
+    # The coordinator is up, but no worker registered with it
+    monkeypatch.setattr(pool, '_WorkerBackend__post', lambda *args: {'workers': []})
+    pool.submit([('syn', '0')])
+    pool.poll()
+    time.sleep(0.1)
+    pool.poll()
+
+    assert pool.collect() == [(('syn', '0'), False)]
+
+
+@pytest.mark.timeout(300)
+def test_worker_oversized_job(worker_pool, monkeypatch):
+    worker, = worker_pool([(1, 1000)])
+
+    chip = siliconcompiler.Chip('test')
+    chip.set('option', 'scheduler', 'queue', worker.address)
+    chip.set('option', 'scheduler', 'cores', 2, step='syn', index='0')
+    write_script(chip, 'syn', '0', 'true')
+    warnings = []
+    monkeypatch.setattr(chip.logger, 'warning', warnings.append)
+
+    pool = scheduler.get_backend(chip, 'worker')
+    pool.start()
+    try:
+        pool.submit([('syn', '0')])
+        finished = wait_for_finished(pool, 1)
+    finally:
+        pool.stop()
+
+    # The job runs on the idle worker, with a warning
+    assert finished == [(('syn', '0'), True)]
+    assert any('requests 2 cores' in warning for warning in warnings)